@@ -0,0 +1,122 @@
+"""
+Benchmark of encoding an image list response.
+
+Seeds one user with a list of tagged images and times the two ways of answering
+GET /api/images/: loading ORM objects, validating them through ImageResponse and
+encoding with the standard json module, against selecting row tuples and encoding
+them with orjson. Also reports the body size with gzip and, when installed, brotli.
+
+Example:
+    python benchmarks/list_serialization.py --images 1000
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, Image, Tag, User, image_m2m_tag
+from src.middleware import brotli
+from src.repository.images import get_image_rows, get_images
+from src.responses import orjson
+from src.schemas import ImageResponse
+
+
+def seed(engine, images: int, tags_per_image: int):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [{"id": 1, "username": "user", "email": "u@example.com", "password": "x"}],
+        )
+        conn.execute(insert(Tag), [{"id": i, "name": f"tag{i}"} for i in range(1, 51)])
+        conn.execute(
+            insert(Image),
+            [
+                {
+                    "id": i,
+                    "url": f"https://res.cloudinary.com/demo/image/upload/v1/{i}.jpg",
+                    "description": f"Image number {i} " + " ".join(
+                        f"#tag{(i + k) % 50 + 1}" for k in range(tags_per_image)
+                    ),
+                    "variants": {
+                        name: f"https://res.cloudinary.com/demo/{name}/{i}.webp"
+                        for name in ("thumb", "feed", "full")
+                    },
+                    "user_id": 1,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(1, images + 1)
+            ],
+        )
+        conn.execute(
+            insert(image_m2m_tag),
+            [
+                {"image": i, "tag": (i + k) % 50 + 1}
+                for i in range(1, images + 1)
+                for k in range(tags_per_image)
+            ],
+        )
+
+
+async def orm_path(db, user):
+    images = await get_images(user, db)
+    adapter = TypeAdapter(list[ImageResponse])
+    content = adapter.validate_python(images, from_attributes=True)
+    return json.dumps(jsonable_encoder(content)).encode()
+
+
+async def row_path(db, user):
+    rows = await get_image_rows(user, db)
+    return orjson.dumps(rows)
+
+
+async def measure(path, session_factory, user, runs):
+    timings = []
+    for _ in range(runs):
+        db = session_factory()
+        start = time.perf_counter()
+        body = await path(db, user)
+        timings.append((time.perf_counter() - start) * 1000)
+        db.close()
+    return statistics.median(timings), body
+
+
+async def run(args):
+    engine = create_engine(args.url)
+    seed(engine, args.images, args.tags)
+    session_factory = sessionmaker(bind=engine)
+    user = session_factory().get(User, 1)
+    paths = [("ORM + pydantic + json", orm_path)]
+    if orjson is not None:
+        paths.append(("rows + orjson", row_path))
+    for label, path in paths:
+        median, body = await measure(path, session_factory, user, args.runs)
+        print(f"{label:<24} median {median:8.2f} ms   {len(body):>9} bytes")
+    print(f"{'gzip -6':<24} {len(gzip.compress(body, 6)):>35} bytes")
+    if brotli is not None:
+        print(f"{'brotli q4':<24} {len(brotli.compress(body, quality=4)):>35} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="sqlite://")
+    parser.add_argument("--images", type=int, default=1_000)
+    parser.add_argument("--tags", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=30)
+    asyncio.run(run(parser.parse_args()))
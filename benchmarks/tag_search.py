@@ -0,0 +1,120 @@
+"""
+Benchmark of tag search over a seeded dataset.
+
+Seeds users, images, tags and image/tag links into the given database and times
+AND/OR tag searches with keyset pagination. Tag popularity follows a Zipf-like
+distribution, so searches mix very common and rare tags.
+
+Example:
+    python benchmarks/tag_search.py --url postgresql+psycopg2://u:p@localhost/bench
+
+Warning:
+    The target database is dropped and recreated, never point it at real data.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, Image, Tag, User, image_m2m_tag
+from src.repository.images import search_images_by_tags
+
+BATCH_SIZE = 50_000
+
+
+def seed(engine, images: int, tags: int, links: int, users: int):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    weights = [1 / (rank + 1) for rank in range(tags)]
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [
+                {
+                    "id": i,
+                    "username": f"user{i}",
+                    "email": f"user{i}@example.com",
+                    "password": "x",
+                }
+                for i in range(1, users + 1)
+            ],
+        )
+        conn.execute(
+            insert(Tag), [{"id": i, "name": f"tag{i}"} for i in range(1, tags + 1)]
+        )
+        for start in range(1, images + 1, BATCH_SIZE):
+            conn.execute(
+                insert(Image),
+                [
+                    {"id": i, "url": "x", "user_id": rng.randint(1, users)}
+                    for i in range(start, min(start + BATCH_SIZE, images + 1))
+                ],
+            )
+        per_image = max(1, links // images)
+        total = 0
+        rows = []
+        for image_id in range(1, images + 1):
+            for tag_id in set(rng.choices(range(1, tags + 1), weights, k=per_image)):
+                rows.append({"image": image_id, "tag": tag_id})
+            if len(rows) >= BATCH_SIZE:
+                conn.execute(insert(image_m2m_tag), rows)
+                total += len(rows)
+                rows = []
+        if rows:
+            conn.execute(insert(image_m2m_tag), rows)
+            total += len(rows)
+    return total
+
+
+async def measure(db, tag_names, match_all, runs):
+    timings = []
+    cursor = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        page = await search_images_by_tags(
+            tag_names, match_all, db, before_id=cursor, limit=20
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+        cursor = page[-1].id if len(page) == 20 else None
+    return statistics.median(timings), max(timings)
+
+
+async def run(args):
+    engine = create_engine(args.url)
+    if not args.skip_seed:
+        start = time.perf_counter()
+        total = seed(engine, args.images, args.tags, args.links, args.users)
+        print(f"Seeded {total} links in {time.perf_counter() - start:.1f}s")
+    db = sessionmaker(bind=engine)()
+    cases = [
+        (["tag1"], True, "most common tag"),
+        (["tag1", "tag2"], True, "two common tags, AND"),
+        (["tag1", f"tag{args.tags}"], True, "common AND rare"),
+        (["tag3", "tag50", "tag500"], True, "three tags, AND"),
+        (["tag10", f"tag{args.tags}"], False, "common OR rare"),
+    ]
+    for tag_names, match_all, label in cases:
+        median, worst = await measure(db, tag_names, match_all, args.runs)
+        print(f"{label:<24} median {median:8.2f} ms   max {worst:8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="sqlite:///tag_search_bench.db")
+    parser.add_argument("--images", type=int, default=500_000)
+    parser.add_argument("--tags", type=int, default=10_000)
+    parser.add_argument("--links", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true")
+    asyncio.run(run(parser.parse_args()))
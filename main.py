@@ -22,14 +22,39 @@ from fastapi.staticfiles import StaticFiles
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
+from src.conf.config import settings
 from src.limiter import limiter
-from src.routes import auth, users, images, transformations, comments
+from src.middleware import (
+    CompressionMiddleware,
+    MaxBodySizeMiddleware,
+    MessagePackMiddleware,
+)
+from src.responses import DefaultJSONResponse
+from src.routes import (
+    auth,
+    users,
+    images,
+    transformations,
+    comments,
+    uploads,
+    tags,
+    sync,
+)
+from src.services.deletions import deletion_worker
+from src.services.reconciliation import comment_count_reconciler
+from src.services.sync import sync_service
+from src.services.comment_events import comment_events
+from src.services.tag_index import tag_index
+from src.services.trending import trending_tags
+from src.services.uploads import upload_service
+from src.services.workers import shutdown_executor
 from src.views import test
 
 load_dotenv()
 
 app = FastAPI(
     docs_url="/swagger",
+    default_response_class=DefaultJSONResponse,
 )
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -51,6 +76,42 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    MaxBodySizeMiddleware,
+    max_body_size=settings.image_max_bytes + 64 * 1024,
+    paths=("/api/images/", "/api/users/avatar"),
+)
+app.add_middleware(MessagePackMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+
+
+@app.on_event("startup")
+async def startup():
+    """
+    Starts the background workers.
+    """
+    deletion_worker.start()
+    upload_service.start()
+    comment_count_reconciler.start()
+    tag_index.start()
+    trending_tags.start()
+    comment_events.start()
+    sync_service.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Stops the background workers and releases the worker pool.
+    """
+    await deletion_worker.stop()
+    await upload_service.stop()
+    await comment_count_reconciler.stop()
+    await tag_index.stop()
+    await trending_tags.stop()
+    await comment_events.stop()
+    await sync_service.stop()
+    shutdown_executor()
 
 
 @app.get("/docs", include_in_schema=False)
@@ -76,5 +137,8 @@ app.include_router(users.router, prefix="/api")
 app.include_router(images.router, prefix="/api")
 app.include_router(transformations.router, prefix="/api")
 app.include_router(comments.router, prefix="/api")
+app.include_router(uploads.router, prefix="/api")
+app.include_router(tags.router, prefix="/api")
+app.include_router(sync.router, prefix="/api")
 
 app.include_router(test.router)
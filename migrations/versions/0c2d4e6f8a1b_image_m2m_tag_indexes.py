@@ -0,0 +1,28 @@
+"""image_m2m_tag indexes
+
+Revision ID: 0c2d4e6f8a1b
+Revises: f1a3b5c7d9e2
+Create Date: 2026-10-19 12:57:12.338410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c2d4e6f8a1b'
+down_revision: Union[str, None] = 'f1a3b5c7d9e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_image_m2m_tag_tag_image', 'image_m2m_tag', ['tag', 'image'], unique=False)
+    op.create_index('ix_image_m2m_tag_image_tag', 'image_m2m_tag', ['image', 'tag'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_image_m2m_tag_image_tag', table_name='image_m2m_tag')
+    op.drop_index('ix_image_m2m_tag_tag_image', table_name='image_m2m_tag')
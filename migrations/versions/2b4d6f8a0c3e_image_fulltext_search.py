@@ -0,0 +1,43 @@
+"""Image full-text search
+
+Revision ID: 2b4d6f8a0c3e
+Revises: 0c2d4e6f8a1b
+Create Date: 2026-10-19 13:41:55.071826
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from src.conf.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b4d6f8a0c3e'
+down_revision: Union[str, None] = '0c2d4e6f8a1b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.add_column('images', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.execute(
+            sa.text("UPDATE images SET search_vector = to_tsvector(CAST(:config AS regconfig), coalesce(description, ''))")
+            .bindparams(config=settings.fulltext_config)
+        )
+        op.create_index('ix_images_search_vector', 'images', ['search_vector'], unique=False, postgresql_using='gin')
+    else:
+        op.add_column('images', sa.Column('search_vector', sa.Text(), nullable=True))
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS images_fts USING fts5(description)")
+        op.execute("INSERT INTO images_fts(rowid, description) SELECT id, coalesce(description, '') FROM images")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_images_search_vector', table_name='images', postgresql_using='gin')
+    else:
+        op.execute("DROP TABLE IF EXISTS images_fts")
+    op.drop_column('images', 'search_vector')
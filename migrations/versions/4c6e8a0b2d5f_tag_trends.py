@@ -0,0 +1,34 @@
+"""Tag trends
+
+Revision ID: 4c6e8a0b2d5f
+Revises: 2b4d6f8a0c3e
+Create Date: 2026-10-19 15:02:11.384920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c6e8a0b2d5f'
+down_revision: Union[str, None] = '2b4d6f8a0c3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('tag_trends',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tag_name', sa.String(), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tag_trends_bucket'), 'tag_trends', ['bucket'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tag_trends_bucket'), table_name='tag_trends')
+    op.drop_table('tag_trends')
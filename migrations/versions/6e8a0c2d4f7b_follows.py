@@ -0,0 +1,41 @@
+"""Follows
+
+Revision ID: 6e8a0c2d4f7b
+Revises: 4c6e8a0b2d5f
+Create Date: 2026-10-19 15:47:30.215687
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e8a0c2d4f7b'
+down_revision: Union[str, None] = '4c6e8a0b2d5f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('follows',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('follower_id', sa.Integer(), nullable=True),
+    sa.Column('followed_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['follower_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['followed_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('follower_id', 'followed_id', name='uq_follows_pair')
+    )
+    op.create_index(op.f('ix_follows_followed_id'), 'follows', ['followed_id'], unique=False)
+    op.add_column('users', sa.Column('follower_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_images_user_id_id', 'images', ['user_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_images_user_id_id', table_name='images')
+    op.drop_column('users', 'follower_count')
+    op.drop_index(op.f('ix_follows_followed_id'), table_name='follows')
+    op.drop_table('follows')
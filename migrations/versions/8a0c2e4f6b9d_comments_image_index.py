@@ -0,0 +1,25 @@
+"""Comments image index
+
+Revision ID: 8a0c2e4f6b9d
+Revises: 6e8a0c2d4f7b
+Create Date: 2026-10-19 16:41:05.772301
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a0c2e4f6b9d'
+down_revision: Union[str, None] = '6e8a0c2d4f7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_comments_image_id_updated_at', 'comments', ['image_id', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_image_id_updated_at', table_name='comments')
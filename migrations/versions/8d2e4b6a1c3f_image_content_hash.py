@@ -0,0 +1,30 @@
+"""Image content hash
+
+Revision ID: 8d2e4b6a1c3f
+Revises: 5a1f3c9e2b7d
+Create Date: 2026-10-19 10:03:17.582930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4b6a1c3f'
+down_revision: Union[str, None] = '5a1f3c9e2b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('images', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_images_content_hash'), 'images', ['content_hash'], unique=False)
+    op.create_index(op.f('ix_images_public_id'), 'images', ['public_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_images_public_id'), table_name='images')
+    op.drop_index(op.f('ix_images_content_hash'), table_name='images')
+    op.drop_column('images', 'content_hash')
@@ -0,0 +1,43 @@
+"""Sync tombstones
+
+Revision ID: a2c4e6b8d0f1
+Revises: 8a0c2e4f6b9d
+Create Date: 2026-10-19 18:12:47.509316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2c4e6b8d0f1'
+down_revision: Union[str, None] = '8a0c2e4f6b9d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('object_id', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tombstones_deleted_at'), 'tombstones', ['deleted_at'], unique=False)
+    op.create_index('ix_tombstones_owner_id_deleted_at', 'tombstones', ['owner_id', 'deleted_at'], unique=False)
+    op.create_index('ix_images_user_id_updated_at', 'images', ['user_id', 'updated_at'], unique=False)
+    # Rows without an update time would never be returned by a sync.
+    op.execute('UPDATE images SET updated_at = created_at WHERE updated_at IS NULL')
+    op.execute('UPDATE comments SET updated_at = created_at WHERE updated_at IS NULL')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_images_user_id_updated_at', table_name='images')
+    op.drop_index('ix_tombstones_owner_id_deleted_at', table_name='tombstones')
+    op.drop_index(op.f('ix_tombstones_deleted_at'), table_name='tombstones')
+    op.drop_table('tombstones')
@@ -0,0 +1,26 @@
+"""Image variants
+
+Revision ID: b3c7d9e1f2a4
+Revises: 8d2e4b6a1c3f
+Create Date: 2026-10-19 10:41:05.117362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c7d9e1f2a4'
+down_revision: Union[str, None] = '8d2e4b6a1c3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('images', sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('images', 'variants')
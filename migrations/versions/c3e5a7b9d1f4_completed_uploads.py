@@ -0,0 +1,32 @@
+"""Completed uploads
+
+Revision ID: c3e5a7b9d1f4
+Revises: a2c4e6b8d0f1
+Create Date: 2026-10-19 21:04:13.682950
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e5a7b9d1f4'
+down_revision: Union[str, None] = 'a2c4e6b8d0f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('completed_uploads',
+    sa.Column('public_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('public_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('completed_uploads')
@@ -0,0 +1,26 @@
+"""Upload session claims
+
+Revision ID: d4f6b8c0e2a5
+Revises: c3e5a7b9d1f4
+Create Date: 2026-10-19 21:37:52.114806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f6b8c0e2a5'
+down_revision: Union[str, None] = 'c3e5a7b9d1f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('upload_sessions', sa.Column('locked_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('upload_sessions', 'locked_until')
@@ -0,0 +1,33 @@
+"""Image comment aggregates
+
+Revision ID: f1a3b5c7d9e2
+Revises: e4f8a2c6b0d1
+Create Date: 2026-10-19 12:18:30.640175
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a3b5c7d9e2'
+down_revision: Union[str, None] = 'e4f8a2c6b0d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('images', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('images', sa.Column('last_commented_at', sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE images SET "
+        "comment_count = (SELECT count(*) FROM comments WHERE comments.image_id = images.id), "
+        "last_commented_at = (SELECT max(created_at) FROM comments WHERE comments.image_id = images.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('images', 'last_commented_at')
+    op.drop_column('images', 'comment_count')
@@ -19,6 +19,63 @@ class Settings(BaseSettings):
     cloudinary_name: str = "your_cloudinary_name"
     cloudinary_api_key: str = "your_cloudinary_api_key"
     cloudinary_api_secret: str = "your_cloudinary_api_secret"
+    cloudinary_pool_size: int = 10
+    cloudinary_connect_timeout: float = 5.0
+    cloudinary_read_timeout: float = 60.0
+    cloudinary_retries: int = 3
+
+    image_dedupe: bool = True
+    image_max_bytes: int = 20 * 1024 * 1024
+    image_max_pixels: int = 50_000_000
+    image_recompress: bool = False
+    image_max_dimension: int = 2048
+    image_quality: int = 85
+    image_output_format: str = "webp"
+    image_variants: dict[str, dict] = {
+        "thumb": {
+            "width": 150,
+            "height": 150,
+            "crop": "fill",
+            "gravity": "auto",
+            "quality": "auto",
+        },
+        "feed": {"width": 640, "crop": "limit", "quality": "auto"},
+        "full": {"width": 1600, "crop": "limit", "quality": "auto"},
+    }
+    direct_upload_ttl: int = 600
+    direct_upload_max_bytes: int = 20 * 1024 * 1024
+    direct_upload_formats: str = "jpg,jpeg,png,gif,webp"
+
+    upload_dir: str = "./uploads"
+    upload_chunk_size: int = 8 * 1024 * 1024
+    upload_max_size: int = 200 * 1024 * 1024
+    upload_session_ttl: int = 24 * 60 * 60
+
+    fulltext_config: str = "simple"
+
+    comment_reconcile_interval: int = 60 * 60
+    comment_stream_backlog: int = 500
+    comment_stream_ttl: int = 24 * 60 * 60
+    comment_stream_heartbeat: float = 15.0
+
+    feed_cache_size: int = 100
+    feed_head_ttl: int = 60
+    feed_page_ttl: int = 5 * 60
+
+    timeline_size: int = 800
+    timeline_fanout_limit: int = 1000
+
+    compression_min_size: int = 1024
+
+    sync_settle_seconds: int = 5
+    sync_tombstone_retention_days: int = 30
+
+    cpu_workers: int = 2
+    qr_cache_size: int = 512
+
+    deletion_batch_size: int = 100
+    deletion_poll_interval: float = 5.0
+    deletion_max_backoff: int = 3600
 
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", extra="allow"
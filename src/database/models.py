@@ -6,9 +6,14 @@ from sqlalchemy import (
     ForeignKey,
     Boolean,
     Table,
+    Index,
+    JSON,
+    Text,
+    UniqueConstraint,
     func,
 )
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import declarative_base, deferred, relationship
 from enum import Enum
 
 Base = declarative_base()
@@ -19,6 +24,8 @@ image_m2m_tag = Table(
     Column("id", Integer, primary_key=True),
     Column("image", Integer, ForeignKey("images.id", ondelete="CASCADE")),
     Column("tag", Integer, ForeignKey("tags.id", ondelete="CASCADE")),
+    Index("ix_image_m2m_tag_tag_image", "tag", "image"),
+    Index("ix_image_m2m_tag_image_tag", "image", "tag"),
 )
 
 
@@ -26,14 +33,26 @@ class Image(Base):
     __tablename__ = "images"
     id = Column(Integer, primary_key=True)
     description = Column(String)
-    public_id = Column(String)
+    public_id = Column(String, index=True)
     url = Column(String)
+    content_hash = Column(String(64), index=True, nullable=True)
+    variants = Column(JSON, nullable=True)
+    comment_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_commented_at = Column(DateTime, nullable=True)
+    search_vector = deferred(
+        Column(Text().with_variant(TSVECTOR(), "postgresql"), nullable=True)
+    )
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime)
     user_id = Column(Integer, ForeignKey("users.id"))
     tags = relationship("Tag", secondary=image_m2m_tag, backref="images")
     comments = relationship("Comment", backref="images")
 
+    __table_args__ = (
+        Index("ix_images_user_id_id", "user_id", "id"),
+        Index("ix_images_user_id_updated_at", "user_id", "updated_at"),
+    )
+
 
 class Tag(Base):
     __tablename__ = "tags"
@@ -45,6 +64,14 @@ class Tag(Base):
         return self.name
 
 
+class TagTrend(Base):
+    __tablename__ = "tag_trends"
+    id = Column(Integer, primary_key=True)
+    tag_name = Column(String, nullable=False)
+    bucket = Column(DateTime, nullable=False, index=True)
+    count = Column(Integer, nullable=False)
+
+
 class Comment(Base):
     __tablename__ = "comments"
     id = Column(Integer, primary_key=True)
@@ -54,6 +81,67 @@ class Comment(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     image_id = Column(Integer, ForeignKey("images.id"))
 
+    __table_args__ = (
+        Index("ix_comments_image_id_updated_at", "image_id", "updated_at"),
+    )
+
+
+class Tombstone(Base):
+    __tablename__ = "tombstones"
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(16), nullable=False)
+    object_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    deleted_at = Column(DateTime, default=func.now(), index=True)
+
+    __table_args__ = (
+        Index("ix_tombstones_owner_id_deleted_at", "owner_id", "deleted_at"),
+    )
+
+
+class PendingDeletion(Base):
+    __tablename__ = "pending_deletions"
+    id = Column(Integer, primary_key=True)
+    public_id = Column(String, nullable=False)
+    attempts = Column(Integer, default=0)
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime, default=func.now(), index=True)
+    created_at = Column(DateTime, default=func.now())
+
+
+class CompletedUpload(Base):
+    __tablename__ = "completed_uploads"
+    public_id = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    created_at = Column(DateTime, default=func.now())
+
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+    id = Column(String(36), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    description = Column(String, default="")
+    total_size = Column(Integer, nullable=False)
+    received = Column(Integer, default=0)
+    checksum = Column(String(64), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, index=True)
+    created_at = Column(DateTime, default=func.now())
+
+
+class Follow(Base):
+    __tablename__ = "follows"
+    id = Column(Integer, primary_key=True)
+    follower_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    followed_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True
+    )
+    created_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("follower_id", "followed_id", name="uq_follows_pair"),
+    )
+
 
 class UserRole(str, Enum):
     admin = "admin"
@@ -73,3 +161,4 @@ class User(Base):
     refresh_token = Column(String(255), nullable=True)
     is_active = Column(Boolean, default=True)
     role = Column(String, default="user")
+    follower_count = Column(Integer, default=0, server_default="0", nullable=False)
@@ -0,0 +1,10 @@
+import redis
+import redis.asyncio
+
+from src.conf.config import settings
+
+redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port, db=0)
+
+async_redis_client = redis.asyncio.Redis(
+    host=settings.redis_host, port=settings.redis_port, db=0
+)
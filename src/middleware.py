@@ -0,0 +1,313 @@
+import json
+import zlib
+
+import brotli
+import msgpack
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+class MaxBodySizeMiddleware:
+    """
+    Rejects request bodies larger than a limit before the application reads them.
+
+    The declared Content-Length is checked first; bodies without one are counted
+    while they stream in and cut off as soon as they pass the limit.
+    """
+
+    def __init__(self, app, max_body_size: int, paths: tuple[str, ...]):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("POST", "PUT", "PATCH")
+            or not scope["path"].startswith(self.paths)
+        ):
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length and int(content_length) > self.max_body_size:
+            return await self.reject(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    raise HTTPException(status_code=413, detail=self.detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @property
+    def detail(self) -> str:
+        return f"Request body exceeds {self.max_body_size} bytes"
+
+    async def reject(self, scope, receive, send):
+        response = JSONResponse(status_code=413, content={"detail": self.detail})
+        await response(scope, receive, send)
+
+
+class GzipCompressor:
+    encoding = "gzip"
+
+    def __init__(self, level: int = 6):
+        # wbits=31 writes a gzip header and trailer around the deflate stream.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    encoding = "br"
+
+    def __init__(self, quality: int = 4):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compresses response bodies with brotli or gzip, whichever the client accepts.
+
+    Brotli is preferred when the client accepts both. Bodies below the size
+    threshold, already encoded bodies and excluded media types, such as event
+    streams and compressed images, are sent unchanged.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        excluded_media_types: tuple[str, ...] = (
+            "text/event-stream",
+            "image/png",
+            "image/jpeg",
+            "image/webp",
+        ),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_media_types = excluded_media_types
+
+    def choose_compressor(self, accept_encoding: str):
+        encodings = {
+            part.split(";")[0].strip().lower() for part in accept_encoding.split(",")
+        }
+        if "br" in encodings:
+            return BrotliCompressor(self.brotli_quality)
+        if "gzip" in encodings:
+            return GzipCompressor(self.gzip_level)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        compressor = self.choose_compressor(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+        if compressor is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        compressing = None
+
+        async def compressed_send(message):
+            nonlocal start, compressing
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressing is None:
+                headers = MutableHeaders(raw=start["headers"])
+                media_type = headers.get("content-type", "")
+                compressing = not (
+                    "content-encoding" in headers
+                    or media_type.startswith(self.excluded_media_types)
+                    or (not more_body and len(body) < self.minimum_size)
+                )
+                if compressing:
+                    headers["Content-Encoding"] = compressor.encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    if not more_body:
+                        body = compressor.compress(body) + compressor.finish()
+                        headers["Content-Length"] = str(len(body))
+                        await send(start)
+                        return await send({**message, "body": body})
+                    del headers["Content-Length"]
+                await send(start)
+
+            if not compressing:
+                return await send(message)
+            # Streamed chunks are flushed so that each one reaches the client at once.
+            body = compressor.compress(body)
+            body += compressor.flush() if more_body else compressor.finish()
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, compressed_send)
+
+
+def parse_accept(accept: str) -> dict[str, float]:
+    """
+    Maps the media types of an Accept header to their quality values.
+    """
+    qualities = {}
+    for part in accept.split(","):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type:
+            qualities[media_type.lower()] = quality
+    return qualities
+
+
+class MessagePackMiddleware:
+    """
+    Lets clients exchange MessagePack instead of JSON with any JSON route.
+
+    Request bodies sent as application/msgpack are converted to JSON before the
+    application parses them, so the same request models validate them. JSON
+    responses are converted to MessagePack when the client prefers it in its
+    Accept header, so they keep the shape of the response models.
+    """
+
+    def __init__(self, app, max_body_size: int = 1024 * 1024):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    def wants_msgpack(self, headers: Headers) -> bool:
+        qualities = parse_accept(headers.get("accept", ""))
+        msgpack_quality = max(qualities.get(t, 0.0) for t in MSGPACK_MEDIA_TYPES)
+        return msgpack_quality > 0 and msgpack_quality >= qualities.get(
+            "application/json", 0.0
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type in MSGPACK_MEDIA_TYPES:
+            scope, receive = await self.convert_request(scope, receive, send)
+            if scope is None:
+                return
+        send = self.negotiating_send(send, self.wants_msgpack(headers))
+        await self.app(scope, receive, send)
+
+    async def convert_request(self, scope, receive, send):
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                return None, None
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if len(body) > self.max_body_size:
+                detail = f"Request body exceeds {self.max_body_size} bytes"
+                await self.error(413, detail, scope, receive, send)
+                return None, None
+        try:
+            body = json.dumps(msgpack.unpackb(body, raw=False)).encode()
+        except (ValueError, TypeError, msgpack.UnpackException):
+            await self.error(400, "Invalid MessagePack body", scope, receive, send)
+            return None, None
+
+        raw_headers = [
+            (name, value)
+            for name, value in scope["headers"]
+            if name not in (b"content-type", b"content-length")
+        ]
+        raw_headers += [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        sent = False
+
+        async def converted_receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return {**scope, "headers": raw_headers}, converted_receive
+
+    def negotiating_send(self, send, use_msgpack: bool):
+        start = None
+        converting = False
+        chunks = []
+
+        async def negotiated_send(message):
+            nonlocal start, converting
+            if message["type"] == "http.response.start":
+                start = message
+                headers = MutableHeaders(raw=start["headers"])
+                media_type = headers.get("content-type", "").split(";")[0].strip()
+                if media_type != "application/json":
+                    return await send(start)
+                headers.add_vary_header("Accept")
+                converting = use_msgpack and "content-encoding" not in headers
+                if not converting:
+                    await send(start)
+                return
+            if not converting or message["type"] != "http.response.body":
+                return await send(message)
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            if body:
+                body = msgpack.packb(orjson.loads(body), use_bin_type=True)
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Type"] = "application/msgpack"
+                headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        return negotiated_send
+
+    @staticmethod
+    async def error(status_code: int, detail: str, scope, receive, send):
+        response = JSONResponse(status_code=status_code, content={"detail": detail})
+        await response(scope, receive, send)
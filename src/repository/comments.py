@@ -1,8 +1,11 @@
 from datetime import datetime
+from typing import Dict, List
 
+from sqlalchemy import func, or_, select, update
 from sqlalchemy.orm import Session
 
-from src.database.models import Comment, User
+from src.database.models import Comment, Image, User
+from src.repository.tombstones import record_tombstone
 
 
 async def add_comment(text: str, image_id: int, user: User, db: Session):
@@ -17,14 +20,22 @@ async def add_comment(text: str, image_id: int, user: User, db: Session):
     Returns:
         Comment: The newly created comment.
     """
+    now = datetime.now()
     comment = Comment(
         text=text,
         image_id=image_id,
         user_id=user.id,
-        created_at=datetime.now(),
-        updated_at=datetime.now(),
+        created_at=now,
+        updated_at=now,
     )
     db.add(comment)
+    db.query(Image).filter(Image.id == image_id).update(
+        {
+            Image.comment_count: Image.comment_count + 1,
+            Image.last_commented_at: now,
+        },
+        synchronize_session=False,
+    )
     db.commit()
     db.refresh(comment)
     return comment
@@ -71,6 +82,22 @@ async def delete_comment(comment_id: int, user: User, db: Session):
     if comment.user_id != user.id:
         return None
     db.delete(comment)
+    owner_id = db.execute(
+        select(Image.user_id).where(Image.id == comment.image_id)
+    ).scalar()
+    await record_tombstone("comment", comment.id, owner_id, db)
+    latest = (
+        select(func.max(Comment.created_at))
+        .where(Comment.image_id == comment.image_id, Comment.id != comment.id)
+        .scalar_subquery()
+    )
+    db.query(Image).filter(Image.id == comment.image_id).update(
+        {
+            Image.comment_count: Image.comment_count - 1,
+            Image.last_commented_at: latest,
+        },
+        synchronize_session=False,
+    )
     db.commit()
     return comment
 
@@ -93,3 +120,126 @@ async def get_comments_by_image_id(image_id: int, db: Session):
     )
 
     return comments
+
+
+COMMENT_COLUMNS = {
+    "id": Comment.id,
+    "text": Comment.text,
+    "created_at": Comment.created_at,
+    "updated_at": Comment.updated_at,
+    "user_id": Comment.user_id,
+    "image_id": Comment.image_id,
+}
+
+
+async def get_comment_rows(
+    image_id: int, db: Session, fields: List[str] | None = None
+) -> List[dict]:
+    """Retrieves the comments of an image as response-ready dictionaries.
+
+    Args:
+        image_id (int): The ID of the image.\n
+        db (Session): The database session.\n
+        fields (List[str], optional): The CommentResponse fields to return; None for all.\n
+
+    Returns:
+        List[dict]: The comments in the shape of CommentResponse, newest first.
+    """
+    columns = [COMMENT_COLUMNS[name].label(name) for name in fields or COMMENT_COLUMNS]
+    rows = db.execute(
+        select(*columns)
+        .where(Comment.image_id == image_id)
+        .order_by(Comment.created_at.desc())
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+async def get_comments_version(image_id: int, db: Session):
+    """Retrieves the aggregates that change whenever the comments of an image change.
+
+    Args:
+        image_id (int): The ID of the image.\n
+        db (Session): The database session.\n
+
+    Returns:
+        Row: The comment count, the highest comment ID and the latest update.
+    """
+    return db.execute(
+        select(
+            func.count(Comment.id), func.max(Comment.id), func.max(Comment.updated_at)
+        ).where(Comment.image_id == image_id)
+    ).one()
+
+
+async def get_latest_comments_by_image_ids(
+    image_ids: List[int], per_image: int, db: Session
+) -> Dict[int, List[Comment]]:
+    """Retrieves the newest comments of several images with a single windowed query.
+
+    Args:
+        image_ids (List[int]): The IDs of the images.\n
+        per_image (int): The maximum number of comments per image.\n
+        db (Session): The database session.\n
+
+    Returns:
+        Dict[int, List[Comment]]: The newest comments, newest first, keyed by image ID.
+        Every requested ID is present, with an empty list if it has no comments.
+    """
+    row_number = (
+        func.row_number()
+        .over(
+            partition_by=Comment.image_id,
+            order_by=(Comment.created_at.desc(), Comment.id.desc()),
+        )
+        .label("row_number")
+    )
+    ranked = (
+        select(Comment.id, row_number)
+        .where(Comment.image_id.in_(image_ids))
+        .subquery()
+    )
+    comments = (
+        db.query(Comment)
+        .join(ranked, ranked.c.id == Comment.id)
+        .filter(ranked.c.row_number <= per_image)
+        .order_by(Comment.image_id, ranked.c.row_number)
+        .all()
+    )
+    result = {image_id: [] for image_id in image_ids}
+    for comment in comments:
+        result[comment.image_id].append(comment)
+    return result
+
+
+async def reconcile_comment_counts(db: Session) -> int:
+    """Recomputes the comment aggregates of images whose stored values drifted.
+
+    Args:
+        db (Session): The database session.\n
+
+    Returns:
+        int: The number of corrected images.
+    """
+    count = (
+        select(func.count(Comment.id))
+        .where(Comment.image_id == Image.id)
+        .scalar_subquery()
+    )
+    latest = (
+        select(func.max(Comment.created_at))
+        .where(Comment.image_id == Image.id)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(Image)
+        .where(
+            or_(
+                Image.comment_count != count,
+                Image.last_commented_at.is_distinct_from(latest),
+            )
+        )
+        .values(comment_count=count, last_commented_at=latest)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
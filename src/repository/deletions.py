@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from src.database.models import PendingDeletion
+
+
+async def enqueue_deletion(public_id: str, db: Session):
+    """Queues a remote asset for deletion.
+
+    The row is only added to the session, so it is committed together with the
+    change that made the asset obsolete.
+
+    Args:
+        public_id (str): The public ID of the asset in the storage.\n
+        db (Session): The database session.\n
+
+    Returns:
+        PendingDeletion: The queued deletion.
+    """
+    deletion = PendingDeletion(
+        public_id=public_id,
+        attempts=0,
+        next_attempt_at=datetime.now(),
+        created_at=datetime.now(),
+    )
+    db.add(deletion)
+    return deletion
+
+
+async def get_due_deletions(limit: int, db: Session) -> List[PendingDeletion]:
+    """Retrieves queued deletions whose next attempt is due.
+
+    Args:
+        limit (int): The maximum number of deletions to return.\n
+        db (Session): The database session.\n
+
+    Returns:
+        List[PendingDeletion]: The due deletions, oldest first.
+    """
+    return (
+        db.query(PendingDeletion)
+        .filter(PendingDeletion.next_attempt_at <= datetime.now())
+        .order_by(PendingDeletion.next_attempt_at)
+        .limit(limit)
+        .all()
+    )
+
+
+async def complete_deletions(deletions: List[PendingDeletion], db: Session):
+    """Removes finished deletions from the queue.
+
+    Args:
+        deletions (List[PendingDeletion]): The deletions that succeeded.\n
+        db (Session): The database session.\n
+    """
+    for deletion in deletions:
+        db.delete(deletion)
+    db.commit()
+
+
+async def retry_deletions(
+    deletions: List[PendingDeletion], error: str, max_backoff: int, db: Session
+):
+    """Reschedules failed deletions with exponential backoff.
+
+    Args:
+        deletions (List[PendingDeletion]): The deletions that failed.\n
+        error (str): The error to record.\n
+        max_backoff (int): The upper bound of the delay in seconds.\n
+        db (Session): The database session.\n
+    """
+    now = datetime.now()
+    for deletion in deletions:
+        deletion.attempts = (deletion.attempts or 0) + 1
+        delay = min(2**deletion.attempts, max_backoff)
+        deletion.next_attempt_at = now + timedelta(seconds=delay)
+        deletion.last_error = error[:255]
+    db.commit()
@@ -0,0 +1,142 @@
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.database.models import Follow, Image, User
+
+
+async def follow_user(follower: User, followed_id: int, db: Session) -> bool:
+    """Makes a user follow another user.
+
+    Args:
+        follower (User): The user who follows.\n
+        followed_id (int): The ID of the user to follow.\n
+        db (Session): The database session.\n
+
+    Returns:
+        bool: True if the follow was created, False if it already existed.
+    """
+    db.add(Follow(follower_id=follower.id, followed_id=followed_id))
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        return False
+    db.query(User).filter(User.id == followed_id).update(
+        {User.follower_count: User.follower_count + 1}, synchronize_session=False
+    )
+    db.commit()
+    return True
+
+
+async def unfollow_user(follower: User, followed_id: int, db: Session) -> bool:
+    """Removes a follow.
+
+    Args:
+        follower (User): The user who follows.\n
+        followed_id (int): The ID of the followed user.\n
+        db (Session): The database session.\n
+
+    Returns:
+        bool: True if a follow was removed, False if there was none.
+    """
+    removed = (
+        db.query(Follow)
+        .filter(Follow.follower_id == follower.id, Follow.followed_id == followed_id)
+        .delete(synchronize_session=False)
+    )
+    if removed:
+        db.query(User).filter(User.id == followed_id).update(
+            {User.follower_count: User.follower_count - removed},
+            synchronize_session=False,
+        )
+    db.commit()
+    return bool(removed)
+
+
+async def get_follower_ids(user_id: int, db: Session, limit: int) -> List[int]:
+    """Retrieves the IDs of a user's followers.
+
+    Args:
+        user_id (int): The ID of the followed user.\n
+        db (Session): The database session.\n
+        limit (int): The maximum number of IDs to return.\n
+
+    Returns:
+        List[int]: The follower IDs.
+    """
+    query = select(Follow.follower_id).where(Follow.followed_id == user_id).limit(limit)
+    return db.execute(query).scalars().all()
+
+
+async def get_popular_followed_ids(
+    user_id: int, min_followers: int, db: Session
+) -> List[int]:
+    """Retrieves the followed users whose images are not fanned out on write.
+
+    Args:
+        user_id (int): The ID of the follower.\n
+        min_followers (int): The follower count above which users are popular.\n
+        db (Session): The database session.\n
+
+    Returns:
+        List[int]: The IDs of the popular followed users.
+    """
+    query = (
+        select(User.id)
+        .join(Follow, Follow.followed_id == User.id)
+        .where(Follow.follower_id == user_id, User.follower_count > min_followers)
+    )
+    return db.execute(query).scalars().all()
+
+
+async def get_recent_image_ids(
+    user_ids: List[int], db: Session, before_id: int | None = None, limit: int = 20
+) -> List[int]:
+    """Retrieves the IDs of the newest images of some users.
+
+    Args:
+        user_ids (List[int]): The IDs of the authors.\n
+        db (Session): The database session.\n
+        before_id (int, optional): Only return images with a smaller ID.\n
+        limit (int): The maximum number of IDs to return.\n
+
+    Returns:
+        List[int]: The image IDs, newest first.
+    """
+    if not user_ids:
+        return []
+    query = select(Image.id).where(Image.user_id.in_(user_ids))
+    if before_id is not None:
+        query = query.where(Image.id < before_id)
+    query = query.order_by(Image.id.desc()).limit(limit)
+    return db.execute(query).scalars().all()
+
+
+async def get_followed_image_ids(
+    user_id: int, max_followers: int, db: Session, limit: int
+) -> List[int]:
+    """Retrieves the newest images of the users someone follows that are fanned out.
+
+    Used to rebuild a timeline that is missing from Redis.
+
+    Args:
+        user_id (int): The ID of the follower.\n
+        max_followers (int): The follower count up to which images are fanned out.\n
+        db (Session): The database session.\n
+        limit (int): The maximum number of IDs to return.\n
+
+    Returns:
+        List[int]: The image IDs, newest first.
+    """
+    query = (
+        select(Image.id)
+        .join(Follow, Follow.followed_id == Image.user_id)
+        .join(User, User.id == Image.user_id)
+        .where(Follow.follower_id == user_id, User.follower_count <= max_followers)
+        .order_by(Image.id.desc())
+        .limit(limit)
+    )
+    return db.execute(query).scalars().all()
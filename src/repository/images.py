@@ -1,16 +1,30 @@
 from datetime import datetime
 from typing import List
 
-import cloudinary.uploader
-from sqlalchemy import text, and_
-from sqlalchemy.orm import Session
+from sqlalchemy import text, and_, delete, exists, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased, selectinload
 
-from src.database.models import Image, User
-from src.utils.tags import get_tags_from_description
+from src.database.models import CompletedUpload, Image, Tag, User, image_m2m_tag
+from src.repository.deletions import enqueue_deletion
+from src.repository.search import index_image_description, remove_image_from_index
+from src.repository.tags import get_or_create_tags
+from src.repository.tombstones import record_tombstone
+from src.utils.tags import (
+    MAX_TAGS_PER_IMAGE,
+    get_tags_from_description,
+    parse_tag_names,
+)
 
 
 async def add_image(
-    image_url: str, public_id: str, description: str, user: User, db: Session
+    image_url: str,
+    public_id: str,
+    description: str,
+    user: User,
+    db: Session,
+    content_hash: str | None = None,
+    variants: dict | None = None,
 ):
     """Adds an image to the repository.
 
@@ -20,6 +34,8 @@ async def add_image(
         description (str): The description of the image.\n
         user (User): The user who uploaded the image.\n
         db (Session): The database session.\n
+        content_hash (str, optional): The SHA-256 hex digest of the image bytes.\n
+        variants (dict, optional): The URLs of the eager variants keyed by profile name.\n
 
     Returns:
         Image: The added image object.
@@ -27,6 +43,8 @@ async def add_image(
     image = Image(
         url=image_url,
         public_id=public_id,
+        content_hash=content_hash,
+        variants=variants,
         description=description,
         user_id=user.id,
         created_at=datetime.now(),
@@ -34,13 +52,18 @@ async def add_image(
     )
     image.tags = await get_tags_from_description(image.description, db)
     db.add(image)
+    db.flush()
+    await index_image_description(image, db)
     db.commit()
     db.refresh(image)
     return image
 
 
 async def delete_image(image_id: int, user: User, db: Session):
-    """Deletes an image from the database and Cloudinary.
+    """Deletes an image from the database and queues its Cloudinary asset for deletion.
+
+    Deduplicated uploads share one asset, so the asset is only queued when no other
+    image references it.
 
     Args:
         image_id (int): The ID of the image to be deleted.\n
@@ -57,8 +80,11 @@ async def delete_image(image_id: int, user: User, db: Session):
         .first()
     )
     if image:
-        cloudinary.uploader.destroy(image.public_id)
+        if not await count_asset_references(image.public_id, db, exclude_id=image.id):
+            await enqueue_deletion(image.public_id, db)
+        await remove_image_from_index(image.id, db)
         db.delete(image)
+        await record_tombstone("image", image.id, user.id, db)
         db.commit()
     return image
 
@@ -66,6 +92,9 @@ async def delete_image(image_id: int, user: User, db: Session):
 async def edit_description(image_id: int, description: str, user: User, db: Session):
     """Updates the description of an image.
 
+    Only the tag links that changed are inserted or deleted, and the tags are not
+    touched at all when the description has the same set of hashtags.
+
     Args:
         image_id (int): The ID of the image to be edited.\n
         description (str): The new description for the image.\n
@@ -82,9 +111,37 @@ async def edit_description(image_id: int, description: str, user: User, db: Sess
         .first()
     )
     if image:
+        links = image_m2m_tag.c
+        old_tags = dict(
+            db.execute(
+                select(Tag.name, Tag.id)
+                .join(image_m2m_tag, links.tag == Tag.id)
+                .where(links.image == image.id)
+            ).all()
+        )
+        new_tag_names = parse_tag_names(description)[:MAX_TAGS_PER_IMAGE]
+        tags_changed = set(new_tag_names) != set(old_tags)
+        if tags_changed:
+            removed_ids = [
+                tag_id for name, tag_id in old_tags.items() if name not in new_tag_names
+            ]
+            if removed_ids:
+                db.execute(
+                    delete(image_m2m_tag).where(
+                        links.image == image.id, links.tag.in_(removed_ids)
+                    )
+                )
+            added = await get_or_create_tags(
+                db, [name for name in new_tag_names if name not in old_tags]
+            )
+            if added:
+                db.execute(
+                    insert(image_m2m_tag),
+                    [{"image": image.id, "tag": tag.id} for tag in added],
+                )
         image.description = description
-        image.tags = await get_tags_from_description(description, db)
         image.updated_at = datetime.now()
+        await index_image_description(image, db)
         db.commit()
     return image
 
@@ -102,6 +159,234 @@ async def get_images(user: User, db: Session):
     return db.query(Image).filter(Image.user_id == user.id).all()
 
 
+IMAGE_COLUMNS = {
+    "id": Image.id,
+    "description": Image.description,
+    "url": Image.url,
+    "variants": Image.variants,
+    "comment_count": Image.comment_count,
+    "last_commented_at": Image.last_commented_at,
+    "created_at": Image.created_at,
+    "updated_at": Image.updated_at,
+}
+
+
+async def select_image_rows(condition, fields: List[str] | None, db: Session):
+    """Selects images as response-ready dictionaries, restricted to some fields.
+
+    Only the columns of the requested fields are selected, and the tag names are
+    read with one extra query only when tags are requested.
+
+    Args:
+        condition: The filter of the images.\n
+        fields (List[str], optional): The ImageResponse fields; None for all.\n
+        db (Session): The database session.\n
+
+    Returns:
+        List[dict]: The images with the requested fields, oldest first.
+    """
+    fields = fields or [*IMAGE_COLUMNS, "tags"]
+    with_tags = "tags" in fields
+    names = [name for name in fields if name in IMAGE_COLUMNS]
+    if with_tags and "id" not in names:
+        names.append("id")
+    images = [
+        dict(row._mapping)
+        for row in db.execute(
+            select(*(IMAGE_COLUMNS[name].label(name) for name in names))
+            .where(condition)
+            .order_by(Image.id)
+        )
+    ]
+    if not with_tags:
+        return images
+
+    by_id = {image["id"]: image for image in images}
+    for image in images:
+        image["tags"] = []
+    links = image_m2m_tag.c
+    tag_rows = db.execute(
+        select(links.image, Tag.name)
+        .join(Tag, Tag.id == links.tag)
+        .join(Image, Image.id == links.image)
+        .where(condition)
+        .order_by(links.id)
+    )
+    for image_id, name in tag_rows:
+        if image_id in by_id:
+            by_id[image_id]["tags"].append({"name": name})
+    if "id" not in fields:
+        for image in images:
+            del image["id"]
+    return images
+
+
+async def get_image_rows(
+    user: User, db: Session, fields: List[str] | None = None
+) -> List[dict]:
+    """Retrieves the images of a user as response-ready dictionaries.
+
+    Selects only the response columns and the tag names, without building ORM
+    objects, for list responses that are encoded without model validation.
+
+    Args:
+        user (User): The user object.\n
+        db (Session): The database session.\n
+        fields (List[str], optional): The ImageResponse fields to return; None for all.\n
+
+    Returns:
+        List[dict]: The images in the shape of ImageResponse, oldest first.
+    """
+    return await select_image_rows(Image.user_id == user.id, fields, db)
+
+
+async def get_image_row(
+    image_id: int, user: User, db: Session, fields: List[str] | None = None
+) -> dict | None:
+    """Retrieves one image of a user as a response-ready dictionary.
+
+    Args:
+        image_id (int): The ID of the image.\n
+        user (User): The user object representing the owner of the image.\n
+        db (Session): The database session.\n
+        fields (List[str], optional): The ImageResponse fields to return; None for all.\n
+
+    Returns:
+        dict: The image in the shape of ImageResponse, or None if it does not exist.
+    """
+    rows = await select_image_rows(
+        and_(Image.id == image_id, Image.user_id == user.id), fields, db
+    )
+    return rows[0] if rows else None
+
+
+async def get_image_rows_by_ids(
+    image_ids: List[int], user: User, db: Session, fields: List[str] | None = None
+) -> tuple[List[dict], List[int]]:
+    """Retrieves images of a user by ID as response-ready dictionaries in one query.
+
+    Args:
+        image_ids (List[int]): The distinct IDs of the images.\n
+        user (User): The user object representing the owner of the images.\n
+        db (Session): The database session.\n
+        fields (List[str], optional): The ImageResponse fields to return; None for all.\n
+
+    Returns:
+        tuple: The user's images in the order of the IDs, and the IDs that do not
+        exist or belong to other users.
+    """
+    names = fields and list(dict.fromkeys(["id", *fields]))
+    rows = await select_image_rows(
+        and_(Image.id.in_(image_ids), Image.user_id == user.id), names, db
+    )
+    by_id = {row["id"]: row for row in rows}
+    images = [by_id[image_id] for image_id in image_ids if image_id in by_id]
+    missing = [image_id for image_id in image_ids if image_id not in by_id]
+    if fields and "id" not in fields:
+        for image in images:
+            del image["id"]
+    return images, missing
+
+
+async def get_images_version(user: User, db: Session):
+    """Retrieves the aggregates that change whenever the user's image list changes.
+
+    Args:
+        user (User): The user object.\n
+        db (Session): The database session.\n
+
+    Returns:
+        Row: The image count, the latest update, the total comment count and the
+        latest comment time.
+    """
+    return db.execute(
+        select(
+            func.count(Image.id),
+            func.max(Image.updated_at),
+            func.coalesce(func.sum(Image.comment_count), 0),
+            func.max(Image.last_commented_at),
+        ).where(Image.user_id == user.id)
+    ).one()
+
+
+async def get_image_version(image_id: int, user: User, db: Session):
+    """Retrieves the columns that change whenever an image's response changes.
+
+    Args:
+        image_id (int): The ID of the image.\n
+        user (User): The user object representing the owner of the image.\n
+        db (Session): The database session.\n
+
+    Returns:
+        Row: The update time, comment count and latest comment time, or None if
+        the image does not exist.
+    """
+    return db.execute(
+        select(Image.updated_at, Image.comment_count, Image.last_commented_at).where(
+            Image.id == image_id, Image.user_id == user.id
+        )
+    ).first()
+
+
+async def get_comment_stats(image_id: int, db: Session):
+    """Retrieves the comment aggregates of an image of any user.
+
+    Args:
+        image_id (int): The ID of the image.\n
+        db (Session): The database session.\n
+
+    Returns:
+        Row: The comment count and latest comment time, or None if the image does
+        not exist.
+    """
+    return db.execute(
+        select(Image.comment_count, Image.last_commented_at).where(
+            Image.id == image_id
+        )
+    ).first()
+
+
+async def get_feed_images(
+    db: Session, before_id: int | None = None, limit: int = 20
+) -> List[Image]:
+    """Retrieves the newest images of all users, with keyset pagination on the ID.
+
+    Args:
+        db (Session): The database session.\n
+        before_id (int, optional): Only return images with a smaller ID (the cursor).\n
+        limit (int): The maximum number of images to return.\n
+
+    Returns:
+        List[Image]: The images, newest first, with their tags loaded.
+    """
+    query = db.query(Image).options(selectinload(Image.tags))
+    if before_id is not None:
+        query = query.filter(Image.id < before_id)
+    return query.order_by(Image.id.desc()).limit(limit).all()
+
+
+async def get_images_by_ids(image_ids: List[int], db: Session) -> List[Image]:
+    """Retrieves images by ID in one query, in the order of the IDs.
+
+    Args:
+        image_ids (List[int]): The IDs of the images.\n
+        db (Session): The database session.\n
+
+    Returns:
+        List[Image]: The existing images with their tags loaded; missing IDs are skipped.
+    """
+    if not image_ids:
+        return []
+    images = (
+        db.query(Image)
+        .options(selectinload(Image.tags))
+        .filter(Image.id.in_(image_ids))
+        .all()
+    )
+    by_id = {image.id: image for image in images}
+    return [by_id[image_id] for image_id in image_ids if image_id in by_id]
+
+
 async def get_image(image_id: int, user: User, db: Session):
     """Retrieves an image from the database.
 
@@ -118,3 +403,150 @@ async def get_image(image_id: int, user: User, db: Session):
         .filter(and_(Image.id == image_id, Image.user_id == user.id))
         .first()
     )
+
+
+async def get_image_by_content_hash(content_hash: str, db: Session):
+    """Retrieves any stored image with the given content hash.
+
+    Args:
+        content_hash (str): The SHA-256 hex digest of the image bytes.\n
+        db (Session): The database session.\n
+
+    Returns:
+        Image: An image with the same content, or None if there is none.
+    """
+    return db.query(Image).filter(Image.content_hash == content_hash).first()
+
+
+async def count_asset_references(
+    public_id: str, db: Session, exclude_id: int | None = None
+) -> int:
+    """Counts the images that reference a stored asset.
+
+    Args:
+        public_id (str): The public ID of the asset.\n
+        db (Session): The database session.\n
+        exclude_id (int, optional): An image ID to leave out of the count.\n
+
+    Returns:
+        int: The number of referencing images.
+    """
+    query = db.query(Image).filter(Image.public_id == public_id)
+    if exclude_id is not None:
+        query = query.filter(Image.id != exclude_id)
+    return query.count()
+
+
+async def claim_upload(public_id: str, user: User, db: Session) -> bool:
+    """Claims a direct upload so that it can be completed only once.
+
+    The claim is flushed in a savepoint but not committed, so it is committed
+    together with the image row. A concurrent claim of the same public ID waits for
+    that commit and then fails on the primary key, which rolls back only the
+    savepoint.
+
+    Args:
+        public_id (str): The public ID of the uploaded asset.\n
+        user (User): The user who completes the upload.\n
+        db (Session): The database session.\n
+
+    Returns:
+        bool: True if the upload was claimed, False if it was already completed.
+    """
+    try:
+        with db.begin_nested():
+            db.add(CompletedUpload(public_id=public_id, user_id=user.id))
+    except IntegrityError:
+        return False
+    return True
+
+
+TAG_RARITY_PROBE_LIMIT = 10000
+
+
+async def get_tag_ids_by_rarity(tag_names: List[str], db: Session) -> List[int]:
+    """Resolves tag names to IDs ordered from the rarest to the most used tag.
+
+    Usage is probed with a capped count per tag, so the cost of ranking does not
+    grow with the popularity of common tags.
+
+    Args:
+        tag_names (List[str]): The tag names.\n
+        db (Session): The database session.\n
+
+    Returns:
+        List[int]: The IDs of the existing tags, rarest first.
+    """
+    tag_ids = [
+        row.id for row in db.query(Tag.id).filter(Tag.name.in_(tag_names)).all()
+    ]
+    usage = {}
+    for tag_id in tag_ids:
+        probe = (
+            select(image_m2m_tag.c.image)
+            .where(image_m2m_tag.c.tag == tag_id)
+            .limit(TAG_RARITY_PROBE_LIMIT)
+            .subquery()
+        )
+        usage[tag_id] = db.execute(select(func.count()).select_from(probe)).scalar()
+    return sorted(tag_ids, key=usage.get)
+
+
+async def search_images_by_tags(
+    tag_names: List[str],
+    match_all: bool,
+    db: Session,
+    owner_id: int | None = None,
+    before_id: int | None = None,
+    limit: int = 20,
+) -> List[Image]:
+    """Finds images by tags, newest first, with keyset pagination on the image ID.
+
+    AND searches are driven by the rarest tag's index range and check the remaining
+    tags with index lookups; OR searches read the index ranges of all tags.
+
+    Args:
+        tag_names (List[str]): The tag names to search for.\n
+        match_all (bool): True to require every tag, False to require any of them.\n
+        db (Session): The database session.\n
+        owner_id (int, optional): Only return images of this user.\n
+        before_id (int, optional): Only return images with a smaller ID (the cursor).\n
+        limit (int): The maximum number of images to return.\n
+
+    Returns:
+        List[Image]: The matching images with their tags loaded.
+    """
+    tag_ids = await get_tag_ids_by_rarity(tag_names, db)
+    if not tag_ids or (match_all and len(tag_ids) < len(set(tag_names))):
+        return []
+
+    links = image_m2m_tag.c
+    if match_all:
+        query = select(links.image).where(links.tag == tag_ids[0])
+        for tag_id in tag_ids[1:]:
+            other = aliased(image_m2m_tag)
+            query = query.where(
+                exists().where(
+                    and_(other.c.image == links.image, other.c.tag == tag_id)
+                )
+            )
+    else:
+        query = select(links.image).where(links.tag.in_(tag_ids)).distinct()
+    if owner_id is not None:
+        query = query.join(Image, Image.id == links.image).where(
+            Image.user_id == owner_id
+        )
+    if before_id is not None:
+        query = query.where(links.image < before_id)
+    query = query.order_by(links.image.desc()).limit(limit)
+
+    image_ids = db.execute(query).scalars().all()
+    if not image_ids:
+        return []
+    return (
+        db.query(Image)
+        .options(selectinload(Image.tags))
+        .filter(Image.id.in_(image_ids))
+        .order_by(Image.id.desc())
+        .all()
+    )
@@ -0,0 +1,179 @@
+import re
+from typing import List, Tuple
+
+from sqlalchemy import REAL, and_, cast, func, literal, or_, text
+from sqlalchemy.orm import Session, selectinload
+
+from src.conf.config import settings
+from src.database.models import Image
+
+FTS_TABLE = "images_fts"
+
+
+def is_postgres(db: Session) -> bool:
+    """Tells whether the session is bound to PostgreSQL.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        bool: True for PostgreSQL, False for the SQLite FTS5 fallback.
+    """
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def ensure_fts_table(db: Session):
+    """Creates the SQLite FTS5 table if it does not exist yet.
+
+    Args:
+        db (Session): The database session.
+    """
+    db.execute(
+        text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(description)")
+    )
+
+
+def to_fts5_query(query: str) -> str:
+    """Turns free text into an FTS5 query that matches all of its words.
+
+    Args:
+        query (str): The user's search text.
+
+    Returns:
+        str: The FTS5 MATCH expression, empty if the text has no words.
+    """
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", query))
+
+
+async def index_image_description(image: Image, db: Session):
+    """Updates the full-text index entry of an image.
+
+    The change is part of the current transaction; the caller commits it. The image
+    must already have an ID.
+
+    Args:
+        image (Image): The image whose description changed.\n
+        db (Session): The database session.\n
+    """
+    description = image.description or ""
+    if is_postgres(db):
+        image.search_vector = func.to_tsvector(settings.fulltext_config, description)
+        return
+    ensure_fts_table(db)
+    db.execute(
+        text(
+            f"INSERT OR REPLACE INTO {FTS_TABLE}(rowid, description) "
+            "VALUES (:id, :description)"
+        ),
+        {"id": image.id, "description": description},
+    )
+
+
+async def remove_image_from_index(image_id: int, db: Session):
+    """Removes an image from the SQLite full-text index.
+
+    PostgreSQL keeps the vector on the image row, so nothing is needed there.
+
+    Args:
+        image_id (int): The ID of the deleted image.\n
+        db (Session): The database session.\n
+    """
+    if is_postgres(db):
+        return
+    ensure_fts_table(db)
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": image_id})
+
+
+def encode_search_cursor(rank: float, image_id: int) -> str:
+    return f"{rank!r}:{image_id}"
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    rank, image_id = cursor.rsplit(":", 1)
+    return float(rank), int(image_id)
+
+
+async def search_images_by_text(
+    query: str,
+    db: Session,
+    cursor: str | None = None,
+    limit: int = 20,
+) -> Tuple[List[Image], str | None]:
+    """Searches image descriptions, best matches first.
+
+    Uses the GIN-indexed tsvector column on PostgreSQL and the FTS5 table on
+    SQLite. Pages are keyed by (rank, id), so results stay stable between pages.
+
+    Args:
+        query (str): The search text.\n
+        db (Session): The database session.\n
+        cursor (str, optional): The next_cursor of the previous page.\n
+        limit (int): The page size.\n
+
+    Returns:
+        Tuple[List[Image], str | None]: The images with tags loaded, and the cursor of
+        the next page or None.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    after = decode_search_cursor(cursor) if cursor else None
+    if is_postgres(db):
+        rows = _search_postgres(query, after, limit, db)
+    else:
+        rows = _search_sqlite(query, after, limit, db)
+    if not rows:
+        return [], None
+
+    images = {
+        image.id: image
+        for image in db.query(Image)
+        .options(selectinload(Image.tags))
+        .filter(Image.id.in_([image_id for image_id, _ in rows]))
+        .all()
+    }
+    ordered = [images[image_id] for image_id, _ in rows if image_id in images]
+    next_cursor = None
+    if len(rows) == limit:
+        last_id, last_rank = rows[-1]
+        next_cursor = encode_search_cursor(last_rank, last_id)
+    return ordered, next_cursor
+
+
+def _search_postgres(query, after, limit, db):
+    ts_query = func.websearch_to_tsquery(settings.fulltext_config, query)
+    rank = func.ts_rank(Image.search_vector, ts_query)
+    statement = db.query(Image.id, rank.label("rank")).filter(
+        Image.search_vector.op("@@")(ts_query)
+    )
+    if after:
+        # ts_rank returns real; comparing it with a double parameter never finds
+        # the ties, so the cursor rank is compared at the same precision.
+        after_rank = cast(literal(after[0]), REAL)
+        statement = statement.filter(
+            or_(rank < after_rank, and_(rank == after_rank, Image.id < after[1]))
+        )
+    rows = statement.order_by(rank.desc(), Image.id.desc()).limit(limit).all()
+    return [(row.id, row.rank) for row in rows]
+
+
+def _search_sqlite(query, after, limit, db):
+    match = to_fts5_query(query)
+    if not match:
+        return []
+    ensure_fts_table(db)
+    # bm25() is lower for better matches; it is negated to sort like ts_rank.
+    sql = (
+        f"SELECT rowid AS id, -bm25({FTS_TABLE}) AS rank FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH :match"
+    )
+    params = {"match": match, "limit": limit}
+    if after:
+        sql += (
+            f" AND (-bm25({FTS_TABLE}) < :rank"
+            f" OR (-bm25({FTS_TABLE}) = :rank AND rowid < :id))"
+        )
+        params.update({"rank": after[0], "id": after[1]})
+    sql += " ORDER BY rank DESC, rowid DESC LIMIT :limit"
+    rows = db.execute(text(sql), params).all()
+    return [(row.id, row.rank) for row in rows]
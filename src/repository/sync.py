@@ -0,0 +1,119 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import and_, or_, select, true
+from sqlalchemy.orm import Session
+
+from src.database.models import Comment, Image, Tombstone, User
+from src.repository.comments import COMMENT_COLUMNS
+
+# A position in a change stream: the time of the last returned change and its ID,
+# or no ID to continue strictly after the time.
+Position = tuple[datetime | None, int | None]
+
+
+def after_position(time_column, id_column, position: Position):
+    """Builds the keyset condition of the changes after a stream position.
+
+    Args:
+        time_column: The change time column.\n
+        id_column: The ID column that orders changes made at the same time.\n
+        position (Position): The position of the last returned change.\n
+
+    Returns:
+        The filter condition.
+    """
+    changed_at, last_id = position
+    if changed_at is None:
+        return true()
+    if last_id is None:
+        return time_column > changed_at
+    return or_(
+        time_column > changed_at,
+        and_(time_column == changed_at, id_column > last_id),
+    )
+
+
+async def get_changed_images(
+    user: User, position: Position, until: datetime, limit: int, db: Session
+):
+    """Retrieves the IDs and update times of a user's changed images.
+
+    Args:
+        user (User): The owner of the images.\n
+        position (Position): The position of the last returned change.\n
+        until (datetime): The latest update time to include.\n
+        limit (int): The maximum number of images.\n
+        db (Session): The database session.\n
+
+    Returns:
+        List[Row]: The image IDs and update times, in change order.
+    """
+    return db.execute(
+        select(Image.id, Image.updated_at)
+        .where(
+            Image.user_id == user.id,
+            Image.updated_at <= until,
+            after_position(Image.updated_at, Image.id, position),
+        )
+        .order_by(Image.updated_at, Image.id)
+        .limit(limit)
+    ).all()
+
+
+async def get_changed_comment_rows(
+    user: User, position: Position, until: datetime, limit: int, db: Session
+) -> List[dict]:
+    """Retrieves the changed comments on a user's images as response-ready dictionaries.
+
+    Args:
+        user (User): The owner of the images.\n
+        position (Position): The position of the last returned change.\n
+        until (datetime): The latest update time to include.\n
+        limit (int): The maximum number of comments.\n
+        db (Session): The database session.\n
+
+    Returns:
+        List[dict]: The comments in the shape of CommentResponse, in change order.
+    """
+    rows = db.execute(
+        select(*(column.label(name) for name, column in COMMENT_COLUMNS.items()))
+        .join(Image, Image.id == Comment.image_id)
+        .where(
+            Image.user_id == user.id,
+            Comment.updated_at <= until,
+            after_position(Comment.updated_at, Comment.id, position),
+        )
+        .order_by(Comment.updated_at, Comment.id)
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+async def get_tombstones(
+    user: User, position: Position, until: datetime, limit: int, db: Session
+):
+    """Retrieves the deletions in a user's library.
+
+    Args:
+        user (User): The owner of the library.\n
+        position (Position): The position of the last returned deletion.\n
+        until (datetime): The latest deletion time to include.\n
+        limit (int): The maximum number of deletions.\n
+        db (Session): The database session.\n
+
+    Returns:
+        List[Row]: The tombstone IDs, kinds, object IDs and deletion times, in order.
+    """
+    return db.execute(
+        select(
+            Tombstone.id, Tombstone.kind, Tombstone.object_id, Tombstone.deleted_at
+        )
+        .where(
+            Tombstone.owner_id == user.id,
+            Tombstone.deleted_at <= until,
+            after_position(Tombstone.deleted_at, Tombstone.id, position),
+        )
+        .order_by(Tombstone.deleted_at, Tombstone.id)
+        .limit(limit)
+    ).all()
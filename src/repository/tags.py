@@ -1,20 +1,46 @@
+from typing import List
+
 from sqlalchemy.orm import Session
 
-from src.database.models import Tag
+from src.database.models import Tag, image_m2m_tag
+
+
+async def get_or_create_tags(db: Session, names: List[str]) -> List[Tag]:
+    """
+    Retrieves several tags with one query and creates the missing ones.
+
+    Args:
+        db (Session): The database session.\n
+        names (List[str]): The names of the tags.\n
+
+    Returns:
+        List[Tag]: The tags, in the order of the names.
+    """
+    if not names:
+        return []
+    existing = {tag.name: tag for tag in db.query(Tag).filter(Tag.name.in_(names))}
+    missing = [Tag(name=name) for name in names if name not in existing]
+    if missing:
+        db.add_all(missing)
+        db.flush()
+        existing.update((tag.name, tag) for tag in missing)
+    return [existing[name] for name in names]
 
 
-async def get_or_create_tag(db: Session, name: str):
+async def get_image_tag_names(db: Session, image_id: int) -> List[str]:
     """
-    Retrieves a tag from the database with the given name, or creates a new tag if it doesn't exist.
+    Retrieves the names of the tags linked to an image.
 
     Args:
         db (Session): The database session.\n
-        name (str): The name of the tag.\n
+        image_id (int): The ID of the image.\n
 
     Returns:
-        Tag: The retrieved or created tag.
+        List[str]: The tag names.
     """
-    tag = db.query(Tag).filter(Tag.name == name).first()
-    if not tag:
-        tag = Tag(name=name)
-    return tag
+    return [
+        name
+        for name, in db.query(Tag.name)
+        .join(image_m2m_tag, image_m2m_tag.c.tag == Tag.id)
+        .filter(image_m2m_tag.c.image == image_id)
+    ]
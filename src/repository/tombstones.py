@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from src.database.models import Tombstone
+
+
+async def record_tombstone(kind: str, object_id: int, owner_id: int, db: Session):
+    """Records a deletion for delta sync, committed with the deletion itself.
+
+    Args:
+        kind (str): "image" or "comment".\n
+        object_id (int): The ID of the deleted row.\n
+        owner_id (int): The ID of the user whose library contained the row.\n
+        db (Session): The database session.\n
+    """
+    db.add(
+        Tombstone(
+            kind=kind,
+            object_id=object_id,
+            owner_id=owner_id,
+            deleted_at=datetime.now(),
+        )
+    )
+
+
+async def prune_tombstones(before: datetime, db: Session) -> int:
+    """Deletes the tombstones that are older than any accepted sync token.
+
+    Args:
+        before (datetime): The oldest deletion time to keep.\n
+        db (Session): The database session.\n
+
+    Returns:
+        int: The number of deleted tombstones.
+    """
+    deleted = (
+        db.query(Tombstone)
+        .filter(Tombstone.deleted_at < before)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
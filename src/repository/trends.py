@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy.orm import Session
+
+from src.database.models import TagTrend
+
+
+async def save_tag_trend_bucket(bucket: datetime, counts: Dict[str, int], db: Session):
+    """Stores the tag usage counts of one hourly bucket, replacing earlier copies.
+
+    Args:
+        bucket (datetime): The start of the hour.\n
+        counts (Dict[str, int]): Usage counts keyed by tag name.\n
+        db (Session): The database session.\n
+    """
+    db.query(TagTrend).filter(TagTrend.bucket == bucket).delete(
+        synchronize_session=False
+    )
+    db.add_all(
+        TagTrend(tag_name=name, bucket=bucket, count=count)
+        for name, count in counts.items()
+    )
+    db.commit()
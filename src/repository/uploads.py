@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+from typing import List
+from uuid import uuid4
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from src.database.models import UploadSession, User
+
+
+async def create_upload_session(
+    total_size: int,
+    checksum: str | None,
+    description: str,
+    ttl: int,
+    user: User,
+    db: Session,
+):
+    """Creates a resumable upload session.
+
+    Args:
+        total_size (int): The size of the whole file in bytes.\n
+        checksum (str | None): The expected SHA-256 hex digest of the whole file.\n
+        description (str): The description of the future image.\n
+        ttl (int): The lifetime of the session in seconds.\n
+        user (User): The user who uploads the file.\n
+        db (Session): The database session.\n
+
+    Returns:
+        UploadSession: The new session.
+    """
+    session = UploadSession(
+        id=str(uuid4()),
+        user_id=user.id,
+        description=description,
+        total_size=total_size,
+        received=0,
+        checksum=checksum,
+        created_at=datetime.now(),
+        expires_at=datetime.now() + timedelta(seconds=ttl),
+    )
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+    return session
+
+
+async def get_upload_session(upload_id: str, user: User, db: Session):
+    """Retrieves an unexpired upload session of the user.
+
+    Args:
+        upload_id (str): The ID of the session.\n
+        user (User): The owner of the session.\n
+        db (Session): The database session.\n
+
+    Returns:
+        UploadSession: The session, or None if it does not exist or has expired.
+    """
+    return (
+        db.query(UploadSession)
+        .filter(
+            and_(
+                UploadSession.id == upload_id,
+                UploadSession.user_id == user.id,
+                UploadSession.expires_at > datetime.now(),
+            )
+        )
+        .first()
+    )
+
+
+async def claim_session(
+    session: UploadSession, offset: int, lease: int, db: Session
+) -> bool:
+    """Claims the session for writing the chunk that starts at the given offset.
+
+    Finalizing claims the session at the offset of the total size. The claim is a
+    single conditional update, so of several concurrent requests for the same
+    session only one succeeds. It expires after the lease in case the request
+    dies before releasing it.
+
+    Args:
+        session (UploadSession): The upload session.\n
+        offset (int): The position of the chunk in the file, or the total size.\n
+        lease (int): The lifetime of the claim in seconds.\n
+        db (Session): The database session.\n
+
+    Returns:
+        bool: True if the session was claimed, False if the offset is stale or it is busy.
+    """
+    now = datetime.now()
+    claimed = (
+        db.query(UploadSession)
+        .filter(
+            and_(
+                UploadSession.id == session.id,
+                UploadSession.received == offset,
+                or_(
+                    UploadSession.locked_until.is_(None),
+                    UploadSession.locked_until <= now,
+                ),
+            )
+        )
+        .update(
+            {UploadSession.locked_until: now + timedelta(seconds=lease)},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return claimed == 1
+
+
+async def release_session(session: UploadSession, db: Session):
+    """Releases the claim of a chunk that was not stored or an upload that was not
+    finalized.
+
+    Args:
+        session (UploadSession): The upload session.\n
+        db (Session): The database session.\n
+    """
+    session.locked_until = None
+    db.commit()
+
+
+async def update_received(session: UploadSession, received: int, db: Session):
+    """Records how many bytes of the session have been stored and releases the claim.
+
+    Args:
+        session (UploadSession): The upload session.\n
+        received (int): The new number of received bytes.\n
+        db (Session): The database session.\n
+
+    Returns:
+        UploadSession: The updated session.
+    """
+    session.received = received
+    session.locked_until = None
+    db.commit()
+    return session
+
+
+async def delete_upload_session(session: UploadSession, db: Session):
+    """Deletes an upload session.
+
+    Args:
+        session (UploadSession): The session to delete.\n
+        db (Session): The database session.\n
+    """
+    db.delete(session)
+    db.commit()
+
+
+async def get_expired_upload_sessions(limit: int, db: Session) -> List[UploadSession]:
+    """Retrieves sessions whose lifetime is over.
+
+    Args:
+        limit (int): The maximum number of sessions to return.\n
+        db (Session): The database session.\n
+
+    Returns:
+        List[UploadSession]: The expired sessions.
+    """
+    return (
+        db.query(UploadSession)
+        .filter(UploadSession.expires_at <= datetime.now())
+        .limit(limit)
+        .all()
+    )
@@ -1,4 +1,5 @@
 from libgravatar import Gravatar
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from src.database.models import User
@@ -37,6 +38,29 @@ async def get_user_by_username(db: Session, username: str) -> User:
     return db.query(User).filter(User.username == username).first()
 
 
+async def get_user_columns_by_username(
+    db: Session, username: str, names: List[str]
+) -> dict | None:
+    """
+    Retrieves some columns of a user, always including the ID.
+
+    Args:
+        db (Session): The database session.\n
+        username (str): The username of the user to retrieve.\n
+        names (List[str]): The names of the User columns to select.\n
+
+    Returns:
+        dict: The selected columns keyed by name, or None if the user does not exist.
+    """
+    names = list(dict.fromkeys(["id", *names]))
+    row = db.execute(
+        select(*(getattr(User, name) for name in names)).where(
+            User.username == username
+        )
+    ).first()
+    return dict(zip(names, row)) if row else None
+
+
 async def create_user(body: UserModel, db: Session) -> User:
     """
     Creates a new user in the database.
@@ -142,4 +166,5 @@ async def update_avatar(email, url: str, db: Session) -> User:
     user = await get_user_by_email(email, db)
     user.avatar = url
     db.commit()
+    db.refresh(user)
     return user
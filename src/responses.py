@@ -0,0 +1,5 @@
+from fastapi.responses import ORJSONResponse
+
+# orjson encodes several times faster than the standard library and handles
+# datetimes natively.
+DefaultJSONResponse = ORJSONResponse
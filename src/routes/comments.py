@@ -1,15 +1,59 @@
-from fastapi import APIRouter, Request, Depends, HTTPException, status
+from fastapi import APIRouter, Request, Depends, HTTPException, Query, status
 
 from src.database.db import get_db
 from src.limiter import limiter
 from src.repository import comments as comments_repository
 from src.database.models import UserRole
-from src.schemas import CommentResponse
+from src.schemas import CommentResponse, ImageCommentsResponse
 from src.services.auth import auth_service
+from src.services.comment_events import comment_events
+from src.services.image_updates import publish_comment_stats
 
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
+MAX_BULK_IMAGES = 100
+
+
+@router.get("/", response_model=list[ImageCommentsResponse])
+@limiter.limit(limit_value="60/minute")
+async def get_latest_comments(
+    request: Request,
+    image_ids: list[int] | None = Query(None),
+    per_image: int = Query(3, ge=1, le=50),
+    db=Depends(get_db),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Retrieves the newest comments of several images in one request.
+
+    Args:
+        request (Request): The request object.\n
+        image_ids (list[int]): The IDs of the images, e.g. ?image_ids=1&image_ids=2.\n
+        per_image (int): The maximum number of comments per image.\n
+        db: The database dependency.\n
+        user: The current user dependency.\n
+
+    Returns:
+        list: The newest comments of each image, in the requested order.
+
+    Raises:
+        HTTPException: If no image or more than MAX_BULK_IMAGES images are requested.
+    """
+    image_ids = list(dict.fromkeys(image_ids or []))
+    if not image_ids or len(image_ids) > MAX_BULK_IMAGES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Provide between 1 and {MAX_BULK_IMAGES} image IDs",
+        )
+    comments = await comments_repository.get_latest_comments_by_image_ids(
+        image_ids=image_ids, per_image=per_image, db=db
+    )
+    return [
+        {"image_id": image_id, "comments": comments[image_id]}
+        for image_id in image_ids
+    ]
+
 
 @router.post("/", response_model=CommentResponse)
 @limiter.limit(limit_value="10/minute")
@@ -33,9 +77,12 @@ async def add_comment(
         The added comment.
 
     """
-    return await comments_repository.add_comment(
+    comment = await comments_repository.add_comment(
         text=text, image_id=image_id, user=user, db=db
     )
+    comment_events.publish("created", comment)
+    await publish_comment_stats(comment.image_id, db)
+    return comment
 
 
 @router.put("/{comment_id}", response_model=CommentResponse)
@@ -69,9 +116,12 @@ async def edit_comment(
             detail="Comment text cannot be empty or contain only whitespace",
         )
 
-    return await comments_repository.edit_comment(
+    comment = await comments_repository.edit_comment(
         text=text, comment_id=comment_id, user=user, db=db
     )
+    if comment:
+        comment_events.publish("updated", comment)
+    return comment
 
 
 @router.delete("/{comment_id}", response_model=CommentResponse)
@@ -103,6 +153,10 @@ async def delete_comment(
             detail="Only administrators and moderators can delete comments",
         )
 
-    return await comments_repository.delete_comment(
+    comment = await comments_repository.delete_comment(
         comment_id=comment_id, user=user, db=db
     )
+    if comment:
+        comment_events.publish("deleted", comment)
+        await publish_comment_stats(comment.image_id, db)
+    return comment
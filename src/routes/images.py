@@ -1,16 +1,57 @@
-from fastapi import APIRouter, Request, Depends, HTTPException, UploadFile, File
-from fastapi.responses import Response
+from typing import Literal
+
+from fastapi import (
+    APIRouter,
+    Request,
+    Depends,
+    HTTPException,
+    UploadFile,
+    File,
+    Query,
+    Header,
+)
+from fastapi.responses import Response, StreamingResponse
 
 from src.database.db import get_db
 from src.limiter import limiter
 from src.repository import images as images_repository
 from src.repository import comments as comments_repository
-from src.schemas import ImageResponse, CommentResponse
+from src.repository import search as search_repository
+from src.repository import tags as tags_repository
+from src.responses import DefaultJSONResponse
+from src.schemas import (
+    ImageResponse,
+    ImageBatch,
+    ImagePage,
+    RankedImagePage,
+    CommentResponse,
+    UploadSignatureResponse,
+)
 from src.services.auth import auth_service
-from src.services.images import image_service
+from src.services.comment_events import comment_events
+from src.services.feed import feed_cache
+from src.services.images import image_service, QR_MEDIA_TYPES
+from src.services.image_updates import publish_new_image, record_tag_usage
+from src.services.timelines import timeline_service
+from src.utils.conditional import (
+    cache_headers,
+    is_not_modified,
+    not_modified,
+    weak_etag,
+)
+from src.utils.fields import parse_fields
+from src.utils.tags import check_tag_limit
 
 router = APIRouter(prefix="/images", tags=["images"])
 
+MAX_SEARCH_TAGS = 10
+MAX_BATCH_IDS = 100
+
+# Clients may store these responses but must revalidate them on every use.
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return, e.g. id,url; all by default"
+
 
 @router.post("/", response_model=ImageResponse)
 @limiter.limit(limit_value="10/minute")
@@ -37,14 +78,91 @@ async def add_image(
     Raises:
         HTTPException: If there is an error uploading the image or adding it to the database.
     """
-    image_info = await image_service.upload_image(file=file)
-    return await images_repository.add_image(
+    check_tag_limit(description)
+    image_info = await image_service.upload_image(file=file, db=db)
+    image = await images_repository.add_image(
         image_url=image_info["url"],
         public_id=image_info["public_id"],
         description=description,
         user=user,
         db=db,
+        content_hash=image_info["content_hash"],
+        variants=image_info["variants"],
+    )
+    await publish_new_image(image, db)
+    return image
+
+
+@router.post("/upload_signature", response_model=UploadSignatureResponse)
+@limiter.limit(limit_value="10/minute")
+async def create_upload_signature(
+    request: Request,
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Issues short-lived signed parameters for uploading an image directly to storage.
+
+    Args:
+        request (Request): The incoming request object.\n
+        user: The current user dependency.\n
+
+    Returns:
+        dict: The upload URL, signed upload parameters and an upload token.
+    """
+    return image_service.create_upload_signature(user)
+
+
+@router.post("/complete_upload", response_model=ImageResponse)
+@limiter.limit(limit_value="10/minute")
+async def complete_upload(
+    request: Request,
+    upload_token: str,
+    version: int,
+    signature: str,
+    description: str = "",
+    db=Depends(get_db),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Registers an image that the client uploaded directly to storage.
+
+    Args:
+        request (Request): The incoming request object.\n
+        upload_token (str): The token issued with the upload signature.\n
+        version (int): The asset version returned by the storage.\n
+        signature (str): The response signature returned by the storage.\n
+        description (str, optional): The description of the image. Defaults to "".\n
+        db: The database dependency.\n
+        user: The current user dependency.\n
+
+    Returns:
+        The added image.
+
+    Raises:
+        HTTPException: If the token does not belong to the user, the upload cannot be verified or it was already completed.
+    """
+    check_tag_limit(description)
+    payload = await auth_service.decode_upload_token(upload_token)
+    if payload.get("sub") != user.email:
+        raise HTTPException(status_code=403, detail="Upload token belongs to another user")
+    public_id = payload["public_id"]
+    if await images_repository.count_asset_references(public_id, db):
+        raise HTTPException(status_code=409, detail="Upload already completed")
+    image_info = await image_service.verify_direct_upload(
+        public_id=public_id, version=version, signature=signature, db=db
+    )
+    if not await images_repository.claim_upload(public_id, user, db):
+        raise HTTPException(status_code=409, detail="Upload already completed")
+    image = await images_repository.add_image(
+        image_url=image_info["url"],
+        public_id=public_id,
+        description=description,
+        user=user,
+        db=db,
+        variants=image_info["variants"],
     )
+    await publish_new_image(image, db)
+    return image
 
 
 @router.delete("/{image_id}", response_model=ImageResponse)
@@ -73,6 +191,8 @@ async def delete_image(
     image = await images_repository.delete_image(image_id=image_id, user=user, db=db)
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
+    record_tag_usage([tag.name for tag in image.tags], [])
+    feed_cache.invalidate()
     return image
 
 
@@ -99,35 +219,317 @@ async def edit_description(
         The edited image.
 
     Raises:
-        HTTPException: If the image is not found.
+        HTTPException: If the description has too many tags or the image is not found.
     """
+    check_tag_limit(description)
+    old_tag_names = await tags_repository.get_image_tag_names(db, image_id)
     image = await images_repository.edit_description(
         image_id=image_id, description=description, user=user, db=db
     )
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
+    record_tag_usage(old_tag_names, [tag.name for tag in image.tags])
+    feed_cache.invalidate()
     return image
 
 
+@router.get("/search", response_model=ImagePage)
+@limiter.limit(limit_value="30/minute")
+async def search_images(
+    request: Request,
+    tags: str = Query(min_length=1),
+    mode: Literal["all", "any"] = "all",
+    owner_id: int | None = None,
+    cursor: int | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    db=Depends(get_db),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Searches images by tags.
+
+    Args:
+        request (Request): The incoming request object.\n
+        tags (str): Comma-separated tag names, with or without a leading #.\n
+        mode (str): "all" to require every tag, "any" to require at least one.\n
+        owner_id (int, optional): Only return images of this user.\n
+        cursor (int, optional): The next_cursor of the previous page.\n
+        limit (int): The page size.\n
+        db: The database dependency.\n
+        user: The current user dependency.\n
+
+    Returns:
+        dict: The matching images, newest first, and the cursor of the next page.
+    """
+    tag_names = [name.strip().lstrip("#") for name in tags.split(",")]
+    tag_names = list(dict.fromkeys(name for name in tag_names if name))
+    if not tag_names or len(tag_names) > MAX_SEARCH_TAGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Provide between 1 and {MAX_SEARCH_TAGS} tags",
+        )
+    images = await images_repository.search_images_by_tags(
+        tag_names=tag_names,
+        match_all=mode == "all",
+        owner_id=owner_id,
+        before_id=cursor,
+        limit=limit,
+        db=db,
+    )
+    next_cursor = images[-1].id if len(images) == limit else None
+    return {"items": images, "next_cursor": next_cursor}
+
+
+@router.get("/search/text", response_model=RankedImagePage)
+@limiter.limit(limit_value="30/minute")
+async def search_images_by_text(
+    request: Request,
+    q: str = Query(min_length=1, max_length=200),
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    db=Depends(get_db),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Searches image descriptions with full-text search, best matches first.
+
+    Args:
+        request (Request): The incoming request object.\n
+        q (str): The search text.\n
+        cursor (str, optional): The next_cursor of the previous page.\n
+        limit (int): The page size.\n
+        db: The database dependency.\n
+        user: The current user dependency.\n
+
+    Returns:
+        dict: The matching images and the cursor of the next page.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        images, next_cursor = await search_repository.search_images_by_text(
+            query=q, cursor=cursor, limit=limit, db=db
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": images, "next_cursor": next_cursor}
+
+
+@router.get("/feed", response_model=ImagePage)
+@limiter.limit(limit_value="120/minute")
+async def get_feed(
+    request: Request,
+    cursor: int | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    db=Depends(get_db),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Retrieves the newest images of all users.
+
+    The first page is served from the cached feed head and later pages from
+    cached response bodies, so the database is only read on a cache miss.
+
+    Args:
+        request (Request): The incoming request object.\n
+        cursor (int, optional): The next_cursor of the previous page.\n
+        limit (int): The page size.\n
+        db: The database dependency.\n
+        user: The current user dependency.\n
+
+    Returns:
+        dict: The images, newest first, and the cursor of the next page.
+    """
+    if cursor is None and limit <= feed_cache.size:
+        body = feed_cache.get_head(limit)
+        if body is None:
+            version = feed_cache.head_version()
+            images = await images_repository.get_feed_images(
+                db=db, limit=feed_cache.size + 1
+            )
+            feed_cache.set_head(images, version)
+            items = [feed_cache.serialize(image) for image in images[: limit + 1]]
+            body = feed_cache.page_body(items, limit)
+    elif cursor is None:
+        images = await images_repository.get_feed_images(db=db, limit=limit + 1)
+        items = [feed_cache.serialize(image) for image in images]
+        body = feed_cache.page_body(items, limit)
+    else:
+        body = feed_cache.get_page(cursor, limit)
+        if body is None:
+            images = await images_repository.get_feed_images(
+                db=db, before_id=cursor, limit=limit + 1
+            )
+            items = [feed_cache.serialize(image) for image in images]
+            body = feed_cache.page_body(items, limit)
+            feed_cache.set_page(cursor, limit, [image.id for image in images], items)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/timeline", response_model=ImagePage)
+@limiter.limit(limit_value="120/minute")
+async def get_timeline(
+    request: Request,
+    cursor: int | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    db=Depends(get_db),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Retrieves the newest images of the users the current user follows.
+
+    Args:
+        request (Request): The incoming request object.\n
+        cursor (int, optional): The next_cursor of the previous page.\n
+        limit (int): The page size.\n
+        db: The database dependency.\n
+        user: The current user dependency.\n
+
+    Returns:
+        dict: The images, newest first, and the cursor of the next page.
+    """
+    image_ids, next_cursor = await timeline_service.read(
+        user.id, db, before_id=cursor, limit=limit
+    )
+    images = await images_repository.get_images_by_ids(image_ids, db)
+    return {"items": images, "next_cursor": next_cursor}
+
+
+@router.get("/batch", response_model=ImageBatch)
+@limiter.limit(limit_value="30/minute")
+async def get_images_batch(
+    request: Request,
+    ids: str = Query(min_length=1),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db=Depends(get_db),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Retrieves several images by ID in one request.
+
+    Args:
+        request (Request): The incoming request object.\n
+        ids (str): Comma-separated image IDs.\n
+        fields (str, optional): Comma-separated ImageResponse fields to return.\n
+        db: The database dependency.\n
+        user: The current user dependency.\n
+
+    Returns:
+        dict: The user's images in the order of the IDs, and the IDs that were not
+        found or belong to other users.
+    """
+    field_names = parse_fields(fields, ImageResponse)
+    try:
+        image_ids = [int(image_id) for image_id in ids.split(",") if image_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Image IDs must be integers")
+    image_ids = list(dict.fromkeys(image_ids))
+    if not image_ids or len(image_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Provide between 1 and {MAX_BATCH_IDS} image IDs",
+        )
+    images, missing = await images_repository.get_image_rows_by_ids(
+        image_ids, user, db, fields=field_names
+    )
+    return DefaultJSONResponse({"items": images, "missing": missing})
+
+
+@router.get("/generate_qr_code")
+@router.post("/generate_qr_code")
+@limiter.limit(limit_value="10/minute")
+async def generate_qr_code(
+    image_url: str,
+    request: Request,
+    box_size: int = Query(10, ge=1, le=40),
+    border: int = Query(4, ge=0, le=20),
+    error_correction: Literal["L", "M", "Q", "H"] = "L",
+    format: Literal["png", "svg"] = "png",
+    user=Depends(auth_service.get_current_user),
+):
+    """Generates a QR code for the given image URL.
+
+    Args:
+        image_url (str): The URL of the image to generate the QR code for.\n
+        request (Request): The incoming request object.\n
+        box_size (int): The size of a single QR module in pixels.\n
+        border (int): The width of the quiet zone in modules.\n
+        error_correction (str): The error correction level, one of L, M, Q, H.\n
+        format (str): The output format, png or svg.\n
+        user: The current user (optional).\n
+
+    Returns:
+        Response: The response containing the generated QR code as content, or an
+        empty 304 response when the client's cached copy is still valid.
+    """
+    if user:
+        etag = image_service.qr_code_etag(
+            image_url, box_size, border, error_correction, format
+        )
+        headers = {
+            "content-disposition": "inline",
+            "ETag": etag,
+            "Cache-Control": "private, max-age=86400",
+        }
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        qr_code = await image_service.generate_qr_code(
+            image_url=image_url,
+            box_size=box_size,
+            border=border,
+            error_correction=error_correction,
+            fmt=format,
+        )
+        return Response(
+            content=qr_code,
+            media_type=QR_MEDIA_TYPES[format],
+            headers=headers,
+            status_code=200,
+        )
+
+
 @router.get("/", response_model=list[ImageResponse])
 @limiter.limit(limit_value="10/minute")
 async def get_images(
     request: Request,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
     db=Depends(get_db),
     user=Depends(auth_service.get_current_user),
 ):
     """
     Retrieves images for the current user.
 
+    Answers a revalidation with an empty 304 response after one aggregate query
+    when the list has not changed. Otherwise the list is encoded straight from the
+    selected rows. Only the ETag validates the list: deleting an image does not
+    move the newest update time, so no Last-Modified is sent.
+
     Args:
         request (Request): The incoming request object.\n
+        fields (str, optional): Comma-separated ImageResponse fields to return.\n
         db: The database dependency.\n
         user: The current user dependency.\n
 
     Returns:
         List[Image]: A list of images belonging to the current user.
     """
-    return await images_repository.get_images(user=user, db=db)
+    field_names = parse_fields(fields, ImageResponse)
+    count, updated_at, comment_count, commented_at = (
+        await images_repository.get_images_version(user=user, db=db)
+    )
+    etag = weak_etag(
+        user.id, count, updated_at, comment_count, commented_at, field_names
+    )
+    headers = cache_headers(etag, None, PRIVATE_CACHE_CONTROL)
+    if is_not_modified(request, etag):
+        return not_modified(headers)
+    images = await images_repository.get_image_rows(
+        user=user, db=db, fields=field_names
+    )
+    return DefaultJSONResponse(images, headers=headers)
 
 
 @router.get("/{image_id}", response_model=ImageResponse)
@@ -135,15 +537,22 @@ async def get_images(
 async def get_image(
     request: Request,
     image_id: int,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
     db=Depends(get_db),
     user=Depends(auth_service.get_current_user),
 ):
     """
     Retrieves an image with the specified image_id.
 
+    Answers a revalidation with an empty 304 response before the image and its
+    tags are loaded when the image has not changed. Only the ETag validates the
+    image: deleting its newest comment moves the last comment time back, so no
+    Last-Modified is sent.
+
     Args:
         request (Request): The incoming request object.\n
         image_id (int): The ID of the image to retrieve.\n
+        fields (str, optional): Comma-separated ImageResponse fields to return.\n
         db: The database dependency.\n
         user: The user dependency.\n
 
@@ -153,10 +562,23 @@ async def get_image(
     Raises:
         HTTPException: If the image is not found.
     """
-    image = await images_repository.get_image(image_id=image_id, user=user, db=db)
+    field_names = parse_fields(fields, ImageResponse)
+    version = await images_repository.get_image_version(
+        image_id=image_id, user=user, db=db
+    )
+    if not version:
+        raise HTTPException(status_code=404, detail="Image not found")
+    updated_at, comment_count, commented_at = version
+    etag = weak_etag(image_id, updated_at, comment_count, commented_at, field_names)
+    headers = cache_headers(etag, None, PRIVATE_CACHE_CONTROL)
+    if is_not_modified(request, etag):
+        return not_modified(headers)
+    image = await images_repository.get_image_row(
+        image_id=image_id, user=user, db=db, fields=field_names
+    )
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
-    return image
+    return DefaultJSONResponse(image, headers=headers)
 
 
 @router.get("/{image_id}/comments", response_model=list[CommentResponse])
@@ -164,44 +586,70 @@ async def get_image(
 async def get_comments_by_image_id(
     request: Request,
     image_id: int,
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
     db=Depends(get_db),
     user=Depends(auth_service.get_current_user),
 ):
     """
     Retrieves comments for a specific image by its ID.
 
+    Answers a revalidation with an empty 304 response after one aggregate query
+    when the comments have not changed. Otherwise the list is encoded straight from
+    the selected rows. Only the ETag validates the list: deleting a comment does
+    not move the newest update time, so no Last-Modified is sent.
+
     Args:
         request (Request): The incoming request object.\n
         image_id (int): The ID of the image.\n
+        fields (str, optional): Comma-separated CommentResponse fields to return.\n
         db: The database dependency.\n
         user: The current user dependency.\n
 
     Returns:
         List[Comment]: A list of comments associated with the image.
     """
-    return await comments_repository.get_comments_by_image_id(image_id=image_id, db=db)
+    field_names = parse_fields(fields, CommentResponse)
+    count, last_id, updated_at = await comments_repository.get_comments_version(
+        image_id=image_id, db=db
+    )
+    etag = weak_etag(image_id, count, last_id, updated_at, field_names)
+    headers = cache_headers(etag, None, PRIVATE_CACHE_CONTROL)
+    if is_not_modified(request, etag):
+        return not_modified(headers)
+    comments = await comments_repository.get_comment_rows(
+        image_id=image_id, db=db, fields=field_names
+    )
+    return DefaultJSONResponse(comments, headers=headers)
 
 
-@router.post("/generate_qr_code")
+@router.get("/{image_id}/comments/stream")
 @limiter.limit(limit_value="10/minute")
-async def generate_qr_code(
-    image_url: str, request: Request, user=Depends(auth_service.get_current_user)
+async def stream_comments(
+    request: Request,
+    image_id: int,
+    last_event_id: str | None = Header(None, pattern=r"^\d+-\d+$"),
+    user=Depends(auth_service.get_current_user_without_session),
 ):
-    """Generates a QR code for the given image URL.
+    """
+    Streams created, updated and deleted comments of an image as server-sent events.
+
+    A reconnecting client sends the Last-Event-ID header and first receives the
+    events it missed. A reset event tells it that they are no longer available and
+    the comment list has to be fetched again. The user is loaded with a session
+    that is closed before streaming starts, so no database connection is held
+    for the lifetime of the stream.
 
     Args:
-        image_url (str): The URL of the image to generate the QR code for.\n
         request (Request): The incoming request object.\n
-        user: The current user (optional).\n
+        image_id (int): The ID of the image.\n
+        last_event_id (str, optional): The ID of the last event the client received.\n
+        user: The current user dependency.\n
 
     Returns:
-        Response: The response containing the generated QR code as content.
+        StreamingResponse: The text/event-stream response.
     """
-    if user:
-        qr_code = await image_service.generate_qr_code(image_url=image_url)
-        return Response(
-            content=qr_code,
-            media_type="image/png",
-            headers={"content-disposition": "inline"},
-            status_code=200,
-        )
+    return StreamingResponse(
+        comment_events.stream(image_id, last_event_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
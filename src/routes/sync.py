@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Request, Depends, Query
+
+from src.database.db import get_db
+from src.limiter import limiter
+from src.responses import DefaultJSONResponse
+from src.schemas import SyncPage
+from src.services.auth import auth_service
+from src.services.sync import sync_service
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("/", response_model=SyncPage)
+@limiter.limit(limit_value="60/minute")
+async def sync(
+    request: Request,
+    token: str | None = None,
+    limit: int = Query(100, ge=1, le=500),
+    db=Depends(get_db),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Returns the changes in the current user's images and their comments since a sync token.
+
+    Without a token every image and comment is returned. Request pages with the
+    returned sync_token while has_more is true, then keep the last token for the
+    next sync. An expired token is answered with 410, after which the client syncs
+    again without a token. Synced images have no comment aggregates; clients count
+    the synced comments of each image instead.
+
+    Args:
+        request (Request): The incoming request object.\n
+        token (str, optional): The sync_token of the previous response.\n
+        limit (int): The maximum number of images, comments and deletions per page.\n
+        db: The database dependency.\n
+        user: The current user dependency.\n
+
+    Returns:
+        dict: The changed images and comments, the deleted IDs, the next sync token
+        and whether more pages follow.
+    """
+    changes = await sync_service.changes(user, token, limit, db)
+    return DefaultJSONResponse(changes)
@@ -0,0 +1,59 @@
+from typing import Literal
+
+from fastapi import APIRouter, Request, Depends, Query
+
+from src.limiter import limiter
+from src.schemas import TagSuggestion, TrendingTag
+from src.services.auth import auth_service
+from src.services.tag_index import tag_index
+from src.services.trending import trending_tags
+
+router = APIRouter(prefix="/tags", tags=["tags"])
+
+
+@router.get("/autocomplete", response_model=list[TagSuggestion])
+@limiter.limit(limit_value="120/minute")
+async def autocomplete(
+    request: Request,
+    prefix: str = Query(min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=50),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Suggests tags that start with the typed prefix, most used first.
+
+    Args:
+        request (Request): The incoming request object.\n
+        prefix (str): The typed prefix, with or without a leading #.\n
+        limit (int): The maximum number of suggestions.\n
+        user: The current user dependency.\n
+
+    Returns:
+        list: The suggested tags with their usage counts.
+    """
+    suggestions = tag_index.suggest(prefix.lstrip("#"), limit)
+    return [{"name": name, "count": count} for name, count in suggestions]
+
+
+@router.get("/trending", response_model=list[TrendingTag])
+@limiter.limit(limit_value="60/minute")
+async def trending(
+    request: Request,
+    window: Literal["hour", "day", "week"] = "day",
+    limit: int = Query(10, ge=1, le=100),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Returns the tags attached most often during the last hour, day or week.
+
+    Args:
+        request (Request): The incoming request object.\n
+        window (str): The time window, one of hour, day or week.\n
+        limit (int): The maximum number of tags.\n
+        user: The current user dependency.\n
+
+    Returns:
+        list: The trending tags with their attachment counts.
+    """
+    top = trending_tags.top(window, limit)
+    return [{"name": name, "count": count} for name, count in top]
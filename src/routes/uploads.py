@@ -0,0 +1,177 @@
+from fastapi import APIRouter, Request, Depends, HTTPException, Header, Query, status
+
+from src.conf.config import settings
+from src.database.db import get_db
+from src.limiter import limiter
+from src.repository import images as images_repository
+from src.repository import uploads as uploads_repository
+from src.schemas import ImageResponse, UploadSessionResponse
+from src.services.auth import auth_service
+from src.services.image_updates import publish_new_image
+from src.services.images import image_service
+from src.services.uploads import upload_service
+from src.utils.tags import check_tag_limit
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+
+async def get_session_or_404(upload_id: str, user, db):
+    session = await uploads_repository.get_upload_session(upload_id, user, db)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return session
+
+
+def session_response(session) -> dict:
+    return {
+        "id": session.id,
+        "total_size": session.total_size,
+        "received": session.received,
+        "chunk_size": upload_service.chunk_size,
+        "expires_at": session.expires_at,
+    }
+
+
+@router.post(
+    "/", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED
+)
+@limiter.limit(limit_value="10/minute")
+async def create_upload(
+    request: Request,
+    total_size: int = Query(
+        gt=0, le=min(settings.upload_max_size, settings.image_max_bytes)
+    ),
+    checksum: str | None = Query(None, min_length=64, max_length=64),
+    description: str = "",
+    db=Depends(get_db),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Starts a resumable upload.
+
+    Files larger than the stored image limit are refused here rather than after
+    the whole file has been uploaded.
+
+    Args:
+        request (Request): The incoming request object.\n
+        total_size (int): The size of the whole file in bytes.\n
+        checksum (str, optional): The SHA-256 hex digest of the whole file.\n
+        description (str, optional): The description of the image. Defaults to "".\n
+        db: The database dependency.\n
+        user: The current user dependency.\n
+
+    Returns:
+        dict: The new upload session.
+    """
+    check_tag_limit(description)
+    session = await uploads_repository.create_upload_session(
+        total_size=total_size,
+        checksum=checksum,
+        description=description,
+        ttl=settings.upload_session_ttl,
+        user=user,
+        db=db,
+    )
+    await upload_service.create_file(session)
+    return session_response(session)
+
+
+@router.get("/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload(
+    upload_id: str,
+    db=Depends(get_db),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Returns the state of an upload, so an interrupted client knows where to resume.
+
+    Args:
+        upload_id (str): The ID of the upload session.\n
+        db: The database dependency.\n
+        user: The current user dependency.\n
+
+    Returns:
+        dict: The upload session.
+    """
+    session = await get_session_or_404(upload_id, user, db)
+    return session_response(session)
+
+
+@router.put("/{upload_id}", response_model=UploadSessionResponse)
+async def upload_chunk(
+    request: Request,
+    upload_id: str,
+    offset: int = Query(ge=0),
+    checksum: str = Header(alias="X-Chunk-SHA256", min_length=64, max_length=64),
+    db=Depends(get_db),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Stores the request body as the chunk starting at the given offset.
+
+    Args:
+        request (Request): The incoming request object, whose body is the chunk.\n
+        upload_id (str): The ID of the upload session.\n
+        offset (int): The position of the chunk in the file.\n
+        checksum (str): The SHA-256 hex digest of the chunk.\n
+        db: The database dependency.\n
+        user: The current user dependency.\n
+
+    Returns:
+        dict: The updated upload session.
+    """
+    session = await get_session_or_404(upload_id, user, db)
+    session = await upload_service.write_chunk(
+        session, offset, request.stream(), checksum, db
+    )
+    return session_response(session)
+
+
+@router.post("/{upload_id}/finalize", response_model=ImageResponse)
+@limiter.limit(limit_value="10/minute")
+async def finalize_upload(
+    request: Request,
+    upload_id: str,
+    db=Depends(get_db),
+    user=Depends(auth_service.get_current_user),
+):
+    """
+    Completes an upload, stores the file and adds the image to the database.
+
+    Args:
+        request (Request): The incoming request object.\n
+        upload_id (str): The ID of the upload session.\n
+        db: The database dependency.\n
+        user: The current user dependency.\n
+
+    Returns:
+        The added image.
+
+    Raises:
+        HTTPException: If the upload is incomplete or another request is finalizing it.
+    """
+    session = await get_session_or_404(upload_id, user, db)
+    file = await upload_service.open_completed(session, db)
+    try:
+        image_info = await image_service.upload_image(
+            file=file,
+            db=db,
+            content_hash=session.checksum.lower() if session.checksum else None,
+        )
+    except BaseException:
+        await upload_service.release(session, db)
+        raise
+    finally:
+        await file.close()
+    image = await images_repository.add_image(
+        image_url=image_info["url"],
+        public_id=image_info["public_id"],
+        description=session.description,
+        user=user,
+        db=db,
+        content_hash=image_info["content_hash"],
+        variants=image_info["variants"],
+    )
+    await publish_new_image(image, db)
+    await upload_service.discard(session, db)
+    return image
@@ -1,19 +1,39 @@
-from fastapi import APIRouter, Depends, status, UploadFile, File, HTTPException
+from fastapi import (
+    APIRouter,
+    Depends,
+    status,
+    UploadFile,
+    File,
+    HTTPException,
+    Query,
+    Request,
+)
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-import cloudinary
-import cloudinary.uploader
+from sqlalchemy import desc, func
 
 
 from src.database.db import get_db
 from src.database.models import User, Image, UserRole
 from src.schemas import UserUpdate, UserResponse, UserResponseProfile, UserDb
 from src.repository import users as repository_users
+from src.repository import follows as repository_follows
+from src.responses import DefaultJSONResponse
 from src.services.auth import auth_service
-from src.conf.config import settings
+from src.services.images import image_service
+from src.services.timelines import timeline_service
+from src.utils.fields import parse_fields
+from src.utils.conditional import (
+    cache_headers,
+    is_not_modified,
+    not_modified,
+    weak_etag,
+)
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Profiles are public and may be cached briefly by clients and shared caches.
+PROFILE_CACHE_CONTROL = "public, max-age=60"
+
 
 @router.patch("/{user_id}")
 async def update_user(
@@ -77,33 +97,79 @@ async def update_avatar_user(
         User: The updated user object.
 
     Raises:
-        None
+        HTTPException: If the file is not a valid image.
 
     """
-    cloudinary.config(
-        cloud_name=settings.cloudinary_name,
-        api_key=settings.cloudinary_api_key,
-        api_secret=settings.cloudinary_api_secret,
-        secure=True,
-    )
-
-    cloudinary.uploader.upload(
-        file.file, public_id=f"NotesApp/{current_user.username}", overwrite=True
-    )
-    src_url = cloudinary.CloudinaryImage(f"NotesApp/{current_user.username}").build_url(
-        width=250, height=250, crop="fill"
-    )
+    src_url = await image_service.upload_avatar(file, current_user)
     user = await repository_users.update_avatar(current_user.email, src_url, db)
+    auth_service.cache_user(user)
     return user
 
 
+@router.post("/{user_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+async def follow(
+    user_id: int,
+    current_user: User = Depends(auth_service.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Follows a user, adding their recent images to the home timeline.
+
+    Args:
+        user_id (int): The ID of the user to follow.\n
+        current_user (User, optional): The current authenticated user. Defaults to Depends(auth_service.get_current_user).\n
+        db (Session, optional): The database session. Defaults to Depends(get_db).\n
+
+    Raises:
+        HTTPException: If the user does not exist or is the current user.
+    """
+    if user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="You cannot follow yourself")
+    if db.query(User.id).filter(User.id == user_id).first() is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if await repository_follows.follow_user(current_user, user_id, db):
+        await timeline_service.add_followed(current_user.id, user_id, db)
+
+
+@router.delete("/{user_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+async def unfollow(
+    user_id: int,
+    current_user: User = Depends(auth_service.get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Unfollows a user, removing their images from the home timeline.
+
+    Args:
+        user_id (int): The ID of the user to unfollow.\n
+        current_user (User, optional): The current authenticated user. Defaults to Depends(auth_service.get_current_user).\n
+        db (Session, optional): The database session. Defaults to Depends(get_db).\n
+
+    Raises:
+        HTTPException: If the current user does not follow the user.
+    """
+    if not await repository_follows.unfollow_user(current_user, user_id, db):
+        raise HTTPException(status_code=404, detail="Not following this user")
+    await timeline_service.remove_followed(current_user.id, user_id, db)
+
+
 @router.get("/{username}", response_model=UserResponseProfile)
-async def user_profile(username: str, db: Session = Depends(get_db)):
+async def user_profile(
+    username: str,
+    request: Request,
+    fields: str | None = Query(
+        None,
+        description="Comma-separated fields to return, e.g. user.username,image_count",
+    ),
+    db: Session = Depends(get_db),
+):
     """
     Retrieves the profile information of a user.
 
     Args:
         username (str): The username of the user.\n
+        request (Request): The incoming request object.\n
+        fields (str, optional): Comma-separated UserResponseProfile fields to return; user.<name> selects single user fields.\n
         db (Session, optional): The database session. Defaults to Depends(get_db).\n
 
     Returns:
@@ -112,21 +178,33 @@ async def user_profile(username: str, db: Session = Depends(get_db)):
     Raises:
         HTTPException: If the user is not found in the database.
     """
-    user = await repository_users.get_user_by_username(db, username)
+    field_names = parse_fields(fields, UserResponseProfile)
+    wanted = field_names or list(UserResponseProfile.model_fields)
+    user_names = [name[len("user.") :] for name in wanted if name.startswith("user.")]
+    if "user" in wanted:
+        user_names = list(UserDb.model_fields)
+    user = await repository_users.get_user_columns_by_username(db, username, user_names)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    images = db.query(Image).filter(Image.user_id == user.id).all()
-    image_count = len(images)
-
-    last_image_id = (
-        db.query(Image)
-        .filter(Image.user_id == user.id)
-        .order_by(desc(Image.created_at))
-        .first()
-        .id
-        if image_count > 0
-        else None
-    )
-
-    return {"user": user, "image_count": image_count, "last_image_id": last_image_id}
+    profile = {}
+    if user_names:
+        profile["user"] = {name: user[name] for name in user_names}
+    if "image_count" in wanted:
+        profile["image_count"] = (
+            db.query(func.count(Image.id)).filter(Image.user_id == user["id"]).scalar()
+        )
+    if "last_image_id" in wanted:
+        profile["last_image_id"] = (
+            db.query(Image.id)
+            .filter(Image.user_id == user["id"])
+            .order_by(desc(Image.created_at))
+            .limit(1)
+            .scalar()
+        )
+
+    etag = weak_etag(profile)
+    headers = cache_headers(etag, None, PROFILE_CACHE_CONTROL)
+    if is_not_modified(request, etag):
+        return not_modified(headers)
+    return DefaultJSONResponse(profile, headers=headers)
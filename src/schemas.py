@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, EmailStr
 from datetime import datetime
 
@@ -8,15 +8,64 @@ class Tag(BaseModel):
     name: str
 
 
+class TagSuggestion(BaseModel):
+    name: str
+    count: int
+
+
+class TrendingTag(BaseModel):
+    name: str
+    count: int
+
+
 class ImageResponse(BaseModel):
     id: int
     description: str
     url: str
+    variants: Optional[dict[str, str]] = None
     tags: list[Tag]
+    comment_count: int = 0
+    last_commented_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
 
+class ImagePage(BaseModel):
+    items: list[ImageResponse]
+    next_cursor: Optional[int] = None
+
+
+class ImageBatch(BaseModel):
+    items: list[ImageResponse]
+    missing: list[int] = []
+
+
+class RankedImagePage(BaseModel):
+    items: list[ImageResponse]
+    next_cursor: Optional[str] = None
+
+
+class UploadSignatureResponse(BaseModel):
+    upload_url: str
+    api_key: str
+    cloud_name: str
+    public_id: str
+    timestamp: int
+    signature: str
+    allowed_formats: str
+    max_file_size: int
+    upload_token: str
+    expires_in: int
+
+
+class UploadSessionResponse(BaseModel):
+    id: str
+    total_size: int
+    received: int
+    chunk_size: int
+    expires_at: datetime
+
+
 class UserModel(BaseModel):
     username: str = Field(min_length=5, max_length=16)
     email: str
@@ -76,3 +125,32 @@ class CommentResponse(BaseModel):
     updated_at: datetime
     user_id: int
     image_id: int
+
+
+class SyncDeletion(BaseModel):
+    type: Literal["image", "comment"]
+    id: int
+    deleted_at: datetime
+
+
+class SyncImage(BaseModel):
+    id: int
+    description: str
+    url: str
+    variants: Optional[dict[str, str]] = None
+    tags: list[Tag]
+    created_at: datetime
+    updated_at: datetime
+
+
+class SyncPage(BaseModel):
+    images: list[SyncImage]
+    comments: list[CommentResponse]
+    deleted: list[SyncDeletion]
+    sync_token: str
+    has_more: bool
+
+
+class ImageCommentsResponse(BaseModel):
+    image_id: int
+    comments: list[CommentResponse]
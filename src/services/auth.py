@@ -11,10 +11,12 @@ from sqlalchemy.orm import Session
 
 from src.database.models import User
 from src.schemas import TokenData
-from src.database.db import get_db
+from src.database.db import SessionLocal, get_db
 from src.repository import users as repository_users
 from src.conf.config import settings
 
+USER_CACHE_TTL = 900
+
 
 class Auth:
     """
@@ -145,6 +147,18 @@ class Auth:
                 detail="Could not validate credentials",
             )
 
+    def cache_user(self, user: User):
+        """
+        Stores a snapshot of the user in Redis, replacing any previous one.
+
+        The value and its expiry are written in a single SET command, so readers
+        never see a snapshot without a TTL or a stale one after an update.
+
+        Args:
+            user (User): The user to cache.
+        """
+        self.r.set(f"user:{user.email}", pickle.dumps(user), ex=USER_CACHE_TTL)
+
     async def get_current_user(
         self, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
     ) -> User:
@@ -186,14 +200,34 @@ class Auth:
             user = await repository_users.get_user_by_email(email, db)
             if user is None:
                 return None
-            self.r.set(f"user:{email}", pickle.dumps(user))
-            self.r.expire(f"user:{email}", 900)
+            self.cache_user(user)
         else:
             user = pickle.loads(user)
 
         user.role = role
         return user
 
+    async def get_current_user_without_session(
+        self, token: str = Depends(oauth2_scheme)
+    ) -> User:
+        """
+        Retrieves the current user with a session that is closed before the route runs.
+
+        Long-lived responses such as event streams depend on this instead of
+        get_current_user, so they do not keep a pooled connection checked out.
+
+        Args:
+            token (str): The authentication token.\n
+
+        Returns:
+            User: The current authenticated user, detached from any session.
+        """
+        db = SessionLocal()
+        try:
+            return await self.get_current_user(token, db)
+        finally:
+            db.close()
+
     async def update_user_role(
         self,
         new_role: str,
@@ -233,8 +267,7 @@ class Auth:
             user = await repository_users.get_user_by_email(email, db)
             if user is None:
                 raise credentials_exception
-            self.r.set(f"user:{email}", pickle.dumps(user))
-            self.r.expire(f"user:{email}", 900)
+            self.cache_user(user)
         else:
             user = pickle.loads(user)
 
@@ -273,6 +306,51 @@ class Auth:
                 detail="Could not validate credentials",
             )
 
+    def create_upload_token(self, data: dict, expires_delta: float):
+        """
+        Creates a short-lived token that authorizes completing a direct upload.
+
+        Args:
+            data (dict): The data to be encoded in the token.\n
+            expires_delta (float): The expiration time in seconds.\n
+
+        Returns:
+            str: The encoded upload token.
+        """
+        to_encode = data.copy()
+        expire = datetime.utcnow() + timedelta(seconds=expires_delta)
+        to_encode.update(
+            {"iat": datetime.utcnow(), "exp": expire, "scope": "direct_upload"}
+        )
+        return jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
+
+    async def decode_upload_token(self, token: str) -> dict:
+        """
+        Decodes a direct upload token.
+
+        Args:
+            token (str): The upload token to decode.
+
+        Returns:
+            dict: The token payload.
+
+        Raises:
+            HTTPException: If the token is invalid, expired or has a wrong scope.
+        """
+        try:
+            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            if payload.get("scope") == "direct_upload":
+                return payload
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid scope for token",
+            )
+        except JWTError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired upload token",
+            )
+
     def create_email_token(self, data: dict):
         to_encode = data.copy()
         expire = datetime.utcnow() + timedelta(days=7)
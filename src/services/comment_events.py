@@ -0,0 +1,235 @@
+import asyncio
+import json
+import logging
+
+import redis
+
+from src.conf.config import settings
+from src.database.models import Comment
+from src.database.redis import async_redis_client, redis_client
+
+logger = logging.getLogger(__name__)
+
+COMMENT_EVENTS_CHANNEL = "comments:events"
+
+# Appends the event to the image's stream and publishes it with the stream ID in one
+# step, so subscribers receive events in stream order.
+PUBLISH_SCRIPT = """
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*',
+    'event', ARGV[2], 'data', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('PUBLISH', KEYS[2], cjson.encode(
+    {image_id = tonumber(ARGV[5]), id = id, event = ARGV[2], data = ARGV[3]}))
+return id
+"""
+
+
+def event_id_key(event_id: str) -> tuple[int, int]:
+    millis, _, sequence = event_id.partition("-")
+    return int(millis), int(sequence or 0)
+
+
+def format_event(event: dict) -> str:
+    """Formats an event as a server-sent event frame.
+
+    Args:
+        event (dict): The event with its id, event type and data.
+
+    Returns:
+        str: The frame.
+    """
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {event['data']}\n\n"
+
+
+class CommentEvents:
+    """
+    Live comment events of images, delivered as server-sent events.
+
+    Each event is appended to a capped Redis stream of its image, which lets a
+    reconnecting client replay what it missed after its Last-Event-ID, and is
+    published on one channel that every worker subscribes to once and dispatches
+    to its local connections.
+    """
+
+    queue_size = 100
+
+    def __init__(
+        self,
+        backlog: int = settings.comment_stream_backlog,
+        ttl: int = settings.comment_stream_ttl,
+        heartbeat: float = settings.comment_stream_heartbeat,
+    ):
+        self.backlog = backlog
+        self.ttl = ttl
+        self.heartbeat = heartbeat
+        self._subscribers = {}
+        self._listener = None
+        self._publish = redis_client.register_script(PUBLISH_SCRIPT)
+
+    @staticmethod
+    def stream_key(image_id: int) -> str:
+        return f"comments:stream:{image_id}"
+
+    @staticmethod
+    def serialize(comment: Comment) -> str:
+        return json.dumps(
+            {
+                "id": comment.id,
+                "text": comment.text,
+                "user_id": comment.user_id,
+                "image_id": comment.image_id,
+                "created_at": comment.created_at and comment.created_at.isoformat(),
+                "updated_at": comment.updated_at and comment.updated_at.isoformat(),
+            }
+        )
+
+    def publish(self, event: str, comment: Comment):
+        """Records a comment event and notifies the connected clients.
+
+        Args:
+            event (str): "created", "updated" or "deleted".\n
+            comment (Comment): The committed comment.\n
+        """
+        try:
+            self._publish(
+                keys=[self.stream_key(comment.image_id), COMMENT_EVENTS_CHANNEL],
+                args=[
+                    self.backlog,
+                    event,
+                    self.serialize(comment),
+                    self.ttl,
+                    comment.image_id,
+                ],
+            )
+        except redis.RedisError as e:
+            logger.warning("Could not publish comment event: %s", e)
+
+    async def replay(self, image_id: int, last_event_id: str) -> list[dict]:
+        """Returns the events of an image after the given event.
+
+        Args:
+            image_id (int): The ID of the image.\n
+            last_event_id (str): The last event the client received.\n
+
+        Returns:
+            list[dict]: The missed events, preceded by a reset event when the
+            client's position is no longer in the stream.
+        """
+        entries = await async_redis_client.xrange(
+            self.stream_key(image_id), min=last_event_id
+        )
+        events = [
+            {
+                "id": entry_id.decode(),
+                "event": fields[b"event"].decode(),
+                "data": fields[b"data"].decode(),
+            }
+            for entry_id, fields in entries
+        ]
+        if events and events[0]["id"] == last_event_id:
+            return events[1:]
+        return [{"id": last_event_id, "event": "reset", "data": "{}"}] + events
+
+    def dispatch(self, event: dict):
+        """Hands a published event to the local connections of its image.
+
+        A connection that cannot keep up is dropped, and its client resumes from
+        its Last-Event-ID after reconnecting.
+
+        Args:
+            event (dict): The published event.
+        """
+        for queue in list(self._subscribers.get(event["image_id"], ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.unsubscribe(event["image_id"], queue)
+
+    def subscribe(self, image_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(image_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, image_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(image_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[image_id]
+
+    async def stream(self, image_id: int, last_event_id: str | None, is_disconnected):
+        """Yields the server-sent event frames of an image until the client leaves.
+
+        Args:
+            image_id (int): The ID of the image.\n
+            last_event_id (str, optional): The Last-Event-ID sent by a reconnecting client.\n
+            is_disconnected: A coroutine function telling whether the client has left.\n
+
+        Yields:
+            str: Event frames and heartbeat comments.
+        """
+        queue = self.subscribe(image_id)
+        try:
+            yield f"retry: {int(self.heartbeat * 1000)}\n\n"
+            last = None
+            if last_event_id:
+                last = event_id_key(last_event_id)
+                for event in await self.replay(image_id, last_event_id):
+                    yield format_event(event)
+                    last = max(last, event_id_key(event["id"]))
+            while not await is_disconnected():
+                if queue.empty() and queue not in self._subscribers.get(image_id, ()):
+                    return
+                try:
+                    event = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                key = event_id_key(event["id"])
+                if last is not None and key <= last:
+                    continue
+                last = key
+                yield format_event(event)
+        finally:
+            self.unsubscribe(image_id, queue)
+
+    async def listen(self):
+        """
+        Dispatches the comment events published by all workers.
+        """
+        while True:
+            pubsub = async_redis_client.pubsub()
+            try:
+                await pubsub.subscribe(COMMENT_EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.dispatch(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Comment event listener failed, retrying: %s", e)
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.reset()
+
+    def start(self):
+        """
+        Starts the listener.
+        """
+        if self._listener is None:
+            self._listener = asyncio.create_task(self.listen())
+
+    async def stop(self):
+        """
+        Stops the listener.
+        """
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+comment_events = CommentEvents()
@@ -0,0 +1,108 @@
+import logging
+
+import cloudinary.api
+from fastapi.concurrency import run_in_threadpool
+
+from src.conf.config import settings
+from src.database.db import SessionLocal
+from src.repository import deletions as deletions_repository
+from src.repository import images as images_repository
+from src.services.storage import configure_storage
+from src.services.workers import PeriodicTask
+
+configure_storage()
+
+logger = logging.getLogger(__name__)
+
+
+class DeletionWorker:
+    """
+    Background worker that drains the queue of remote assets waiting to be deleted.
+    """
+
+    batch_size = min(settings.deletion_batch_size, 100)
+    poll_interval = settings.deletion_poll_interval
+    max_backoff = settings.deletion_max_backoff
+
+    def __init__(self):
+        self._task = PeriodicTask(self.run_once, self.poll_interval)
+
+    async def process_batch(self, db) -> int:
+        """Deletes one batch of due assets with a single bulk API call.
+
+        Args:
+            db (Session): The database session.
+
+        Returns:
+            int: The number of deletions taken from the queue.
+        """
+        deletions = await deletions_repository.get_due_deletions(self.batch_size, db)
+        if not deletions:
+            return 0
+        taken = len(deletions)
+        # An identical upload may have reused the asset after it was queued.
+        referenced = [
+            d
+            for d in deletions
+            if await images_repository.count_asset_references(d.public_id, db)
+        ]
+        if referenced:
+            await deletions_repository.complete_deletions(referenced, db)
+            deletions = [d for d in deletions if d not in referenced]
+            if not deletions:
+                return taken
+        public_ids = list({deletion.public_id for deletion in deletions})
+        try:
+            result = await run_in_threadpool(
+                cloudinary.api.delete_resources, public_ids
+            )
+        except Exception as e:
+            await deletions_repository.retry_deletions(
+                deletions, str(e), self.max_backoff, db
+            )
+            logger.warning("Bulk deletion of %d assets failed: %s", len(deletions), e)
+            return taken
+
+        statuses = result.get("deleted", {})
+        done = [
+            d for d in deletions if statuses.get(d.public_id) in ("deleted", "not_found")
+        ]
+        failed = [d for d in deletions if d not in done]
+        if done:
+            await deletions_repository.complete_deletions(done, db)
+        if failed:
+            await deletions_repository.retry_deletions(
+                failed, "Asset was not deleted", self.max_backoff, db
+            )
+        return taken
+
+    async def run_once(self) -> bool:
+        """Processes one batch in its own session.
+
+        Returns:
+            bool: True if the batch was full and more deletions may be due.
+        """
+        db = SessionLocal()
+        try:
+            processed = await self.process_batch(db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return processed >= self.batch_size
+
+    def start(self):
+        """
+        Starts the worker on the running event loop.
+        """
+        self._task.start()
+
+    async def stop(self):
+        """
+        Cancels the worker and waits for it to finish.
+        """
+        await self._task.stop()
+
+
+deletion_worker = DeletionWorker()
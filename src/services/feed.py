@@ -0,0 +1,243 @@
+import logging
+from datetime import datetime
+
+import orjson
+import redis
+
+from src.conf.config import settings
+from src.database.models import Image
+from src.database.redis import redis_client
+from src.schemas import ImageResponse
+
+logger = logging.getLogger(__name__)
+
+
+class FeedCache:
+    """
+    Redis cache of the public feed.
+
+    The head of the feed is kept as a capped list of serialized images, so new
+    uploads are prepended without a database read. Pages behind a cursor never
+    change when images are added, so they are cached as lists of image IDs under a
+    generation number that is bumped when an image is edited or deleted. The
+    images of the pages are cached one entry per image, so a comment updates the
+    entry of its image instead of dropping every page. The head carries a version
+    bumped by every change, so a head read from the database is only stored if no
+    change happened while it was read.
+    """
+
+    head_key = "feed:head"
+    head_version_key = "feed:head:version"
+    generation_key = "feed:generation"
+
+    def __init__(
+        self,
+        size: int = settings.feed_cache_size,
+        head_ttl: int = settings.feed_head_ttl,
+        page_ttl: int = settings.feed_page_ttl,
+    ):
+        self.size = size
+        self.head_ttl = head_ttl
+        self.page_ttl = page_ttl
+
+    @staticmethod
+    def serialize(image: Image) -> str:
+        return ImageResponse.model_validate(image, from_attributes=True).model_dump_json()
+
+    @staticmethod
+    def page_body(items: list[str], limit: int) -> bytes:
+        """Builds a page response from serialized images.
+
+        Args:
+            items (list[str]): Up to limit + 1 serialized images, newest first.\n
+            limit (int): The page size.\n
+
+        Returns:
+            bytes: The JSON body of the page.
+        """
+        page = items[:limit]
+        next_cursor = "null"
+        if len(items) > limit:
+            next_cursor = str(ImageResponse.model_validate_json(page[-1]).id)
+        return f'{{"items":[{",".join(page)}],"next_cursor":{next_cursor}}}'.encode()
+
+    def get_head(self, limit: int) -> bytes | None:
+        """Returns the first page from the cached head, if it is loaded.
+
+        Args:
+            limit (int): The page size, at most the cache size.\n
+
+        Returns:
+            bytes: The JSON body of the page, or None on a cache miss.
+        """
+        try:
+            items = redis_client.lrange(self.head_key, 0, limit)
+        except redis.RedisError as e:
+            logger.warning("Could not read the feed cache: %s", e)
+            return None
+        if not items:
+            return None
+        return self.page_body([item.decode() for item in items], limit)
+
+    def head_version(self) -> int | None:
+        """Returns the version of the cached head, read before loading a new head.
+
+        Returns:
+            int: The version, or None if Redis is unavailable.
+        """
+        try:
+            return int(redis_client.get(self.head_version_key) or 0)
+        except redis.RedisError as e:
+            logger.warning("Could not read the feed cache: %s", e)
+            return None
+
+    def set_head(self, images: list[Image], version: int | None):
+        """Replaces the cached head with the newest images, unless it changed since.
+
+        Args:
+            images (list[Image]): Up to size + 1 images, newest first.\n
+            version (int): The head version read before the images were loaded.\n
+        """
+        if not images or version is None:
+            return
+        try:
+            with redis_client.pipeline() as pipe:
+                pipe.watch(self.head_version_key)
+                if int(pipe.get(self.head_version_key) or 0) != version:
+                    return
+                pipe.multi()
+                pipe.delete(self.head_key)
+                pipe.rpush(self.head_key, *(self.serialize(image) for image in images))
+                pipe.expire(self.head_key, self.head_ttl)
+                pipe.execute()
+        except redis.WatchError:
+            pass
+        except redis.RedisError as e:
+            logger.warning("Could not fill the feed cache: %s", e)
+
+    def page_key(self, before_id: int, limit: int) -> str:
+        generation = int(redis_client.get(self.generation_key) or 0)
+        return f"feed:page:{generation}:{before_id}:{limit}"
+
+    @staticmethod
+    def entry_key(image_id: int) -> str:
+        return f"feed:image:{image_id}"
+
+    def get_page(self, before_id: int, limit: int) -> bytes | None:
+        """Returns a cached page behind a cursor.
+
+        Args:
+            before_id (int): The cursor.\n
+            limit (int): The page size.\n
+
+        Returns:
+            bytes: The JSON body of the page, or None on a cache miss.
+        """
+        try:
+            ids = redis_client.get(self.page_key(before_id, limit))
+            if ids is None:
+                return None
+            ids = orjson.loads(ids)
+            items = redis_client.mget([self.entry_key(i) for i in ids]) if ids else []
+        except redis.RedisError as e:
+            logger.warning("Could not read the feed cache: %s", e)
+            return None
+        if any(item is None for item in items):
+            return None
+        return self.page_body([item.decode() for item in items], limit)
+
+    def set_page(self, before_id: int, limit: int, ids: list[int], items: list[str]):
+        """Caches a page behind a cursor and the entries of its images.
+
+        Args:
+            before_id (int): The cursor.\n
+            limit (int): The page size.\n
+            ids (list[int]): The IDs of up to limit + 1 images, newest first.\n
+            items (list[str]): The serialized images, in the same order.\n
+        """
+        try:
+            pipe = redis_client.pipeline()
+            pipe.set(
+                self.page_key(before_id, limit), orjson.dumps(ids), ex=self.page_ttl
+            )
+            for image_id, item in zip(ids, items):
+                pipe.set(self.entry_key(image_id), item, ex=self.page_ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Could not fill the feed cache: %s", e)
+
+    def prepend(self, image: Image):
+        """Adds a new image to the cached head, if it is loaded.
+
+        Args:
+            image (Image): The committed image.\n
+        """
+        try:
+            pipe = redis_client.pipeline()
+            pipe.incr(self.head_version_key)
+            pipe.lpushx(self.head_key, self.serialize(image))
+            pipe.ltrim(self.head_key, 0, self.size)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Could not update the feed cache: %s", e)
+
+    def update_comment_stats(
+        self, image_id: int, comment_count: int, last_commented_at: datetime | None
+    ):
+        """Updates the comment aggregates of one image in the head and in the cached
+        page entries, if they are loaded.
+
+        Args:
+            image_id (int): The ID of the commented image.\n
+            comment_count (int): The committed number of comments.\n
+            last_commented_at (datetime, optional): The time of the newest comment.\n
+        """
+        changes = {
+            "comment_count": comment_count,
+            "last_commented_at": last_commented_at,
+        }
+
+        def update(item: bytes) -> str:
+            image = ImageResponse.model_validate_json(item)
+            return image.model_copy(update=changes).model_dump_json()
+
+        entry_key = self.entry_key(image_id)
+        try:
+            # A head read from the database before the comment must not be stored.
+            redis_client.incr(self.head_version_key)
+            with redis_client.pipeline() as pipe:
+                pipe.watch(self.head_key, entry_key)
+                items = pipe.lrange(self.head_key, 0, -1)
+                entry = pipe.get(entry_key)
+                pipe.multi()
+                for index, item in enumerate(items):
+                    if orjson.loads(item)["id"] == image_id:
+                        pipe.lset(self.head_key, index, update(item))
+                        break
+                if entry is not None:
+                    pipe.set(entry_key, update(entry), keepttl=True)
+                pipe.execute()
+        except redis.WatchError:
+            # The head or the entry changed meanwhile; drop just those two.
+            try:
+                redis_client.delete(self.head_key, entry_key)
+            except redis.RedisError as e:
+                logger.warning("Could not update the feed cache: %s", e)
+        except redis.RedisError as e:
+            logger.warning("Could not update the feed cache: %s", e)
+
+    def invalidate(self):
+        """
+        Drops the cached head and all cached pages after an edit or a deletion.
+        """
+        try:
+            pipe = redis_client.pipeline()
+            pipe.incr(self.head_version_key)
+            pipe.delete(self.head_key)
+            pipe.incr(self.generation_key)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Could not invalidate the feed cache: %s", e)
+
+
+feed_cache = FeedCache()
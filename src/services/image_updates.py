@@ -0,0 +1,53 @@
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from src.database.models import Image
+from src.repository import images as images_repository
+from src.services.feed import feed_cache
+from src.services.tag_index import tag_index
+from src.services.timelines import timeline_service
+from src.services.trending import trending_tags
+
+
+def record_tag_usage(old_tag_names: List[str], new_tag_names: List[str]):
+    """Reports committed tag link changes of an image to the tag autocomplete index
+    and counts newly attached tags towards the trending leaderboard.
+
+    Args:
+        old_tag_names (List[str]): The tag names the image had before the change.\n
+        new_tag_names (List[str]): The tag names the image has after the change.\n
+    """
+    changes = {}
+    for name in old_tag_names:
+        changes[name] = changes.get(name, 0) - 1
+    for name in new_tag_names:
+        changes[name] = changes.get(name, 0) + 1
+    tag_index.record({name: delta for name, delta in changes.items() if delta})
+    trending_tags.record(
+        [name for name, delta in changes.items() for _ in range(max(delta, 0))]
+    )
+
+
+async def publish_new_image(image: Image, db: Session):
+    """Reports a committed image to the tag index, trending tags, feed and timelines.
+
+    Args:
+        image (Image): The added image.\n
+        db (Session): The database session.\n
+    """
+    record_tag_usage([], [tag.name for tag in image.tags])
+    feed_cache.prepend(image)
+    await timeline_service.fan_out(image, db)
+
+
+async def publish_comment_stats(image_id: int, db: Session):
+    """Reports the committed comment aggregates of an image to the feed cache.
+
+    Args:
+        image_id (int): The ID of the commented image.\n
+        db (Session): The database session.\n
+    """
+    stats = await images_repository.get_comment_stats(image_id, db)
+    if stats:
+        feed_cache.update_comment_stats(image_id, *stats)
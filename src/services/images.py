@@ -1,17 +1,84 @@
 from base64 import b64encode
+from hashlib import sha256
 from io import BytesIO
 from uuid import uuid4
+import time
 
 import cloudinary
+import cloudinary.api
+import cloudinary.exceptions
 import cloudinary.uploader
+import cloudinary.utils
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import qrcode
+import qrcode.image.svg
 from qrcode.image.base import BaseImage
 
 from src.conf.config import settings
 from src.database.models import User
-from src.repository.images import get_image
+from src.repository.deletions import enqueue_deletion
+from src.repository.images import get_image, get_image_by_content_hash
+from src.services.auth import auth_service
+from src.services.storage import configure_storage
+from src.services.workers import run_cpu_bound
+from src.utils.cache import LRUCache
+from src.utils.images import (
+    SNIFF_SIZE,
+    get_image_size,
+    recompress_image,
+    sniff_image_format,
+    strip_metadata,
+)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+AVATAR_TRANSFORMATION = {"width": 250, "height": 250, "crop": "fill"}
+
+QR_RENDER_VERSION = 1
+
+QR_ERROR_CORRECTION = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+
+QR_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def render_qr_code(
+    image_url: str, box_size: int, border: int, error_correction: str, fmt: str
+) -> bytes:
+    """Renders a QR code. Runs inside the worker pool, so it must stay module-level.
+
+    Args:
+        image_url (str): The data to encode.\n
+        box_size (int): The size of a single module in pixels.\n
+        border (int): The width of the quiet zone in modules.\n
+        error_correction (str): One of "L", "M", "Q" or "H".\n
+        fmt (str): The output format, "png" or "svg".\n
+
+    Returns:
+        bytes: The encoded QR code image.
+    """
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=QR_ERROR_CORRECTION[error_correction],
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(image_url)
+    qr.make(fit=True)
+    buffered = BytesIO()
+    if fmt == "svg":
+        qr_code = qr.make_image(image_factory=qrcode.image.svg.SvgPathImage)
+        qr_code.save(buffered)
+    else:
+        qr_code = qr.make_image(fill_color="black", back_color="white")
+        qr_code.save(buffered, "PNG")
+    return buffered.getvalue()
 
 
 class ImageService:
@@ -19,29 +86,284 @@ class ImageService:
     A class that provides image-related services such as uploading, resizing, adding filters, and generating QR codes.
     """
 
-    cloudinary.config(
-        cloud_name=settings.cloudinary_name,
-        api_key=settings.cloudinary_api_key,
-        api_secret=settings.cloudinary_api_secret,
-        secure=True,
-    )
+    configure_storage()
+    qr_cache = LRUCache(maxsize=settings.qr_cache_size)
+
+    def new_public_id(self) -> str:
+        """Generates a unique public ID for a new asset.
+
+        Returns:
+            str: The public ID.
+        """
+        unique_filename = str(uuid4())
+        return f"KillerInstagram/{unique_filename}"
+
+    def variant_transformations(self) -> list[dict]:
+        """Returns the eager transformations of the configured variant profiles.
+
+        Returns:
+            list[dict]: The transformations, in profile order.
+        """
+        return [dict(profile) for profile in settings.image_variants.values()]
+
+    def build_variant_urls(self, public_id: str, version=None) -> dict:
+        """Builds the delivery URLs of every variant profile of an asset.
+
+        The URLs match the eager transformations exactly, so they are served from
+        the derived assets generated at upload time.
+
+        Args:
+            public_id (str): The public ID of the asset.\n
+            version: The asset version.\n
+
+        Returns:
+            dict: The variant URLs keyed by profile name.
+        """
+        return {
+            name: cloudinary.CloudinaryImage(public_id).build_url(
+                version=version, **profile
+            )
+            for name, profile in settings.image_variants.items()
+        }
+
+    def create_upload_signature(self, user: User) -> dict:
+        """Issues signed parameters that let a client upload straight to Cloudinary.
+
+        The signature pins the public ID and allowed formats; the accompanying upload
+        token binds that public ID to the user and expires after the configured TTL.
+
+        Args:
+            user (User): The user who is going to upload.
+
+        Returns:
+            dict: The upload URL, signed parameters and upload token.
+        """
+        public_id = self.new_public_id()
+        timestamp = int(time.time())
+        params = {
+            "public_id": public_id,
+            "timestamp": timestamp,
+            "allowed_formats": settings.direct_upload_formats,
+            "eager": cloudinary.utils.build_eager(self.variant_transformations()),
+            "eager_async": "true",
+        }
+        config = cloudinary.config()
+        signature = cloudinary.utils.api_sign_request(params, config.api_secret)
+        upload_token = auth_service.create_upload_token(
+            {"sub": user.email, "public_id": public_id},
+            expires_delta=settings.direct_upload_ttl,
+        )
+        return {
+            **params,
+            "upload_url": cloudinary.utils.cloudinary_api_url("upload"),
+            "api_key": config.api_key,
+            "cloud_name": config.cloud_name,
+            "signature": signature,
+            "max_file_size": settings.direct_upload_max_bytes,
+            "upload_token": upload_token,
+            "expires_in": settings.direct_upload_ttl,
+        }
+
+    async def verify_direct_upload(
+        self, public_id: str, version: int, signature: str, db: Session
+    ) -> dict:
+        """Verifies an asset uploaded directly by a client.
+
+        Checks the response signature returned by Cloudinary and the stored asset's
+        size and format. Rejected assets are queued for deletion.
+
+        Args:
+            public_id (str): The public ID from the upload token.\n
+            version (int): The asset version returned by Cloudinary.\n
+            signature (str): The response signature returned by Cloudinary.\n
+            db (Session): The database session.\n
+
+        Returns:
+            dict: The URL and variant URLs of the verified asset.
+
+        Raises:
+            HTTPException: If the signature is invalid or the asset breaks the upload limits.
+        """
+        if not cloudinary.utils.verify_api_response_signature(
+            public_id, version, signature
+        ):
+            raise HTTPException(status_code=400, detail="Invalid upload signature")
+        try:
+            resource = await run_in_threadpool(cloudinary.api.resource, public_id)
+        except cloudinary.exceptions.NotFound:
+            raise HTTPException(status_code=404, detail="Uploaded image not found")
+
+        allowed_formats = settings.direct_upload_formats.split(",")
+        if (
+            resource.get("bytes", 0) > settings.direct_upload_max_bytes
+            or resource.get("format") not in allowed_formats
+        ):
+            await enqueue_deletion(public_id, db)
+            db.commit()
+            raise HTTPException(
+                status_code=400, detail="Uploaded image violates upload limits"
+            )
+        return {
+            "url": cloudinary.CloudinaryImage(public_id).build_url(version=version),
+            "variants": self.build_variant_urls(public_id, version),
+        }
+
+    async def validate_image(self, file) -> str:
+        """Checks an uploaded file before anything is sent to the storage.
 
-    async def upload_image(self, file):
+        The format is sniffed from the magic bytes and the dimensions are read from
+        the header, so bad uploads are rejected without decoding or uploading them.
+
+        Args:
+            file: The uploaded file.
+
+        Returns:
+            str: The detected image format.
+
+        Raises:
+            HTTPException: If the file is not a supported image, is too large or is corrupt.
+        """
+        header = await file.read(SNIFF_SIZE)
+        await file.seek(0)
+        fmt = sniff_image_format(header)
+        if fmt is None:
+            raise HTTPException(status_code=415, detail="Unsupported image format")
+
+        file.file.seek(0, 2)
+        size = file.file.tell()
+        file.file.seek(0)
+        if size > settings.image_max_bytes:
+            raise HTTPException(status_code=413, detail="Image is too large")
+
+        try:
+            dimensions = await run_in_threadpool(get_image_size, file.file)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Image is corrupt")
+        finally:
+            file.file.seek(0)
+        if dimensions and dimensions[0] * dimensions[1] > settings.image_max_pixels:
+            raise HTTPException(status_code=400, detail="Image dimensions are too large")
+        return fmt
+
+    async def prepare_for_storage(self, file):
+        """Optionally strips metadata and re-encodes an image in the worker pool.
+
+        When re-encoding does not make the image smaller, the image keeps its format
+        and size but its metadata is still dropped.
+
+        Args:
+            file: The validated uploaded file.
+
+        Returns:
+            A binary file object with the bytes to store.
+        """
+        if not settings.image_recompress:
+            return file.file
+        data = await file.read()
+        await file.seek(0)
+        compressed = await run_cpu_bound(
+            recompress_image,
+            data,
+            settings.image_max_dimension,
+            settings.image_quality,
+            settings.image_output_format,
+        )
+        if len(compressed) >= len(data):
+            compressed = await run_cpu_bound(
+                strip_metadata, data, settings.image_quality
+            )
+        return BytesIO(compressed)
+
+    async def hash_file(self, file) -> str:
+        """Computes the SHA-256 digest of an uploaded file in chunks and rewinds it.
+
+        Args:
+            file: The uploaded file.
+
+        Returns:
+            str: The hex digest of the file contents.
+        """
+        digest = sha256()
+        while chunk := await file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        await file.seek(0)
+        return digest.hexdigest()
+
+    async def upload_image(
+        self, file, db: Session | None = None, content_hash: str | None = None
+    ):
         """Uploads an image to the cloud storage.
 
+        The file is validated first. When deduplication is enabled and an image with
+        identical content is already stored, its asset is reused and nothing is
+        uploaded; otherwise the file is optionally re-encoded and then uploaded.
+
         Args:
-            file: The file object representing the image to be uploaded.
+            file: The file object representing the image to be uploaded.\n
+            db (Session, optional): The database session used for deduplication.\n
+            content_hash (str, optional): The already known SHA-256 hex digest of the file.\n
 
         Returns:
-            A dictionary containing the public ID and URL of the uploaded image.
+            A dictionary containing the public ID, URL, variant URLs and content hash of the
+            uploaded image.
         """
-        unique_filename = str(uuid4())
-        public_id = f"KillerInstagram/{unique_filename}"
-        r = cloudinary.uploader.upload(file.file, public_id=public_id, overwrite=True)
+        await self.validate_image(file)
+        if content_hash is None:
+            content_hash = await self.hash_file(file)
+        if settings.image_dedupe and db is not None:
+            existing = await get_image_by_content_hash(content_hash, db)
+            if existing:
+                return {
+                    "public_id": existing.public_id,
+                    "url": existing.url,
+                    "variants": existing.variants,
+                    "content_hash": content_hash,
+                }
+
+        public_id = self.new_public_id()
+        r = await run_in_threadpool(
+            cloudinary.uploader.upload,
+            await self.prepare_for_storage(file),
+            public_id=public_id,
+            overwrite=True,
+            eager=self.variant_transformations(),
+            eager_async=True,
+        )
         src_url = cloudinary.CloudinaryImage(public_id).build_url(
             version=r.get("version")
         )
-        return {"public_id": public_id, "url": src_url}
+        return {
+            "public_id": public_id,
+            "url": src_url,
+            "variants": self.build_variant_urls(public_id, r.get("version")),
+            "content_hash": content_hash,
+        }
+
+    async def upload_avatar(self, file, user: User) -> str:
+        """Uploads a user's avatar and returns the URL of its 250x250 variant.
+
+        The variant is generated eagerly during the upload, and the returned URL is
+        versioned, so it changes with every new avatar and can be cached forever.
+
+        Args:
+            file: The uploaded avatar file.\n
+            user (User): The owner of the avatar.\n
+
+        Returns:
+            str: The URL of the avatar variant.
+        """
+        await self.validate_image(file)
+        public_id = f"NotesApp/{user.username}"
+        r = await run_in_threadpool(
+            cloudinary.uploader.upload,
+            await self.prepare_for_storage(file),
+            public_id=public_id,
+            overwrite=True,
+            eager=[AVATAR_TRANSFORMATION],
+        )
+        return cloudinary.CloudinaryImage(public_id).build_url(
+            version=r.get("version"), **AVATAR_TRANSFORMATION
+        )
 
     async def resize_image(
         self, image_id: str, width: int, height: int, user: User, db: Session
@@ -62,7 +384,8 @@ class ImageService:
             HTTPException: If the width or height is invalid.
         """
         image = await get_image(image_id, user=user, db=db)
-        transformed_url = cloudinary.uploader.explicit(
+        transformed_url = await run_in_threadpool(
+            cloudinary.uploader.explicit,
             image.public_id,
             type="upload",
             eager=[
@@ -122,7 +445,8 @@ class ImageService:
         ]
         effect = f"art:{filter}" if filter in filters else filter
         image = await get_image(image_id, user=user, db=db)
-        transformed_url = cloudinary.uploader.explicit(
+        transformed_url = await run_in_threadpool(
+            cloudinary.uploader.explicit,
             image.public_id,
             type="upload",
             eager=[
@@ -139,27 +463,61 @@ class ImageService:
             raise HTTPException(status_code=400, detail="Invalid filter")
         return url_to_return
 
-    async def generate_qr_code(self, image_url: str):
+    def qr_code_etag(
+        self,
+        image_url: str,
+        box_size: int = 10,
+        border: int = 4,
+        error_correction: str = "L",
+        fmt: str = "png",
+    ) -> str:
+        """Returns the strong ETag of a QR code without rendering it.
+
+        Rendering is deterministic, so the tag is derived from the render parameters.
+
+        Args:
+            image_url (str): The URL encoded in the QR code.\n
+            box_size (int): The size of a single module in pixels.\n
+            border (int): The width of the quiet zone in modules.\n
+            error_correction (str): One of "L", "M", "Q" or "H".\n
+            fmt (str): The output format, "png" or "svg".\n
+
+        Returns:
+            str: The quoted ETag value.
+        """
+        key = f"{QR_RENDER_VERSION}|{box_size}|{border}|{error_correction}|{fmt}|{image_url}"
+        return f'"{sha256(key.encode()).hexdigest()[:32]}"'
+
+    async def generate_qr_code(
+        self,
+        image_url: str,
+        box_size: int = 10,
+        border: int = 4,
+        error_correction: str = "L",
+        fmt: str = "png",
+    ):
         """Generates a QR code image from the given image URL.
 
+        Rendered codes are kept in a bounded LRU cache keyed by the URL and render
+        parameters; cache misses are rendered in the worker pool.
+
         Args:
-            image_url (str): The URL of the image to be encoded in the QR code.
+            image_url (str): The URL of the image to be encoded in the QR code.\n
+            box_size (int): The size of a single module in pixels.\n
+            border (int): The width of the quiet zone in modules.\n
+            error_correction (str): One of "L", "M", "Q" or "H".\n
+            fmt (str): The output format, "png" or "svg".\n
 
         Returns:
-            bytes: The bytes representation of the generated QR code image in PNG format.
+            bytes: The bytes representation of the generated QR code image.
         """
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(image_url)
-        qr.make(fit=True)
-        qr_code = qr.make_image(fill_color="black", back_color="white")
-        buffered = BytesIO()
-        qr_code.save(buffered, "PNG")
-        qr_bytes = buffered.getvalue()
+        etag = self.qr_code_etag(image_url, box_size, border, error_correction, fmt)
+        qr_bytes = self.qr_cache.get(etag)
+        if qr_bytes is None:
+            qr_bytes = await run_cpu_bound(
+                render_qr_code, image_url, box_size, border, error_correction, fmt
+            )
+            self.qr_cache.set(etag, qr_bytes)
         return qr_bytes
 
 
@@ -0,0 +1,30 @@
+import logging
+
+from src.conf.config import settings
+from src.database.db import SessionLocal
+from src.repository import comments as comments_repository
+from src.services.workers import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_comment_counts() -> bool:
+    """
+    Repairs drifted comment aggregates in its own session.
+
+    Returns:
+        bool: Always False, the job runs once per interval.
+    """
+    db = SessionLocal()
+    try:
+        fixed = await comments_repository.reconcile_comment_counts(db)
+    finally:
+        db.close()
+    if fixed:
+        logger.warning("Reconciled comment aggregates of %d images", fixed)
+    return False
+
+
+comment_count_reconciler = PeriodicTask(
+    reconcile_comment_counts, settings.comment_reconcile_interval
+)
@@ -0,0 +1,118 @@
+import logging
+import time
+from collections import defaultdict
+from threading import Lock
+from urllib.parse import urlsplit
+
+import cloudinary
+import cloudinary.api_client.call_api
+import cloudinary.uploader
+from cloudinary.api_client.tcp_keep_alive_manager import TCPKeepAlivePoolManager
+from urllib3 import Retry, Timeout
+
+from src.conf.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StorageMetrics:
+    """
+    Collects per-action latency statistics of storage API calls.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._stats = defaultdict(
+            lambda: {"count": 0, "errors": 0, "total": 0.0, "max": 0.0}
+        )
+
+    def observe(self, action: str, elapsed: float, failed: bool = False):
+        """
+        Records one call.
+
+        Args:
+            action (str): The API action, e.g. "upload" or "explicit".\n
+            elapsed (float): The call duration in seconds.\n
+            failed (bool): Whether the call raised an error.\n
+        """
+        with self._lock:
+            stats = self._stats[action]
+            stats["count"] += 1
+            stats["errors"] += int(failed)
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+        logger.debug("Storage call %s took %.1f ms", action, elapsed * 1000)
+
+    def snapshot(self) -> dict:
+        """
+        Returns the collected statistics with average latencies.
+
+        Returns:
+            dict: The statistics keyed by action.
+        """
+        with self._lock:
+            return {
+                action: {**stats, "avg": stats["total"] / stats["count"]}
+                for action, stats in self._stats.items()
+            }
+
+
+storage_metrics = StorageMetrics()
+
+
+class InstrumentedPoolManager(TCPKeepAlivePoolManager):
+    """
+    Keep-alive connection pool manager that times every request.
+    """
+
+    def urlopen(self, method, url, redirect=True, **kw):
+        action = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = super().urlopen(method, url, redirect=redirect, **kw)
+            failed = response.status >= 500
+            return response
+        finally:
+            storage_metrics.observe(action, time.perf_counter() - start, failed)
+
+
+_configured = False
+
+
+def configure_storage():
+    """
+    Configures the Cloudinary SDK once per process.
+
+    All SDK modules are pointed at one shared keep-alive pool manager with the
+    configured pool size, timeouts and retry policy, so connections and TLS
+    sessions are reused across uploads, transformations and deletions.
+    """
+    global _configured
+    if _configured:
+        return
+    cloudinary.config(
+        cloud_name=settings.cloudinary_name,
+        api_key=settings.cloudinary_api_key,
+        api_secret=settings.cloudinary_api_secret,
+        secure=True,
+    )
+    http = InstrumentedPoolManager(
+        num_pools=4,
+        maxsize=settings.cloudinary_pool_size,
+        timeout=Timeout(
+            connect=settings.cloudinary_connect_timeout,
+            read=settings.cloudinary_read_timeout,
+        ),
+        retries=Retry(
+            total=settings.cloudinary_retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=None,
+            raise_on_status=False,
+        ),
+        **cloudinary.CERT_KWARGS,
+    )
+    cloudinary.uploader._http = http
+    cloudinary.api_client.call_api._http = http
+    _configured = True
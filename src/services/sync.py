@@ -0,0 +1,220 @@
+import base64
+import json
+import logging
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from src.conf.config import settings
+from src.database.db import SessionLocal
+from src.database.models import User
+from src.repository import images as images_repository
+from src.repository import sync as sync_repository
+from src.repository.tombstones import prune_tombstones
+from src.schemas import SyncImage
+from src.services.workers import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+STREAMS = ("images", "comments", "deleted")
+
+
+def encode_position(position) -> list:
+    changed_at, last_id = position
+    return [changed_at and changed_at.isoformat(), last_id]
+
+
+def decode_position(value) -> tuple:
+    changed_at, last_id = value
+    if changed_at is not None:
+        changed_at = datetime.fromisoformat(changed_at)
+    if last_id is not None:
+        last_id = int(last_id)
+    return changed_at, last_id
+
+
+class SyncService:
+    """
+    Delta sync of a user's images and the comments on them.
+
+    A sync token is an opaque, server-issued position. A sync round returns every
+    image, comment and deletion changed after the round's start and up to a bound
+    fixed by its first page, a few seconds in the past so that transactions still
+    committing with an earlier timestamp are picked up by the next round. The
+    pages of a round continue each change stream from its own keyset position,
+    and the token of the last page starts the next round at the bound.
+
+    Comment writes do not change the update time of an image, so synced images
+    leave out comment_count and last_commented_at; clients derive them from the
+    synced comments.
+    """
+
+    def __init__(
+        self,
+        settle_seconds: int = settings.sync_settle_seconds,
+        retention_days: int = settings.sync_tombstone_retention_days,
+    ):
+        self.settle = timedelta(seconds=settle_seconds)
+        self.retention = timedelta(days=retention_days)
+        self._prune = PeriodicTask(self.prune, 6 * 60 * 60)
+
+    @staticmethod
+    def encode_token(state: dict) -> str:
+        data = json.dumps(state, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+    def decode_token(self, token: str, now: datetime) -> dict:
+        """Reads a sync token and checks that its deletions are still retained.
+
+        Args:
+            token (str): The token of the previous page.\n
+            now (datetime): The current time.\n
+
+        Returns:
+            dict: The round start, the round bound and the stream positions.
+
+        Raises:
+            HTTPException: If the token is malformed, or expired so that the client
+            has to sync again from scratch.
+        """
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            since = state["since"] and datetime.fromisoformat(state["since"])
+            until = state.get("until") and datetime.fromisoformat(state["until"])
+            positions = {
+                stream: decode_position(state.get(stream, [state["since"], None]))
+                for stream in STREAMS
+            }
+        except (ValueError, TypeError, KeyError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync token"
+            )
+        if since is not None and since < now - self.retention:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Sync token expired, sync again without a token",
+            )
+        return {"since": since, "until": until, **positions}
+
+    async def changes(
+        self, user: User, token: str | None, limit: int, db: Session
+    ) -> dict:
+        """Returns one page of the changes in a user's library.
+
+        Args:
+            user (User): The owner of the library.\n
+            token (str, optional): The sync token of the previous page; None for a full sync.\n
+            limit (int): The maximum number of changes of each kind.\n
+            db (Session): The database session.\n
+
+        Returns:
+            dict: The changed images and comments, the deletions, the next sync token
+            and whether more pages of this round follow.
+        """
+        now = datetime.now()
+        if token is None:
+            state = {"since": None, "until": None}
+            state["images"] = state["comments"] = (None, None)
+        else:
+            state = self.decode_token(token, now)
+        until = state["until"] or now - self.settle
+        if state["since"] is not None and state["since"] > until:
+            until = state["since"]
+        if state["since"] is None:
+            # A full sync has nothing to delete.
+            state["deleted"] = (until, None)
+
+        changed = await sync_repository.get_changed_images(
+            user, state["images"], until, limit + 1, db
+        )
+        comments = await sync_repository.get_changed_comment_rows(
+            user, state["comments"], until, limit + 1, db
+        )
+        tombstones = await sync_repository.get_tombstones(
+            user, state["deleted"], until, limit + 1, db
+        )
+        has_more = any(len(rows) > limit for rows in (changed, comments, tombstones))
+        changed, comments, tombstones = (
+            changed[:limit],
+            comments[:limit],
+            tombstones[:limit],
+        )
+        images, _ = await images_repository.get_image_rows_by_ids(
+            [row.id for row in changed],
+            user,
+            db,
+            fields=list(SyncImage.model_fields),
+        )
+
+        if has_more:
+            positions = {
+                "images": (
+                    (changed[-1].updated_at, changed[-1].id)
+                    if changed
+                    else state["images"]
+                ),
+                "comments": (
+                    (comments[-1]["updated_at"], comments[-1]["id"])
+                    if comments
+                    else state["comments"]
+                ),
+                "deleted": (
+                    (tombstones[-1].deleted_at, tombstones[-1].id)
+                    if tombstones
+                    else state["deleted"]
+                ),
+            }
+            next_state = {
+                "since": state["since"] and state["since"].isoformat(),
+                "until": until.isoformat(),
+                **{
+                    stream: encode_position(position)
+                    for stream, position in positions.items()
+                },
+            }
+        else:
+            next_state = {"since": until.isoformat()}
+
+        return {
+            "images": images,
+            "comments": comments,
+            "deleted": [
+                {"type": row.kind, "id": row.object_id, "deleted_at": row.deleted_at}
+                for row in tombstones
+            ],
+            "sync_token": self.encode_token(next_state),
+            "has_more": has_more,
+        }
+
+    async def prune(self) -> bool:
+        """
+        Deletes the tombstones that no accepted sync token can reach.
+
+        Returns:
+            bool: Always False, the job runs once per interval.
+        """
+        db = SessionLocal()
+        try:
+            pruned = await prune_tombstones(datetime.now() - self.retention, db)
+        finally:
+            db.close()
+        if pruned:
+            logger.info("Pruned %d sync tombstones", pruned)
+        return False
+
+    def start(self):
+        """
+        Starts the tombstone pruning.
+        """
+        self._prune.start()
+
+    async def stop(self):
+        """
+        Stops the tombstone pruning.
+        """
+        await self._prune.stop()
+
+
+sync_service = SyncService()
@@ -0,0 +1,174 @@
+import asyncio
+import heapq
+import json
+import logging
+import os
+from bisect import bisect_left, insort
+from threading import Lock
+from uuid import uuid4
+
+import redis
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from src.database.db import SessionLocal
+from src.database.models import Tag, image_m2m_tag
+from src.database.redis import async_redis_client, redis_client
+from src.services.workers import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+TAG_EVENTS_CHANNEL = "tags:events"
+
+
+class TagIndex:
+    """
+    In-process prefix index of tag names with usage counts.
+
+    Names are kept in a sorted array and prefix lookups are answered with bisect,
+    so suggestions never touch the database. Changes made by this worker are
+    published over Redis and applied by the other workers.
+    """
+
+    max_candidates = 5000
+    reload_interval = 10 * 60
+
+    def __init__(self):
+        self._keys = []
+        self._names = {}
+        self._counts = {}
+        self._lock = Lock()
+        self._origin = f"{os.getpid()}:{uuid4().hex}"
+        self._reload = PeriodicTask(self.reload, self.reload_interval)
+        self._listener = None
+
+    def load(self, db: Session):
+        """Rebuilds the index from the tags table.
+
+        Args:
+            db (Session): The database session.
+        """
+        rows = (
+            db.query(Tag.name, func.count(image_m2m_tag.c.id))
+            .outerjoin(image_m2m_tag, image_m2m_tag.c.tag == Tag.id)
+            .group_by(Tag.id, Tag.name)
+            .all()
+        )
+        names = {name.lower(): name for name, _ in rows}
+        counts = {}
+        for name, count in rows:
+            counts[name.lower()] = counts.get(name.lower(), 0) + count
+        keys = sorted(names)
+        with self._lock:
+            self._keys, self._names, self._counts = keys, names, counts
+
+    def apply(self, changes: dict[str, int]):
+        """Adds new tags and adjusts usage counts.
+
+        Args:
+            changes (dict[str, int]): Usage deltas keyed by tag name; a delta of 0
+                just registers the tag.
+        """
+        with self._lock:
+            for name, delta in changes.items():
+                key = name.lower()
+                if key not in self._names:
+                    self._names[key] = name
+                    self._counts[key] = 0
+                    insort(self._keys, key)
+                self._counts[key] = max(self._counts[key] + delta, 0)
+
+    def record(self, changes: dict[str, int]):
+        """Applies changes locally and publishes them to the other workers.
+
+        Args:
+            changes (dict[str, int]): Usage deltas keyed by tag name.
+        """
+        if not changes:
+            return
+        self.apply(changes)
+        message = json.dumps({"origin": self._origin, "changes": changes})
+        try:
+            redis_client.publish(TAG_EVENTS_CHANNEL, message)
+        except redis.RedisError as e:
+            logger.warning("Could not publish tag changes: %s", e)
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[tuple[str, int]]:
+        """Returns the most used tags that start with the prefix.
+
+        Args:
+            prefix (str): The typed prefix, case-insensitive.\n
+            limit (int): The maximum number of suggestions.\n
+
+        Returns:
+            list[tuple[str, int]]: Tag names with their usage counts, most used first.
+        """
+        prefix = prefix.lower()
+        with self._lock:
+            start = bisect_left(self._keys, prefix)
+            candidates = []
+            for key in self._keys[start : start + self.max_candidates]:
+                if not key.startswith(prefix):
+                    break
+                candidates.append(key)
+            best = heapq.nlargest(
+                limit, candidates, key=lambda key: (self._counts[key], -len(key))
+            )
+            return [(self._names[key], self._counts[key]) for key in best]
+
+    async def reload(self) -> bool:
+        """
+        Reloads the index from the database to correct any drift.
+        """
+        db = SessionLocal()
+        try:
+            self.load(db)
+        finally:
+            db.close()
+        return False
+
+    async def listen(self):
+        """
+        Applies tag changes published by other workers.
+        """
+        while True:
+            pubsub = async_redis_client.pubsub()
+            try:
+                await pubsub.subscribe(TAG_EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    event = json.loads(message["data"])
+                    if event["origin"] != self._origin:
+                        self.apply(event["changes"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Tag event listener failed, retrying: %s", e)
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.reset()
+
+    def start(self):
+        """
+        Starts the periodic reload, which also builds the index, and the listener.
+        """
+        self._reload.start()
+        if self._listener is None:
+            self._listener = asyncio.create_task(self.listen())
+
+    async def stop(self):
+        """
+        Stops the background tasks.
+        """
+        await self._reload.stop()
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+tag_index = TagIndex()
@@ -0,0 +1,174 @@
+import logging
+
+import redis
+from sqlalchemy.orm import Session
+
+from src.conf.config import settings
+from src.database.models import Image
+from src.database.redis import redis_client
+from src.repository import follows as follows_repository
+
+logger = logging.getLogger(__name__)
+
+
+class TimelineService:
+    """
+    Home timelines materialized as capped Redis lists of image IDs.
+
+    New images are pushed to the timelines of the author's followers when they are
+    uploaded. Authors with more followers than the fan-out limit are skipped and
+    their images are merged in when a timeline is read, so one upload never writes
+    to an unbounded number of lists.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.timeline_size,
+        fanout_limit: int = settings.timeline_fanout_limit,
+    ):
+        self.size = size
+        self.fanout_limit = fanout_limit
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"timeline:{user_id}"
+
+    async def fan_out(self, image: Image, db: Session):
+        """Pushes a new image to the materialized timelines of the author's followers.
+
+        Args:
+            image (Image): The committed image.\n
+            db (Session): The database session.\n
+        """
+        follower_ids = await follows_repository.get_follower_ids(
+            image.user_id, db, limit=self.fanout_limit + 1
+        )
+        if not follower_ids or len(follower_ids) > self.fanout_limit:
+            return
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for follower_id in follower_ids:
+                pipe.lpushx(self.key(follower_id), image.id)
+                pipe.ltrim(self.key(follower_id), 0, self.size - 1)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Could not fan out image %s: %s", image.id, e)
+
+    async def add_followed(self, user_id: int, followed_id: int, db: Session):
+        """Merges the recent images of a newly followed user into a timeline.
+
+        Args:
+            user_id (int): The ID of the follower.\n
+            followed_id (int): The ID of the followed user.\n
+            db (Session): The database session.\n
+        """
+        image_ids = await follows_repository.get_recent_image_ids(
+            [followed_id], db, limit=self.size
+        )
+        if not image_ids:
+            return
+        key = self.key(user_id)
+        try:
+            with redis_client.pipeline() as pipe:
+                while True:
+                    try:
+                        pipe.watch(key)
+                        if not pipe.exists(key):
+                            return
+                        current = [int(item) for item in pipe.lrange(key, 0, -1)]
+                        merged = sorted(set(current) | set(image_ids), reverse=True)
+                        pipe.multi()
+                        pipe.delete(key)
+                        pipe.rpush(key, *merged[: self.size])
+                        pipe.execute()
+                        return
+                    except redis.WatchError:
+                        continue
+        except redis.RedisError as e:
+            logger.warning("Could not update timeline of user %s: %s", user_id, e)
+
+    async def remove_followed(self, user_id: int, followed_id: int, db: Session):
+        """Removes the images of an unfollowed user from a timeline.
+
+        Args:
+            user_id (int): The ID of the former follower.\n
+            followed_id (int): The ID of the unfollowed user.\n
+            db (Session): The database session.\n
+        """
+        image_ids = await follows_repository.get_recent_image_ids(
+            [followed_id], db, limit=self.size
+        )
+        if not image_ids:
+            return
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for image_id in image_ids:
+                pipe.lrem(self.key(user_id), 0, image_id)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Could not update timeline of user %s: %s", user_id, e)
+
+    async def rebuild(self, user_id: int, db: Session) -> list[int]:
+        """Materializes a timeline that is missing from Redis.
+
+        Args:
+            user_id (int): The ID of the timeline owner.\n
+            db (Session): The database session.\n
+
+        Returns:
+            list[int]: The image IDs of the timeline, newest first.
+        """
+        image_ids = await follows_repository.get_followed_image_ids(
+            user_id, self.fanout_limit, db, limit=self.size
+        )
+        if image_ids:
+            try:
+                pipe = redis_client.pipeline()
+                pipe.delete(self.key(user_id))
+                pipe.rpush(self.key(user_id), *image_ids)
+                pipe.execute()
+            except redis.RedisError as e:
+                logger.warning("Could not store timeline of user %s: %s", user_id, e)
+        return image_ids
+
+    async def read(
+        self, user_id: int, db: Session, before_id: int | None = None, limit: int = 20
+    ) -> tuple[list[int], int | None]:
+        """Returns one page of a home timeline.
+
+        Args:
+            user_id (int): The ID of the timeline owner.\n
+            db (Session): The database session.\n
+            before_id (int, optional): Only return images with a smaller ID (the cursor).\n
+            limit (int): The page size.\n
+
+        Returns:
+            tuple: The image IDs of the page, newest first, and the next cursor.
+        """
+        key = self.key(user_id)
+        end = limit if before_id is None else -1
+        try:
+            image_ids = [int(item) for item in redis_client.lrange(key, 0, end)]
+        except redis.RedisError as e:
+            logger.warning("Could not read timeline of user %s: %s", user_id, e)
+            image_ids = []
+        if not image_ids:
+            image_ids = await self.rebuild(user_id, db)
+        if before_id is not None:
+            image_ids = [image_id for image_id in image_ids if image_id < before_id]
+
+        popular_ids = await follows_repository.get_popular_followed_ids(
+            user_id, self.fanout_limit, db
+        )
+        if popular_ids:
+            merged = await follows_repository.get_recent_image_ids(
+                popular_ids, db, before_id=before_id, limit=limit + 1
+            )
+            image_ids = sorted(set(image_ids) | set(merged), reverse=True)
+
+        image_ids = image_ids[: limit + 1]
+        next_cursor = image_ids[limit - 1] if len(image_ids) > limit else None
+        return image_ids[:limit], next_cursor
+
+
+timeline_service = TimelineService()
@@ -0,0 +1,156 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+import redis
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.database.db import SessionLocal
+from src.database.redis import redis_client
+from src.repository.trends import save_tag_trend_bucket
+from src.services.workers import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+HOUR_FORMAT = "%Y%m%d%H"
+DAY_FORMAT = "%Y%m%d"
+
+
+class TrendingTags:
+    """
+    Trending tags leaderboard kept in time-bucketed Redis sorted sets.
+
+    Every tag attachment increments the tag in the sorted set of the current hour
+    and of the current day. Windows are unions of the latest buckets, cached for a
+    short time, and closed hourly buckets are copied to the database.
+    """
+
+    prefix = "trending:tags"
+    windows = {"hour": ("h", 1), "day": ("h", 24), "week": ("d", 7)}
+    window_cache_ttl = 60
+    bucket_ttl = 8 * 24 * 60 * 60
+    persist_lookback = 24
+    persist_interval = 10 * 60
+
+    def __init__(self):
+        self._persist = PeriodicTask(self.persist_closed_buckets, self.persist_interval)
+
+    def hour_key(self, moment: datetime) -> str:
+        return f"{self.prefix}:h:{moment.strftime(HOUR_FORMAT)}"
+
+    def day_key(self, moment: datetime) -> str:
+        return f"{self.prefix}:d:{moment.strftime(DAY_FORMAT)}"
+
+    def record(self, tag_names: list[str], now: Optional[datetime] = None):
+        """Counts tag attachments in the current hour and day buckets.
+
+        Args:
+            tag_names (list[str]): The attached tag names, repeated per attachment.\n
+            now (datetime, optional): The time of the attachment.\n
+        """
+        if not tag_names:
+            return
+        now = now or datetime.utcnow()
+        hour_key, day_key = self.hour_key(now), self.day_key(now)
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for name in tag_names:
+                pipe.zincrby(hour_key, 1, name)
+                pipe.zincrby(day_key, 1, name)
+            pipe.expire(hour_key, self.bucket_ttl)
+            pipe.expire(day_key, self.bucket_ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Could not record trending tags: %s", e)
+
+    def bucket_keys(self, window: str, now: datetime) -> list[str]:
+        """Returns the bucket keys that make up a window.
+
+        Args:
+            window (str): "hour", "day" or "week".\n
+            now (datetime): The end of the window.\n
+
+        Returns:
+            list[str]: The sorted set keys.
+        """
+        kind, size = self.windows[window]
+        if kind == "h":
+            return [self.hour_key(now - timedelta(hours=i)) for i in range(size)]
+        return [self.day_key(now - timedelta(days=i)) for i in range(size)]
+
+    def top(self, window: str, limit: int = 10, now: Optional[datetime] = None):
+        """Returns the most used tags of a window.
+
+        Args:
+            window (str): "hour", "day" or "week".\n
+            limit (int): The number of tags.\n
+            now (datetime, optional): The end of the window.\n
+
+        Returns:
+            list[tuple[str, int]]: Tag names with their usage counts, most used first;
+            empty if Redis is unavailable.
+        """
+        now = now or datetime.utcnow()
+        keys = self.bucket_keys(window, now)
+        try:
+            if len(keys) == 1:
+                source = keys[0]
+            else:
+                source = f"{self.prefix}:window:{window}"
+                if not redis_client.exists(source):
+                    pipe = redis_client.pipeline()
+                    pipe.zunionstore(source, keys)
+                    pipe.expire(source, self.window_cache_ttl)
+                    pipe.execute()
+            rows = redis_client.zrevrange(source, 0, limit - 1, withscores=True)
+        except redis.RedisError as e:
+            logger.warning("Could not read trending tags: %s", e)
+            return []
+        return [(name.decode(), int(score)) for name, score in rows]
+
+    async def persist_closed_buckets(self) -> bool:
+        """
+        Copies finished hourly buckets to the database, once per bucket across workers.
+
+        A bucket whose copy fails is released again, so a later run retries it.
+        """
+        current = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        db = SessionLocal()
+        try:
+            for i in range(1, self.persist_lookback + 1):
+                bucket = current - timedelta(hours=i)
+                claim = f"{self.prefix}:persisted:{bucket.strftime(HOUR_FORMAT)}"
+                if not redis_client.set(claim, 1, nx=True, ex=self.bucket_ttl):
+                    continue
+                try:
+                    rows = redis_client.zrange(
+                        self.hour_key(bucket), 0, -1, withscores=True
+                    )
+                    if rows:
+                        counts = {name.decode(): int(score) for name, score in rows}
+                        await save_tag_trend_bucket(bucket, counts, db)
+                except (redis.RedisError, SQLAlchemyError) as e:
+                    db.rollback()
+                    logger.warning("Could not persist trending bucket %s: %s", bucket, e)
+                    try:
+                        redis_client.delete(claim)
+                    except redis.RedisError:
+                        pass
+        finally:
+            db.close()
+        return False
+
+    def start(self):
+        """
+        Starts the periodic persistence of closed buckets.
+        """
+        self._persist.start()
+
+    async def stop(self):
+        """
+        Stops the periodic persistence.
+        """
+        await self._persist.stop()
+
+
+trending_tags = TrendingTags()
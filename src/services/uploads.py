@@ -0,0 +1,210 @@
+import os
+from hashlib import sha256
+from pathlib import Path
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from src.conf.config import settings
+from src.database.db import SessionLocal
+from src.database.models import UploadSession
+from src.repository import uploads as uploads_repository
+from src.services.workers import PeriodicTask
+
+
+class UploadService:
+    """
+    A class that stores resumable uploads on local disk chunk by chunk.
+
+    Chunks are streamed straight to the session file, so memory use per upload does
+    not depend on the file size.
+    """
+
+    upload_dir = Path(settings.upload_dir)
+    chunk_size = settings.upload_chunk_size
+    claim_lease = 5 * 60
+    cleanup_batch_size = 100
+
+    def __init__(self):
+        self._cleanup = PeriodicTask(self.purge_expired, 15 * 60)
+
+    def path(self, upload_id: str) -> Path:
+        """Returns the path of the file that holds the session data.
+
+        Args:
+            upload_id (str): The ID of the upload session.
+
+        Returns:
+            Path: The file path.
+        """
+        return self.upload_dir / f"{upload_id}.part"
+
+    async def create_file(self, session: UploadSession):
+        """Creates the empty file of a new session.
+
+        Args:
+            session (UploadSession): The upload session.
+        """
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        await run_in_threadpool(self.path(session.id).touch)
+
+    async def write_chunk(
+        self, session: UploadSession, offset: int, stream, checksum: str, db: Session
+    ) -> UploadSession:
+        """Streams a chunk to the session file at the given offset.
+
+        The session is claimed before the file is touched, so concurrent requests
+        for the same session cannot write over each other.
+
+        Args:
+            session (UploadSession): The upload session.\n
+            offset (int): The position of the chunk in the file.\n
+            stream: An async iterator over the chunk bytes.\n
+            checksum (str): The expected SHA-256 hex digest of the chunk.\n
+            db (Session): The database session.\n
+
+        Returns:
+            UploadSession: The updated session.
+
+        Raises:
+            HTTPException: If the offset is wrong, another chunk is being written, the chunk is too large or its checksum does not match.
+        """
+        if offset != session.received:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Expected offset {session.received}",
+            )
+        if not await uploads_repository.claim_session(
+            session, offset, self.claim_lease, db
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Another chunk is being written",
+            )
+        limit = min(self.chunk_size, session.total_size - offset)
+        digest = sha256()
+        written = 0
+        with open(self.path(session.id), "r+b") as f:
+            f.seek(offset)
+            try:
+                async for data in stream:
+                    written += len(data)
+                    if written > limit:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail="Chunk exceeds the allowed size",
+                        )
+                    digest.update(data)
+                    await run_in_threadpool(f.write, data)
+                if digest.hexdigest() != checksum.lower():
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Chunk checksum mismatch",
+                    )
+            except BaseException:
+                f.truncate(offset)
+                await uploads_repository.release_session(session, db)
+                raise
+            f.truncate(offset + written)
+        return await uploads_repository.update_received(session, offset + written, db)
+
+    async def open_completed(self, session: UploadSession, db: Session) -> UploadFile:
+        """Claims a fully received session, opens its file and verifies its checksum.
+
+        The claim keeps concurrent finalize requests from storing the file twice. The
+        caller releases it with release() if the upload cannot be finalized.
+
+        Args:
+            session (UploadSession): The upload session.\n
+            db (Session): The database session.\n
+
+        Returns:
+            UploadFile: The assembled file, rewound to the start.
+
+        Raises:
+            HTTPException: If the upload is incomplete, already being finalized or the file checksum does not match.
+        """
+        if session.received != session.total_size:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload incomplete: {session.received} of {session.total_size} bytes",
+            )
+        if not await uploads_repository.claim_session(
+            session, session.total_size, self.claim_lease, db
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload is already being finalized",
+            )
+        file = UploadFile(file=open(self.path(session.id), "rb"), filename=session.id)
+        if session.checksum:
+            digest = sha256()
+            while data := await file.read(self.chunk_size):
+                digest.update(data)
+            await file.seek(0)
+            if digest.hexdigest() != session.checksum.lower():
+                await file.close()
+                await self.release(session, db)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="File checksum mismatch",
+                )
+        return file
+
+    async def release(self, session: UploadSession, db: Session):
+        """Releases the claim of a session that could not be finalized.
+
+        Args:
+            session (UploadSession): The upload session.\n
+            db (Session): The database session.\n
+        """
+        await uploads_repository.release_session(session, db)
+
+    async def discard(self, session: UploadSession, db: Session):
+        """Deletes the session and its file.
+
+        Args:
+            session (UploadSession): The upload session.\n
+            db (Session): The database session.\n
+        """
+        await run_in_threadpool(self._remove_file, session.id)
+        await uploads_repository.delete_upload_session(session, db)
+
+    def _remove_file(self, upload_id: str):
+        try:
+            os.remove(self.path(upload_id))
+        except FileNotFoundError:
+            pass
+
+    async def purge_expired(self) -> bool:
+        """Deletes one batch of abandoned sessions and their files.
+
+        Returns:
+            bool: True if the batch was full and more sessions may be expired.
+        """
+        db = SessionLocal()
+        try:
+            sessions = await uploads_repository.get_expired_upload_sessions(
+                self.cleanup_batch_size, db
+            )
+            for session in sessions:
+                await self.discard(session, db)
+        finally:
+            db.close()
+        return len(sessions) >= self.cleanup_batch_size
+
+    def start(self):
+        """
+        Starts the periodic cleanup of expired sessions.
+        """
+        self._cleanup.start()
+
+    async def stop(self):
+        """
+        Stops the periodic cleanup.
+        """
+        await self._cleanup.stop()
+
+
+upload_service = UploadService()
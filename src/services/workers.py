@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from src.conf.config import settings
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Returns the shared process pool used for CPU-bound work, creating it on first use.
+
+    Returns:
+        ProcessPoolExecutor: The worker pool.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.cpu_workers)
+    return _executor
+
+
+async def run_cpu_bound(func, *args, **kwargs):
+    """
+    Runs a CPU-bound function in the worker pool without blocking the event loop.
+
+    Args:
+        func: A picklable module-level function.\n
+        *args: Positional arguments for the function.\n
+        **kwargs: Keyword arguments for the function.\n
+
+    Returns:
+        The value returned by the function.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+def shutdown_executor():
+    """
+    Shuts the worker pool down, waiting for running tasks to finish.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+class PeriodicTask:
+    """
+    Runs a coroutine function repeatedly on the event loop until stopped.
+
+    The function may return True to signal that more work is pending, in which case
+    the next run starts immediately instead of after the interval.
+    """
+
+    def __init__(self, func, interval: float):
+        self.func = func
+        self.interval = interval
+        self._task = None
+
+    async def run(self):
+        """
+        Calls the function forever, sleeping between idle runs.
+        """
+        while True:
+            try:
+                more = await self.func()
+            except Exception as e:
+                logger.exception("Periodic task %s failed: %s", self.func.__name__, e)
+                more = False
+            if not more:
+                await asyncio.sleep(self.interval)
+
+    def start(self):
+        """
+        Starts the task on the running event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """
+        Cancels the task and waits for it to finish.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable
+
+
+class LRUCache:
+    """
+    A bounded, thread-safe least-recently-used cache.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None):
+        """
+        Returns the cached value for the key and marks it as recently used.
+
+        Args:
+            key (Hashable): The cache key.\n
+            default (Any): The value returned when the key is missing.\n
+
+        Returns:
+            Any: The cached value or the default.
+        """
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Stores a value, evicting the least recently used entry when full.
+
+        Args:
+            key (Hashable): The cache key.\n
+            value (Any): The value to store.\n
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None):
+        """
+        Removes the key from the cache.
+
+        Args:
+            key (Hashable): The cache key.\n
+            default (Any): The value returned when the key is missing.\n
+
+        Returns:
+            Any: The removed value or the default.
+        """
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        """
+        Removes every entry from the cache.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
@@ -0,0 +1,88 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import sha1
+
+from fastapi import Request, Response
+
+
+def weak_etag(*parts) -> str:
+    """
+    Builds a weak ETag from the values that identify a version of a resource.
+
+    :param parts: Row versions, counts and other values the response depends on.
+
+    :return: The quoted weak ETag value.
+    """
+    key = "|".join("" if part is None else str(part) for part in parts)
+    return f'W/"{sha1(key.encode()).hexdigest()[:32]}"'
+
+
+def to_http_datetime(value: datetime) -> datetime:
+    """
+    Converts a stored timestamp to an aware UTC time with whole seconds.
+
+    :param value: A naive local or an aware timestamp.
+
+    :return: The timestamp in UTC.
+    """
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def cache_headers(
+    etag: str, last_modified: datetime | None, cache_control: str
+) -> dict[str, str]:
+    """
+    Builds the validator and caching headers of a response.
+
+    :param etag: The ETag of the response.
+    :param last_modified: The time of the last change, if known.
+    :param cache_control: The Cache-Control policy of the route.
+
+    :return: The headers.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            to_http_datetime(last_modified), usegmt=True
+        )
+    return headers
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: datetime | None = None
+) -> bool:
+    """
+    Evaluates If-None-Match, or If-Modified-Since when no ETags are sent.
+
+    :param request: The incoming request.
+    :param etag: The current ETag of the resource.
+    :param last_modified: The time of the last change, if known.
+
+    :return: True if the client's cached copy is still valid.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        current = etag.removeprefix("W/")
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or current in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return to_http_datetime(last_modified) <= since
+    return False
+
+
+def not_modified(headers: dict[str, str]) -> Response:
+    """
+    Builds an empty 304 response.
+
+    :param headers: The validator and caching headers.
+
+    :return: The response.
+    """
+    return Response(status_code=304, headers=headers)
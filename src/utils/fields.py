@@ -0,0 +1,50 @@
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+
+def has_field(model: type[BaseModel], path: str) -> bool:
+    """
+    Checks that a dotted field path exists in a response model.
+
+    :param model: The response model.
+    :param path: A field name, or a dotted path into a nested model.
+
+    :return: True if the field exists.
+    """
+    name, _, rest = path.partition(".")
+    field = model.model_fields.get(name)
+    if field is None:
+        return False
+    if not rest:
+        return True
+    nested = field.annotation
+    return (
+        isinstance(nested, type)
+        and issubclass(nested, BaseModel)
+        and has_field(nested, rest)
+    )
+
+
+def parse_fields(fields: str | None, model: type[BaseModel]) -> list[str] | None:
+    """
+    Parses a comma-separated fields= parameter against a response model.
+
+    :param fields: The parameter value, or None to request every field.
+    :param model: The response model the fields must belong to.
+
+    :return: The distinct field paths in request order, or None for every field.
+
+    :raises HTTPException: If no field or an unknown field is requested.
+    """
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",")))
+    names = [name for name in names if name]
+    if not names:
+        raise HTTPException(status_code=400, detail="Request at least one field")
+    unknown = [name for name in names if not has_field(model, name)]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return names
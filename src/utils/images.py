@@ -0,0 +1,86 @@
+from io import BytesIO
+
+from PIL import Image as PILImage, ImageOps
+
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+
+SNIFF_SIZE = 16
+
+
+def sniff_image_format(header: bytes) -> str | None:
+    """
+    Detects the image format from the leading bytes of a file.
+
+    :param header: At least the first 12 bytes of the file.
+
+    :return: The format name, or None if the bytes are not a supported image.
+    """
+    for signature, name in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return name
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def get_image_size(fp) -> tuple[int, int] | None:
+    """
+    Reads the image dimensions from its header without decoding the pixels.
+
+    :param fp: A binary file object positioned at the start of the image.
+
+    :return: The width and height.
+    """
+    with PILImage.open(fp) as image:
+        return image.size
+
+
+def recompress_image(data: bytes, max_dimension: int, quality: int, fmt: str) -> bytes:
+    """
+    Downscales an image, drops its metadata and re-encodes it.
+
+    Runs inside the worker pool, so it must stay module-level.
+
+    :param data: The original image bytes.
+    :param max_dimension: The maximum width and height of the result.
+    :param quality: The encoder quality, from 1 to 100.
+    :param fmt: The output format, "webp" or "jpeg".
+
+    :return: The re-encoded image bytes.
+    """
+    with PILImage.open(BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_dimension, max_dimension))
+        if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        buffered = BytesIO()
+        image.save(buffered, fmt.upper(), quality=quality, optimize=True)
+    return buffered.getvalue()
+
+
+def strip_metadata(data: bytes, quality: int) -> bytes:
+    """
+    Drops the metadata of an image and re-encodes it in its own format and size.
+
+    Runs inside the worker pool, so it must stay module-level.
+
+    :param data: The original image bytes.
+    :param quality: The encoder quality for lossy formats, from 1 to 100.
+
+    :return: The image bytes without EXIF and other metadata.
+    """
+    with PILImage.open(BytesIO(data)) as image:
+        fmt = image.format
+        options = {"quality": quality} if fmt in ("JPEG", "WEBP") else {}
+        if getattr(image, "is_animated", False):
+            options["save_all"] = True
+        else:
+            image = ImageOps.exif_transpose(image)
+        buffered = BytesIO()
+        image.save(buffered, fmt, **options)
+    return buffered.getvalue()
@@ -1,8 +1,37 @@
 import re
 
+from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
-from src.repository.tags import get_or_create_tag
+from src.repository.tags import get_or_create_tags
+
+MAX_TAGS_PER_IMAGE = 5
+
+
+def parse_tag_names(description: str) -> list[str]:
+    """
+    Gets the distinct hashtag names of a description, in order of appearance.
+
+    :param description: Image description.
+
+    :return: Tag name list.
+    """
+    return list(dict.fromkeys(re.findall(r"#(\w+)", description)))
+
+
+def check_tag_limit(description: str):
+    """
+    Rejects descriptions with more hashtags than an image may have.
+
+    :param description: Image description.
+
+    :raises HTTPException: If the description has too many tags.
+    """
+    if len(parse_tag_names(description)) > MAX_TAGS_PER_IMAGE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"An image can have at most {MAX_TAGS_PER_IMAGE} tags",
+        )
 
 
 async def get_tags_from_description(description: str, db: Session):
@@ -14,9 +43,5 @@ async def get_tags_from_description(description: str, db: Session):
 
     :return: Tag list.
     """
-    tag_names = re.findall(r"#(\w+)", description)
-    tags = []
-    for tag_name in tag_names:
-        tag = await get_or_create_tag(db, tag_name)
-        tags.append(tag)
-    return tags
+    tag_names = parse_tag_names(description)[:MAX_TAGS_PER_IMAGE]
+    return await get_or_create_tags(db, tag_names)
@@ -0,0 +1,218 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from datetime import datetime
+
+import msgpack
+from fastapi import FastAPI, Request
+from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.middleware import (
+    CompressionMiddleware,
+    MaxBodySizeMiddleware,
+    MessagePackMiddleware,
+    parse_accept,
+)
+from src.responses import DefaultJSONResponse
+
+
+def create_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    async def large():
+        return PlainTextResponse("x" * 1000)
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("x")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            yield "data: " + "x" * 500 + "\n\n"
+            yield "data: y\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/events")
+    async def events():
+        return StreamingResponse(iter(["data: x\n\n"]), media_type="text/event-stream")
+
+    return app
+
+
+class TestCompressionMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(create_app())
+        self.gzip = {"Accept-Encoding": "gzip"}
+
+    def test_compresses_large_body(self):
+        response = self.client.get("/large", headers=self.gzip)
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.headers["vary"], "Accept-Encoding")
+        self.assertEqual(response.text, "x" * 1000)
+        self.assertLess(int(response.headers["content-length"]), 100)
+
+    def test_prefers_brotli(self):
+        response = self.client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual(response.headers["content-encoding"], "br")
+        self.assertEqual(response.text, "x" * 1000)
+
+    def test_skips_small_body(self):
+        response = self.client.get("/small", headers=self.gzip)
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(response.text, "x")
+
+    def test_skips_without_accept_encoding(self):
+        response = self.client.get("/large", headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("content-encoding", response.headers)
+
+    def test_compresses_streamed_body(self):
+        response = self.client.get("/stream", headers=self.gzip)
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertTrue(response.text.endswith("data: y\n\n"))
+
+    def test_skips_event_streams(self):
+        response = self.client.get("/events", headers=self.gzip)
+        self.assertNotIn("content-encoding", response.headers)
+
+
+def create_limited_app():
+    app = FastAPI()
+    app.add_middleware(MaxBodySizeMiddleware, max_body_size=10, paths=("/upload",))
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        return PlainTextResponse(str(len(await request.body())))
+
+    @app.post("/other")
+    async def other(request: Request):
+        return PlainTextResponse(str(len(await request.body())))
+
+    return app
+
+
+class TestMaxBodySizeMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(create_limited_app())
+
+    def test_accepts_small_body(self):
+        response = self.client.post("/upload", content=b"x" * 10)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, "10")
+
+    def test_rejects_large_content_length(self):
+        response = self.client.post("/upload", content=b"x" * 11)
+        self.assertEqual(response.status_code, 413)
+
+    def test_rejects_large_streamed_body(self):
+        def chunks():
+            for _ in range(3):
+                yield b"x" * 5
+
+        response = self.client.post("/upload", content=chunks())
+        self.assertEqual(response.status_code, 413)
+
+    def test_ignores_other_paths(self):
+        response = self.client.post("/other", content=b"x" * 11)
+        self.assertEqual(response.status_code, 200)
+
+
+class TestDefaultJSONResponse(unittest.TestCase):
+    def test_encodes_datetimes(self):
+        response = DefaultJSONResponse([{"created_at": datetime(2024, 1, 2, 3, 4, 5)}])
+        self.assertEqual(response.body, b'[{"created_at":"2024-01-02T03:04:05"}]')
+
+
+class Item(BaseModel):
+    name: str
+    tags: list[str]
+
+
+def create_msgpack_app():
+    app = FastAPI()
+    app.add_middleware(MessagePackMiddleware, max_body_size=100)
+
+    @app.post("/items", response_model=Item)
+    async def create_item(item: Item):
+        return item
+
+    @app.get("/text")
+    async def text():
+        return PlainTextResponse("plain")
+
+    return app
+
+
+class TestMessagePackMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(create_msgpack_app())
+        self.item = {"name": "sunset", "tags": ["sea", "sky"]}
+
+    def test_parse_accept(self):
+        self.assertEqual(
+            parse_accept("application/json;q=0.5, application/msgpack"),
+            {"application/json": 0.5, "application/msgpack": 1.0},
+        )
+
+    def test_msgpack_request_and_response(self):
+        response = self.client.post(
+            "/items",
+            content=msgpack.packb(self.item),
+            headers={
+                "Content-Type": "application/msgpack",
+                "Accept": "application/msgpack",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(response.content), self.item)
+
+    def test_json_is_default(self):
+        response = self.client.post("/items", json=self.item)
+        self.assertEqual(response.json(), self.item)
+
+    def test_prefers_json_when_ranked_higher(self):
+        response = self.client.post(
+            "/items",
+            json=self.item,
+            headers={"Accept": "application/json, application/msgpack;q=0.5"},
+        )
+        self.assertEqual(response.headers["content-type"], "application/json")
+        self.assertIn("Accept", response.headers["vary"])
+
+    def test_validation_errors_are_encoded(self):
+        response = self.client.post(
+            "/items",
+            content=msgpack.packb({"name": "x"}),
+            headers={
+                "Content-Type": "application/msgpack",
+                "Accept": "application/msgpack",
+            },
+        )
+        self.assertEqual(response.status_code, 422)
+        self.assertIn("detail", msgpack.unpackb(response.content))
+
+    def test_rejects_invalid_and_large_bodies(self):
+        headers = {"Content-Type": "application/msgpack"}
+        invalid = self.client.post("/items", content=b"\xc1", headers=headers)
+        large = self.client.post(
+            "/items", content=msgpack.packb("x" * 200), headers=headers
+        )
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(large.status_code, 413)
+
+    def test_leaves_other_media_types(self):
+        response = self.client.get("/text", headers={"Accept": "application/msgpack"})
+        self.assertEqual(response.text, "plain")
+
+
+if __name__ == "__main__":
+    unittest.main()
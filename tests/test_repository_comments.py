@@ -14,6 +14,7 @@ from src.repository.comments import (
     edit_comment,
     delete_comment,
     get_comments_by_image_id,
+    get_latest_comments_by_image_ids,
 )
 from src.database.models import Comment, User
 
@@ -35,6 +36,8 @@ class TestComments(IsolatedAsyncioTestCase):
         db.commit.return_value = None
         db.refresh.return_value = None
         result = await add_comment(text, image_id, user, db)
+        db.query.return_value.filter.return_value.update.assert_called_once()
+        db.commit.assert_called_once()
         self.assertEqual(result.text, comment.text)
         self.assertEqual(result.image_id, comment.image_id)
         self.assertEqual(result.user_id, comment.user_id)
@@ -104,6 +107,7 @@ class TestComments(IsolatedAsyncioTestCase):
         result = await delete_comment(comment_id, user, db)
         self.assertEqual(result, comment)
         db.delete.assert_called_once_with(comment)
+        db.query.return_value.filter.return_value.update.assert_called_once()
         db.commit.assert_called_once()
 
     async def test_delete_comment_invalid_comment_id(self):
@@ -173,6 +177,20 @@ class TestComments(IsolatedAsyncioTestCase):
         db.query.assert_called_once_with(Comment)
         db.query.return_value.filter.return_value.order_by.return_value.all.assert_called_once()
 
+    async def test_get_latest_comments_by_image_ids(self):
+        comments = [
+            Comment(id=3, image_id=1),
+            Comment(id=2, image_id=1),
+            Comment(id=5, image_id=2),
+        ]
+        db = MagicMock(spec=Session)
+        db.query.return_value.join.return_value.filter.return_value.order_by.return_value.all.return_value = (
+            comments
+        )
+        result = await get_latest_comments_by_image_ids([1, 2, 3], 2, db)
+        self.assertEqual(result, {1: comments[:2], 2: comments[2:], 3: []})
+        db.query.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from datetime import datetime
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock
+
+from sqlalchemy.orm import Session
+
+from src.repository.deletions import (
+    enqueue_deletion,
+    get_due_deletions,
+    complete_deletions,
+    retry_deletions,
+)
+from src.database.models import PendingDeletion
+
+
+class TestDeletions(IsolatedAsyncioTestCase):
+    async def test_enqueue_deletion(self):
+        db = MagicMock(spec=Session)
+        result = await enqueue_deletion("abc123", db)
+        self.assertEqual(result.public_id, "abc123")
+        self.assertEqual(result.attempts, 0)
+        db.add.assert_called_once_with(result)
+        db.commit.assert_not_called()
+
+    async def test_get_due_deletions(self):
+        deletions = [PendingDeletion(id=1, public_id="abc123")]
+        db = MagicMock(spec=Session)
+        db.query.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = (
+            deletions
+        )
+        result = await get_due_deletions(10, db)
+        self.assertEqual(result, deletions)
+        db.query.return_value.filter.return_value.order_by.return_value.limit.assert_called_once_with(
+            10
+        )
+
+    async def test_complete_deletions(self):
+        deletions = [PendingDeletion(id=1), PendingDeletion(id=2)]
+        db = MagicMock(spec=Session)
+        await complete_deletions(deletions, db)
+        self.assertEqual(db.delete.call_count, 2)
+        db.commit.assert_called_once()
+
+    async def test_retry_deletions_backoff(self):
+        deletion = PendingDeletion(id=1, public_id="abc123", attempts=3)
+        db = MagicMock(spec=Session)
+        before = datetime.now()
+        await retry_deletions([deletion], "timeout", 3600, db)
+        self.assertEqual(deletion.attempts, 4)
+        self.assertEqual(deletion.last_error, "timeout")
+        self.assertGreaterEqual((deletion.next_attempt_at - before).total_seconds(), 16)
+        db.commit.assert_called_once()
+
+    async def test_retry_deletions_max_backoff(self):
+        deletion = PendingDeletion(id=1, public_id="abc123", attempts=30)
+        db = MagicMock(spec=Session)
+        before = datetime.now()
+        await retry_deletions([deletion], "timeout", 60, db)
+        self.assertLessEqual((deletion.next_attempt_at - before).total_seconds(), 61)
+
+
+if __name__ == "__main__":
+    unittest.main()
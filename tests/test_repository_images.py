@@ -6,20 +6,28 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import unittest
 from datetime import datetime
 from unittest import IsolatedAsyncioTestCase
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import cloudinary
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
 
 from src.conf.config import settings
 from src.repository.images import (
     add_image,
+    claim_upload,
     delete_image,
     edit_description,
     get_images,
     get_image,
+    get_image_by_content_hash,
+    get_image_row,
+    get_image_rows,
+    get_image_rows_by_ids,
+    search_images_by_tags,
 )
-from src.database.models import Image, User
+from src.database.models import Base, Image, User
+from src.schemas import ImageResponse
 
 
 class TestImages(IsolatedAsyncioTestCase):
@@ -57,20 +65,57 @@ class TestImages(IsolatedAsyncioTestCase):
         self.assertEqual(result.created_at.date(), image.created_at.date())
         self.assertEqual(result.updated_at.date(), image.updated_at.date())
 
-    async def test_delete_image_existing(self):
+    @patch("src.repository.images.record_tombstone")
+    async def test_delete_image_existing(self, record_tombstone):
         image_id = 1
         user = User(id=1)
         image = Image(id=image_id, user_id=user.id, public_id="abc123")
         db = MagicMock(spec=Session)
         db.query.return_value.filter.return_value.first.return_value = image
+        db.query.return_value.filter.return_value.filter.return_value.count.return_value = (
+            0
+        )
         result = await delete_image(image_id, user, db)
         self.assertEqual(result.url, image.url)
         self.assertEqual(result.public_id, image.public_id)
         self.assertEqual(result.description, image.description)
         self.assertEqual(result.user_id, image.user_id)
+        db.add.assert_called_once()
+        self.assertEqual(db.add.call_args[0][0].public_id, image.public_id)
         db.delete.assert_called_once_with(image)
+        record_tombstone.assert_awaited_once_with("image", image_id, user.id, db)
         db.commit.assert_called_once()
 
+    @patch("src.repository.images.record_tombstone")
+    async def test_delete_image_shared_asset(self, record_tombstone):
+        image_id = 1
+        user = User(id=1)
+        image = Image(id=image_id, user_id=user.id, public_id="abc123")
+        db = MagicMock(spec=Session)
+        db.query.return_value.filter.return_value.first.return_value = image
+        db.query.return_value.filter.return_value.filter.return_value.count.return_value = (
+            1
+        )
+        result = await delete_image(image_id, user, db)
+        self.assertEqual(result, image)
+        db.add.assert_not_called()
+        db.delete.assert_called_once_with(image)
+        db.commit.assert_called_once()
+
+    async def test_get_image_by_content_hash(self):
+        image = Image(id=1, content_hash="a" * 64)
+        db = MagicMock(spec=Session)
+        db.query.return_value.filter.return_value.first.return_value = image
+        result = await get_image_by_content_hash("a" * 64, db)
+        self.assertEqual(result, image)
+
+    async def test_search_images_by_tags_missing_tag(self):
+        db = MagicMock(spec=Session)
+        db.query.return_value.filter.return_value.all.return_value = []
+        result = await search_images_by_tags(["unknown"], True, db)
+        self.assertEqual(result, [])
+        db.execute.assert_not_called()
+
     async def test_delete_image_non_existing(self):
         image_id = 1
         user = User(id=1)
@@ -134,5 +179,111 @@ class TestImages(IsolatedAsyncioTestCase):
         db.query.return_value.filter.return_value.first.assert_called_once()
 
 
+class TestImageRows(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.user = User(email="test@example.com", password="secret", username="test")
+        self.db.add(self.user)
+        self.db.commit()
+        for i in range(5):
+            await add_image("url", "public_id", f"image {i} #rows", self.user, self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    async def test_image_rows_match_image_response(self):
+        rows = await get_image_rows(self.user, self.db)
+        images = await get_images(self.user, self.db)
+        self.assertEqual(
+            [ImageResponse(**row).model_dump() for row in rows],
+            [
+                ImageResponse.model_validate(image, from_attributes=True).model_dump()
+                for image in sorted(images, key=lambda image: image.id)
+            ],
+        )
+
+    async def test_image_rows_restricted_to_fields(self):
+        rows = await get_image_rows(self.user, self.db, fields=["url", "tags"])
+        self.assertEqual(rows[0], {"url": "url", "tags": [{"name": "rows"}]})
+        row = await get_image_row(2, self.user, self.db, fields=["id"])
+        self.assertEqual(row, {"id": 2})
+
+    async def test_image_rows_by_ids_keep_order(self):
+        images, missing = await get_image_rows_by_ids([4, 9, 2], self.user, self.db)
+        self.assertEqual([image["id"] for image in images], [4, 2])
+        self.assertEqual(images[0]["tags"], [{"name": "rows"}])
+        self.assertEqual(missing, [9])
+        images, missing = await get_image_rows_by_ids(
+            [3, 1], self.user, self.db, ["url"]
+        )
+        self.assertEqual(images, [{"url": "url"}, {"url": "url"}])
+        self.assertEqual(missing, [])
+
+    async def test_image_rows_by_ids_skip_other_users(self):
+        other = User(email="other@example.com", password="secret", username="other")
+        self.db.add(other)
+        self.db.commit()
+        image = await add_image("url", "public_id", "other", other, self.db)
+        images, missing = await get_image_rows_by_ids(
+            [1, image.id], self.user, self.db, ["id"]
+        )
+        self.assertEqual(images, [{"id": 1}])
+        self.assertEqual(missing, [image.id])
+
+    async def test_claim_upload_once(self):
+        self.assertTrue(await claim_upload("direct", self.user, self.db))
+        self.db.commit()
+        self.assertFalse(await claim_upload("direct", self.user, self.db))
+        self.assertTrue(await claim_upload("other", self.user, self.db))
+
+    async def test_failed_claim_keeps_pending_changes(self):
+        await claim_upload("direct", self.user, self.db)
+        self.db.commit()
+        self.user.username = "renamed"
+        self.db.flush()
+        self.assertFalse(await claim_upload("direct", self.user, self.db))
+        self.db.commit()
+        self.db.expire_all()
+        self.assertEqual(self.user.username, "renamed")
+
+
+class TestImageTagEdits(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.user = User(email="test@example.com", password="secret", username="test")
+        self.db.add(self.user)
+        self.db.commit()
+        self.image = await add_image("url", "id", "#a #b #c", self.user, self.db)
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self.record_statement)
+
+    def record_statement(self, conn, cursor, statement, parameters, context, many):
+        if "image_m2m_tag" in statement and not statement.startswith("SELECT"):
+            self.statements.append(statement.split()[0])
+
+    def tearDown(self):
+        self.db.close()
+
+    async def test_edit_only_touches_changed_links(self):
+        image = await edit_description(self.image.id, "#a #c #d", self.user, self.db)
+        self.assertEqual(sorted(tag.name for tag in image.tags), ["a", "c", "d"])
+        self.assertEqual(self.statements, ["DELETE", "INSERT"])
+
+    async def test_edit_with_same_tags_skips_links(self):
+        image = await edit_description(self.image.id, "#c #a text #b", self.user, self.db)
+        self.assertEqual(image.description, "#c #a text #b")
+        self.assertEqual(self.statements, [])
+
+    async def test_edit_caps_tags(self):
+        image = await edit_description(
+            self.image.id, "#a #b #c #d #e #f #g", self.user, self.db
+        )
+        self.assertEqual(len(image.tags), 5)
+
+
 if __name__ == "__main__":
     unittest.main()
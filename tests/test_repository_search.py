@@ -0,0 +1,78 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.repository.images import add_image, delete_image, edit_description
+from src.repository.search import (
+    _search_postgres,
+    search_images_by_text,
+    to_fts5_query,
+)
+from src.database.models import Base, User
+
+
+class TestSearch(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.user = User(email="test@example.com", password="secret", username="test")
+        self.db.add(self.user)
+        self.db.commit()
+        for description in [
+            "sunset over the sea #sea",
+            "sunny day in the park",
+            "sea sea sea view",
+            "mountain hike",
+        ]:
+            await add_image("url", "public_id", description, self.user, self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_to_fts5_query(self):
+        self.assertEqual(to_fts5_query('sea "view" OR'), '"sea" "view" "OR"')
+        self.assertEqual(to_fts5_query("!!"), "")
+
+    async def test_search_ranks_and_paginates(self):
+        images, cursor = await search_images_by_text("sea", self.db, limit=1)
+        self.assertEqual([image.id for image in images], [3])
+        self.assertIsNotNone(cursor)
+        images, cursor = await search_images_by_text(
+            "sea", self.db, cursor=cursor, limit=1
+        )
+        self.assertEqual([image.id for image in images], [1])
+        images, cursor = await search_images_by_text(
+            "sea", self.db, cursor=cursor, limit=1
+        )
+        self.assertEqual(images, [])
+        self.assertIsNone(cursor)
+
+    async def test_index_follows_edits_and_deletes(self):
+        await edit_description(2, "by the sea", self.user, self.db)
+        await delete_image(3, self.user, self.db)
+        images, _ = await search_images_by_text("sea", self.db)
+        self.assertEqual(sorted(image.id for image in images), [1, 2])
+
+    def test_postgres_cursor_compares_ranks_as_real(self):
+        db = MagicMock(spec=Session)
+        _search_postgres("cat", (0.0607927, 5), 10, db)
+        condition = db.query.return_value.filter.return_value.filter.call_args[0][0]
+        sql = str(condition.compile(dialect=postgresql.dialect()))
+        self.assertEqual(sql.count("AS REAL)"), 2)
+
+    async def test_search_without_words(self):
+        self.assertEqual(await search_images_by_text("?!", self.db), ([], None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,28 +9,20 @@ from unittest.mock import MagicMock
 
 from sqlalchemy.orm import Session
 
-from src.repository.tags import get_or_create_tag
+from src.repository.tags import get_or_create_tags
 from src.database.models import Tag
 
 
 class TestTags(IsolatedAsyncioTestCase):
-    async def test_get_or_create_tag_existing(self):
-        tag_name = "existing_tag"
-        tag = Tag(name=tag_name)
+    async def test_get_or_create_tags(self):
+        existing = Tag(name="existing_tag")
         db = MagicMock(spec=Session)
-        db.query.return_value.filter.return_value.first.return_value = tag
-        result = await get_or_create_tag(db, tag_name)
-        self.assertEqual(result, tag)
-        db.query.return_value.filter.return_value.first.assert_called_once()
-
-    async def test_get_or_create_tag_non_existing(self):
-        tag_name = "non_existing_tag"
-        db = MagicMock(spec=Session)
-        db.query.return_value.filter.return_value.first.return_value = None
-        result = await get_or_create_tag(db, tag_name)
-        self.assertIsInstance(result, Tag)
-        self.assertEqual(result.name, tag_name)
-        db.query.return_value.filter.return_value.first.assert_called_once()
+        db.query.return_value.filter.return_value = [existing]
+        result = await get_or_create_tags(db, ["new_tag", "existing_tag"])
+        self.assertEqual([tag.name for tag in result], ["new_tag", "existing_tag"])
+        self.assertIs(result[1], existing)
+        db.add_all.assert_called_once()
+        db.flush.assert_called_once()
 
 
 if __name__ == "__main__":
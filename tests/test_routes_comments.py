@@ -0,0 +1,70 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from src.database.db import get_db
+from src.database.models import Comment, User
+from src.limiter import limiter
+from src.routes import comments
+from src.services.auth import auth_service
+
+
+class TestLatestComments(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.state.limiter = limiter
+        app.include_router(comments.router, prefix="/api")
+        app.dependency_overrides[get_db] = lambda: MagicMock(spec=Session)
+        app.dependency_overrides[auth_service.get_current_user] = lambda: User(id=1)
+        self.client = TestClient(app)
+
+    def test_missing_image_ids(self):
+        response = self.client.get("/api/comments/")
+        self.assertEqual(response.status_code, 400)
+
+    def test_too_many_image_ids(self):
+        query = "&".join(f"image_ids={i}" for i in range(comments.MAX_BULK_IMAGES + 1))
+        response = self.client.get(f"/api/comments/?{query}")
+        self.assertEqual(response.status_code, 400)
+
+    @patch("src.routes.comments.comments_repository.get_latest_comments_by_image_ids")
+    def test_requested_order(self, get_latest):
+        get_latest.return_value = {1: [], 2: []}
+        response = self.client.get("/api/comments/?image_ids=2&image_ids=1&image_ids=2")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["image_id"] for item in response.json()], [2, 1])
+
+    @patch("src.routes.comments.publish_comment_stats")
+    @patch("src.routes.comments.comment_events")
+    @patch("src.routes.comments.comments_repository.add_comment")
+    def test_add_comment_publishes_event(
+        self, add_comment, comment_events, publish_comment_stats
+    ):
+        add_comment.return_value = Comment(
+            id=1,
+            text="hi",
+            user_id=1,
+            image_id=2,
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+        )
+        response = self.client.post("/api/comments/?text=hi&image_id=2")
+        self.assertEqual(response.status_code, 200)
+        comment_events.publish.assert_called_once_with(
+            "created", add_comment.return_value
+        )
+        publish_comment_stats.assert_awaited_once()
+        self.assertEqual(publish_comment_stats.call_args.args[0], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.database.db import get_db
+from src.database.models import Base, User
+from src.limiter import limiter
+from src.repository import comments as comments_repository
+from src.repository import images as images_repository
+from src.routes import images
+from src.services.auth import auth_service
+
+
+class TestImageRoutes(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.state.limiter = limiter
+        app.include_router(images.router, prefix="/api")
+        app.dependency_overrides[get_db] = lambda: MagicMock(spec=Session)
+        app.dependency_overrides[auth_service.get_current_user] = lambda: User(
+            id=1, email="test@example.com"
+        )
+        self.client = TestClient(app)
+
+    @patch("src.routes.images.images_repository.get_image_row")
+    @patch("src.routes.images.images_repository.get_image_version")
+    def test_unknown_field(self, get_image_version, get_image_row):
+        response = self.client.get("/api/images/1?fields=id,bogus")
+        self.assertEqual(response.status_code, 400)
+        get_image_version.assert_not_called()
+        get_image_row.assert_not_called()
+
+    @patch("src.routes.images.images_repository.get_image_row")
+    @patch("src.routes.images.images_repository.get_image_version")
+    def test_requested_fields(self, get_image_version, get_image_row):
+        get_image_version.return_value = (datetime(2024, 1, 1), 0, None)
+        get_image_row.return_value = {"id": 1, "url": "url"}
+        response = self.client.get("/api/images/1?fields=id,url")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"id": 1, "url": "url"})
+        self.assertEqual(get_image_row.call_args.kwargs["fields"], ["id", "url"])
+
+
+    @patch("src.routes.images.images_repository.get_image_rows_by_ids")
+    def test_batch_order_and_missing(self, get_image_rows_by_ids):
+        get_image_rows_by_ids.return_value = ([{"id": 4}, {"id": 2}], [9])
+        response = self.client.get("/api/images/batch?ids=4,9,2,4&fields=id")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(), {"items": [{"id": 4}, {"id": 2}], "missing": [9]}
+        )
+        args, kwargs = get_image_rows_by_ids.call_args
+        self.assertEqual(args[0], [4, 9, 2])
+        self.assertEqual(args[1].id, 1)
+        self.assertEqual(kwargs["fields"], ["id"])
+
+    def test_batch_rejects_bad_ids(self):
+        response = self.client.get("/api/images/batch?ids=4,x")
+        self.assertEqual(response.status_code, 400)
+        query = ",".join(str(i) for i in range(images.MAX_BATCH_IDS + 1))
+        response = self.client.get(f"/api/images/batch?ids={query}")
+        self.assertEqual(response.status_code, 400)
+
+    @patch("src.routes.images.images_repository.add_image")
+    @patch("src.routes.images.images_repository.claim_upload")
+    @patch("src.routes.images.image_service.verify_direct_upload")
+    @patch("src.routes.images.images_repository.count_asset_references")
+    @patch("src.routes.images.auth_service.decode_upload_token")
+    def test_complete_upload_twice(
+        self,
+        decode_upload_token,
+        count_asset_references,
+        verify_direct_upload,
+        claim_upload,
+        add_image,
+    ):
+        decode_upload_token.return_value = {
+            "sub": "test@example.com",
+            "public_id": "direct",
+        }
+        count_asset_references.return_value = 0
+        verify_direct_upload.return_value = {"url": "url", "variants": {}}
+        claim_upload.return_value = False
+        response = self.client.post(
+            "/api/images/complete_upload?upload_token=t&version=1&signature=s"
+        )
+        self.assertEqual(response.status_code, 409)
+        add_image.assert_not_called()
+
+
+class TestCollectionRevalidation(unittest.IsolatedAsyncioTestCase):
+    since = "Fri, 01 Jan 2100 00:00:00 GMT"
+
+    async def asyncSetUp(self):
+        engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.user = User(email="test@example.com", password="secret", username="test")
+        self.db.add(self.user)
+        self.db.commit()
+        for i in range(2):
+            await images_repository.add_image(
+                "url", f"public_id{i}", f"image {i}", self.user, self.db
+            )
+        app = FastAPI()
+        app.state.limiter = limiter
+        app.include_router(images.router, prefix="/api")
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[auth_service.get_current_user] = lambda: self.user
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.db.close()
+
+    async def test_image_list_after_delete(self):
+        response = self.client.get("/api/images/")
+        self.assertNotIn("last-modified", response.headers)
+        await images_repository.delete_image(1, self.user, self.db)
+        response = self.client.get(
+            "/api/images/", headers={"If-Modified-Since": self.since}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([image["id"] for image in response.json()], [2])
+
+    async def test_comment_list_after_delete(self):
+        comment = await comments_repository.add_comment("hi", 1, self.user, self.db)
+        await comments_repository.add_comment("hello", 1, self.user, self.db)
+        response = self.client.get("/api/images/1/comments")
+        self.assertNotIn("last-modified", response.headers)
+        await comments_repository.delete_comment(comment.id, self.user, self.db)
+        response = self.client.get(
+            "/api/images/1/comments", headers={"If-Modified-Since": self.since}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["text"] for item in response.json()], ["hello"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from src.conf.config import settings
+from src.database.db import get_db
+from src.database.models import UploadSession, User
+from src.limiter import limiter
+from src.routes import uploads
+from src.services.auth import auth_service
+
+
+class TestUploadRoutes(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.state.limiter = limiter
+        app.include_router(uploads.router, prefix="/api")
+        app.dependency_overrides[get_db] = lambda: MagicMock(spec=Session)
+        app.dependency_overrides[auth_service.get_current_user] = lambda: User(id=1)
+        self.client = TestClient(app)
+
+    @patch("src.routes.uploads.uploads_repository.create_upload_session")
+    def test_create_larger_than_image_limit(self, create_upload_session):
+        response = self.client.post(
+            f"/api/uploads/?total_size={settings.image_max_bytes + 1}"
+        )
+        self.assertEqual(response.status_code, 422)
+        create_upload_session.assert_not_called()
+
+    @patch("src.routes.uploads.image_service.upload_image")
+    @patch("src.routes.uploads.uploads_repository.claim_session")
+    @patch("src.routes.uploads.uploads_repository.get_upload_session")
+    def test_finalize_claimed_session(
+        self, get_upload_session, claim_session, upload_image
+    ):
+        get_upload_session.return_value = UploadSession(
+            id="abc", total_size=10, received=10
+        )
+        claim_session.return_value = False
+        response = self.client.post("/api/uploads/abc/finalize")
+        self.assertEqual(response.status_code, 409)
+        upload_image.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, patch
+
+from src.database.models import User
+from src.services.auth import auth_service
+
+
+class TestCurrentUserWithoutSession(IsolatedAsyncioTestCase):
+    @patch("src.services.auth.SessionLocal")
+    async def test_session_is_closed_before_returning(self, session_local):
+        user = User(id=1, email="test@example.com")
+        db = session_local.return_value
+        with patch.object(
+            auth_service, "get_current_user", AsyncMock(return_value=user)
+        ) as get_current_user:
+            result = await auth_service.get_current_user_without_session("token")
+        self.assertIs(result, user)
+        get_current_user.assert_awaited_once_with("token", db)
+        db.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
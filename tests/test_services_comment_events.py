@@ -0,0 +1,66 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, patch
+
+from src.services.comment_events import CommentEvents, event_id_key, format_event
+
+
+def event(event_id, name="created", image_id=1):
+    return {"image_id": image_id, "id": event_id, "event": name, "data": "{}"}
+
+
+class TestCommentEvents(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.events = CommentEvents(heartbeat=0.01)
+
+    def test_event_id_key_orders_numerically(self):
+        self.assertLess(event_id_key("99-1"), event_id_key("100-0"))
+
+    def test_format_event(self):
+        self.assertEqual(
+            format_event(event("1-0")), "id: 1-0\nevent: created\ndata: {}\n\n"
+        )
+
+    async def test_dispatch_drops_slow_subscriber(self):
+        self.events.queue_size = 1
+        queue = self.events.subscribe(1)
+        self.events.dispatch(event("1-0"))
+        self.events.dispatch(event("2-0"))
+        self.events.dispatch(event("3-0", image_id=2))
+        self.assertEqual(queue.qsize(), 1)
+        self.assertNotIn(1, self.events._subscribers)
+
+    async def test_replay_reports_lost_position(self):
+        entries = [(b"5-0", {b"event": b"updated", b"data": b"{}"})]
+        with patch("src.services.comment_events.async_redis_client") as client:
+            client.xrange = AsyncMock(return_value=entries)
+            replayed = await self.events.replay(1, "2-0")
+        self.assertEqual([e["event"] for e in replayed], ["reset", "updated"])
+
+    async def test_stream_resumes_and_skips_duplicates(self):
+        entries = [
+            (b"2-0", {b"event": b"created", b"data": b"{}"}),
+            (b"3-0", {b"event": b"deleted", b"data": b"{}"}),
+        ]
+        disconnected = AsyncMock(side_effect=[False, False, True])
+        with patch("src.services.comment_events.async_redis_client") as client:
+            client.xrange = AsyncMock(return_value=entries)
+            stream = self.events.stream(1, "2-0", disconnected)
+            frames = [await anext(stream), await anext(stream)]
+            self.events.dispatch(event("3-0", "deleted"))
+            self.events.dispatch(event("4-0", "updated"))
+            frames += [frame async for frame in stream]
+        self.assertTrue(frames[0].startswith("retry:"))
+        self.assertEqual(
+            [frame.split("\n")[0] for frame in frames[1:]], ["id: 3-0", "id: 4-0"]
+        )
+        self.assertNotIn(1, self.events._subscribers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import unittest
+from datetime import datetime
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, User
+from src.repository.images import add_image, get_feed_images
+from src.services.feed import FeedCache
+
+
+class TestFeed(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.user = User(email="test@example.com", password="secret", username="test")
+        self.db.add(self.user)
+        self.db.commit()
+        for i in range(5):
+            await add_image("url", "public_id", f"image {i} #feed", self.user, self.db)
+        self.cache = FeedCache(size=3)
+
+    def tearDown(self):
+        self.db.close()
+
+    async def test_get_feed_images_paginates(self):
+        images = await get_feed_images(self.db, limit=2)
+        self.assertEqual([image.id for image in images], [5, 4])
+        images = await get_feed_images(self.db, before_id=4, limit=10)
+        self.assertEqual([image.id for image in images], [3, 2, 1])
+
+    async def test_page_body(self):
+        images = await get_feed_images(self.db, limit=3)
+        items = [self.cache.serialize(image) for image in images]
+        page = json.loads(self.cache.page_body(items, 2))
+        self.assertEqual([item["id"] for item in page["items"]], [5, 4])
+        self.assertEqual(page["items"][0]["tags"], [{"name": "feed"}])
+        self.assertEqual(page["next_cursor"], 4)
+        page = json.loads(self.cache.page_body(items, 3))
+        self.assertIsNone(page["next_cursor"])
+
+    async def test_get_head_miss(self):
+        with patch("src.services.feed.redis_client") as client:
+            client.lrange.return_value = []
+            self.assertIsNone(self.cache.get_head(2))
+        client.lrange.assert_called_once_with("feed:head", 0, 2)
+
+    async def test_prepend_only_updates_loaded_head(self):
+        image = (await get_feed_images(self.db, limit=1))[0]
+        with patch("src.services.feed.redis_client") as client:
+            self.cache.prepend(image)
+        pipe = client.pipeline.return_value
+        pipe.incr.assert_called_once_with("feed:head:version")
+        pipe.lpushx.assert_called_once_with("feed:head", self.cache.serialize(image))
+        pipe.ltrim.assert_called_once_with("feed:head", 0, 3)
+
+    async def test_invalidate_bumps_generation(self):
+        with patch("src.services.feed.redis_client") as client:
+            self.cache.invalidate()
+        pipe = client.pipeline.return_value
+        pipe.delete.assert_called_once_with("feed:head")
+        pipe.incr.assert_any_call("feed:head:version")
+        pipe.incr.assert_any_call("feed:generation")
+
+    async def test_set_head_skips_changed_head(self):
+        images = await get_feed_images(self.db, limit=2)
+        with patch("src.services.feed.redis_client") as client:
+            pipe = client.pipeline.return_value.__enter__.return_value
+            pipe.get.return_value = b"4"
+            self.cache.set_head(images, 3)
+            pipe.rpush.assert_not_called()
+            self.cache.set_head(images, 4)
+            pipe.rpush.assert_called_once()
+            pipe.execute.assert_called_once()
+
+    async def test_set_page_caches_ids_and_entries(self):
+        images = await get_feed_images(self.db, before_id=5, limit=3)
+        items = [self.cache.serialize(image) for image in images]
+        with patch("src.services.feed.redis_client") as client:
+            client.get.return_value = None
+            self.cache.set_page(5, 2, [image.id for image in images], items)
+        pipe = client.pipeline.return_value
+        pipe.set.assert_any_call("feed:page:0:5:2", b"[4,3,2]", ex=300)
+        pipe.set.assert_any_call("feed:image:4", items[0], ex=300)
+        self.assertEqual(pipe.set.call_count, 4)
+
+    async def test_get_page_from_entries(self):
+        images = await get_feed_images(self.db, before_id=5, limit=3)
+        items = [self.cache.serialize(image).encode() for image in images]
+        with patch("src.services.feed.redis_client") as client:
+            client.get.side_effect = [b"1", b"[4,3,2]"]
+            client.mget.return_value = items
+            page = json.loads(self.cache.get_page(5, 2))
+            client.mget.assert_called_once_with(
+                ["feed:image:4", "feed:image:3", "feed:image:2"]
+            )
+            self.assertEqual([item["id"] for item in page["items"]], [4, 3])
+            self.assertEqual(page["next_cursor"], 3)
+            client.get.side_effect = [b"1", b"[4,3,2]"]
+            client.mget.return_value = [items[0], None, items[2]]
+            self.assertIsNone(self.cache.get_page(5, 2))
+
+    async def test_update_comment_stats(self):
+        images = await get_feed_images(self.db, limit=3)
+        items = [self.cache.serialize(image).encode() for image in images]
+        commented_at = datetime(2024, 1, 2, 3, 4, 5)
+        with patch("src.services.feed.redis_client") as client:
+            pipe = client.pipeline.return_value.__enter__.return_value
+            pipe.lrange.return_value = items
+            pipe.get.return_value = items[1]
+            self.cache.update_comment_stats(4, 7, commented_at)
+        client.incr.assert_called_once_with("feed:head:version")
+        index, item = pipe.lset.call_args.args[1:]
+        self.assertEqual(index, 1)
+        updated = json.loads(item)
+        self.assertEqual(updated["id"], 4)
+        self.assertEqual(updated["comment_count"], 7)
+        self.assertEqual(updated["last_commented_at"], "2024-01-02T03:04:05")
+        pipe.set.assert_called_once_with("feed:image:4", item, keepttl=True)
+        pipe.execute.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from datetime import datetime
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.orm import Session
+
+from src.database.models import Image, Tag
+from src.services.image_updates import (
+    publish_comment_stats,
+    publish_new_image,
+    record_tag_usage,
+)
+
+
+class TestImageUpdates(IsolatedAsyncioTestCase):
+    @patch("src.services.image_updates.trending_tags")
+    @patch("src.services.image_updates.tag_index")
+    def test_record_tag_usage(self, tag_index, trending_tags):
+        record_tag_usage(["a", "b"], ["b", "c"])
+        tag_index.record.assert_called_once_with({"a": -1, "c": 1})
+        trending_tags.record.assert_called_once_with(["c"])
+
+    @patch("src.services.image_updates.timeline_service.fan_out")
+    @patch("src.services.image_updates.feed_cache")
+    @patch("src.services.image_updates.record_tag_usage")
+    async def test_publish_new_image(self, record_tag_usage, feed_cache, fan_out):
+        image = Image(id=1, tags=[Tag(name="a")])
+        db = MagicMock(spec=Session)
+        await publish_new_image(image, db)
+        record_tag_usage.assert_called_once_with([], ["a"])
+        feed_cache.prepend.assert_called_once_with(image)
+        fan_out.assert_awaited_once_with(image, db)
+
+    @patch("src.services.image_updates.feed_cache")
+    @patch("src.services.image_updates.images_repository.get_comment_stats")
+    async def test_publish_comment_stats(self, get_comment_stats, feed_cache):
+        commented_at = datetime(2024, 1, 1)
+        get_comment_stats.return_value = (3, commented_at)
+        db = MagicMock(spec=Session)
+        await publish_comment_stats(2, db)
+        feed_cache.update_comment_stats.assert_called_once_with(2, 3, commented_at)
+        feed_cache.invalidate.assert_not_called()
+
+    @patch("src.services.image_updates.feed_cache")
+    @patch("src.services.image_updates.images_repository.get_comment_stats")
+    async def test_publish_comment_stats_missing_image(
+        self, get_comment_stats, feed_cache
+    ):
+        get_comment_stats.return_value = None
+        await publish_comment_stats(2, MagicMock(spec=Session))
+        feed_cache.update_comment_stats.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
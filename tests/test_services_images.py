@@ -0,0 +1,204 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from hashlib import sha256
+from io import BytesIO
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+
+from fastapi import HTTPException
+
+from src.database.models import Image, User
+from src.services.auth import auth_service
+from src.services.images import ImageService, render_qr_code
+from src.utils.images import PILImage, recompress_image, strip_metadata
+
+
+class TestQRCode(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.service = ImageService()
+        self.service.qr_cache.clear()
+
+    def test_render_png(self):
+        result = render_qr_code("https://example.com/a.jpg", 10, 4, "L", "png")
+        self.assertTrue(result.startswith(b"\x89PNG"))
+
+    def test_render_svg(self):
+        result = render_qr_code("https://example.com/a.jpg", 10, 4, "M", "svg")
+        self.assertIn(b"<svg", result)
+
+    def test_etag_depends_on_parameters(self):
+        url = "https://example.com/a.jpg"
+        self.assertEqual(
+            self.service.qr_code_etag(url), self.service.qr_code_etag(url)
+        )
+        self.assertNotEqual(
+            self.service.qr_code_etag(url),
+            self.service.qr_code_etag(url, fmt="svg"),
+        )
+        self.assertNotEqual(
+            self.service.qr_code_etag(url),
+            self.service.qr_code_etag(url, box_size=5),
+        )
+
+    async def test_generate_qr_code_is_cached(self):
+        with patch(
+            "src.services.images.run_cpu_bound",
+            new=AsyncMock(return_value=b"qr"),
+        ) as run:
+            first = await self.service.generate_qr_code("https://example.com/a.jpg")
+            second = await self.service.generate_qr_code("https://example.com/a.jpg")
+        self.assertEqual(first, b"qr")
+        self.assertEqual(second, b"qr")
+        run.assert_awaited_once()
+
+
+class TestUpload(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.service = ImageService()
+        self.content = render_qr_code("https://example.com/a.jpg", 10, 4, "L", "png")
+        self.file = UploadFile(file=BytesIO(self.content), filename="a.jpg")
+
+    async def test_hash_file_rewinds(self):
+        result = await self.service.hash_file(self.file)
+        self.assertEqual(result, sha256(self.content).hexdigest())
+        self.assertEqual(await self.file.read(), self.content)
+
+    async def test_upload_duplicate_reuses_asset(self):
+        existing = Image(id=1, public_id="KillerInstagram/x", url="https://x")
+        db = MagicMock(spec=Session)
+        with patch(
+            "src.services.images.get_image_by_content_hash",
+            new=AsyncMock(return_value=existing),
+        ), patch("cloudinary.uploader.upload") as upload:
+            result = await self.service.upload_image(self.file, db)
+        upload.assert_not_called()
+        self.assertEqual(result["public_id"], existing.public_id)
+        self.assertEqual(result["url"], existing.url)
+        self.assertEqual(result["content_hash"], sha256(self.content).hexdigest())
+
+    async def test_validate_image(self):
+        self.assertEqual(await self.service.validate_image(self.file), "png")
+        self.assertEqual(await self.file.read(), self.content)
+
+    async def test_validate_image_rejects_non_image(self):
+        file = UploadFile(file=BytesIO(b"%PDF-1.4 not an image"), filename="a.jpg")
+        with self.assertRaises(HTTPException) as cm:
+            await self.service.validate_image(file)
+        self.assertEqual(cm.exception.status_code, 415)
+
+    async def test_validate_image_rejects_too_large(self):
+        with patch("src.services.images.settings.image_max_bytes", 10):
+            with self.assertRaises(HTTPException) as cm:
+                await self.service.validate_image(self.file)
+        self.assertEqual(cm.exception.status_code, 413)
+
+    async def test_upload_avatar(self):
+        user = User(id=1, username="test_user")
+        with patch("cloudinary.uploader.upload", return_value={"version": 7}) as upload:
+            result = await self.service.upload_avatar(self.file, user)
+        self.assertEqual(upload.call_args.kwargs["public_id"], "NotesApp/test_user")
+        self.assertEqual(len(upload.call_args.kwargs["eager"]), 1)
+        self.assertIn("c_fill,h_250,w_250/v7/NotesApp/test_user", result)
+
+    def test_build_variant_urls(self):
+        result = self.service.build_variant_urls("KillerInstagram/x", 3)
+        self.assertEqual(set(result), {"thumb", "feed", "full"})
+        self.assertIn("c_fill", result["thumb"])
+        self.assertIn("/v3/KillerInstagram/x", result["feed"])
+
+    async def test_upload_new_content(self):
+        db = MagicMock(spec=Session)
+        with patch(
+            "src.services.images.get_image_by_content_hash",
+            new=AsyncMock(return_value=None),
+        ), patch(
+            "cloudinary.uploader.upload", return_value={"version": 1}
+        ) as upload:
+            result = await self.service.upload_image(self.file, db)
+        upload.assert_called_once()
+        self.assertTrue(upload.call_args.kwargs["eager_async"])
+        self.assertEqual(len(upload.call_args.kwargs["eager"]), 3)
+        self.assertTrue(result["public_id"].startswith("KillerInstagram/"))
+        self.assertEqual(set(result["variants"]), {"thumb", "feed", "full"})
+
+
+class TestDirectUpload(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.service = ImageService()
+
+    async def test_create_upload_signature(self):
+        user = User(id=1, email="test@example.com")
+        result = self.service.create_upload_signature(user)
+        self.assertTrue(result["public_id"].startswith("KillerInstagram/"))
+        self.assertTrue(result["signature"])
+        payload = await auth_service.decode_upload_token(result["upload_token"])
+        self.assertEqual(payload["sub"], user.email)
+        self.assertEqual(payload["public_id"], result["public_id"])
+
+    async def test_verify_direct_upload_invalid_signature(self):
+        db = MagicMock(spec=Session)
+        with self.assertRaises(HTTPException) as cm:
+            await self.service.verify_direct_upload("KillerInstagram/x", 1, "bad", db)
+        self.assertEqual(cm.exception.status_code, 400)
+
+    async def test_verify_direct_upload_too_large(self):
+        db = MagicMock(spec=Session)
+        with patch(
+            "cloudinary.utils.verify_api_response_signature", return_value=True
+        ), patch(
+            "cloudinary.api.resource",
+            return_value={"bytes": 10**10, "format": "jpg"},
+        ):
+            with self.assertRaises(HTTPException) as cm:
+                await self.service.verify_direct_upload(
+                    "KillerInstagram/x", 1, "sig", db
+                )
+        self.assertEqual(cm.exception.status_code, 400)
+        db.add.assert_called_once()
+        db.commit.assert_called_once()
+
+
+def jpeg_with_exif() -> bytes:
+    exif = PILImage.Exif()
+    exif[0x010F] = "Camera"
+    buffered = BytesIO()
+    PILImage.new("RGB", (20, 10), "red").save(buffered, "JPEG", exif=exif)
+    return buffered.getvalue()
+
+
+class TestRecompress(IsolatedAsyncioTestCase):
+    def test_recompress_image_limits_dimensions(self):
+        content = render_qr_code("https://example.com/a.jpg", 40, 4, "H", "png")
+        result = recompress_image(content, 100, 80, "webp")
+        with PILImage.open(BytesIO(result)) as image:
+            self.assertEqual(image.format, "WEBP")
+            self.assertLessEqual(max(image.size), 100)
+
+    def test_strip_metadata_keeps_format_and_size(self):
+        result = strip_metadata(jpeg_with_exif(), 85)
+        with PILImage.open(BytesIO(result)) as image:
+            self.assertEqual(image.format, "JPEG")
+            self.assertEqual(image.size, (20, 10))
+            self.assertEqual(dict(image.getexif()), {})
+
+    async def test_prepare_for_storage_strips_when_not_smaller(self):
+        content = jpeg_with_exif()
+        file = UploadFile(file=BytesIO(content), filename="a.jpg")
+        run_cpu_bound = AsyncMock(side_effect=[content + b"larger", b"stripped"])
+        with patch("src.services.images.settings.image_recompress", True), patch(
+            "src.services.images.run_cpu_bound", run_cpu_bound
+        ):
+            result = await ImageService().prepare_for_storage(file)
+        self.assertEqual(result.read(), b"stripped")
+        self.assertIs(run_cpu_bound.call_args.args[0], strip_metadata)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+
+import cloudinary.api_client.call_api
+import cloudinary.uploader
+
+from src.services.storage import (
+    InstrumentedPoolManager,
+    StorageMetrics,
+    configure_storage,
+)
+
+
+class TestStorage(unittest.TestCase):
+    def test_configure_storage_shares_pool(self):
+        configure_storage()
+        self.assertIsInstance(cloudinary.uploader._http, InstrumentedPoolManager)
+        self.assertIs(cloudinary.uploader._http, cloudinary.api_client.call_api._http)
+
+    def test_metrics(self):
+        metrics = StorageMetrics()
+        metrics.observe("upload", 0.2)
+        metrics.observe("upload", 0.4, failed=True)
+        metrics.observe("explicit", 0.1)
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["upload"]["count"], 2)
+        self.assertEqual(snapshot["upload"]["errors"], 1)
+        self.assertAlmostEqual(snapshot["upload"]["avg"], 0.3)
+        self.assertAlmostEqual(snapshot["upload"]["max"], 0.4)
+        self.assertEqual(snapshot["explicit"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from datetime import datetime, timedelta
+from unittest import IsolatedAsyncioTestCase
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, User
+from src.repository.comments import add_comment, delete_comment
+from src.repository.images import add_image, delete_image, edit_description
+from src.schemas import SyncImage
+from src.services.sync import SyncService
+
+
+class TestSync(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.user = User(email="test@example.com", password="secret", username="test")
+        self.other = User(email="other@example.com", password="secret", username="o")
+        self.db.add_all([self.user, self.other])
+        self.db.commit()
+        self.images = [
+            await add_image("url", "public_id", f"image {i} #sync", self.user, self.db)
+            for i in range(3)
+        ]
+        await add_image("url", "public_id", "not mine", self.other, self.db)
+        self.service = SyncService(settle_seconds=0)
+
+    def tearDown(self):
+        self.db.close()
+
+    async def sync_all(self, token, limit=100):
+        pages = []
+        while True:
+            page = await self.service.changes(self.user, token, limit, self.db)
+            pages.append(page)
+            token = page["sync_token"]
+            if not page["has_more"]:
+                return pages, token
+
+    async def test_full_sync_is_paginated(self):
+        pages, _ = await self.sync_all(None, limit=2)
+        self.assertEqual(len(pages), 2)
+        ids = [image["id"] for page in pages for image in page["images"]]
+        self.assertEqual(ids, [image.id for image in self.images])
+        self.assertEqual(pages[0]["images"][0]["tags"], [{"name": "sync"}])
+        self.assertEqual(
+            sorted(pages[0]["images"][0]), sorted(SyncImage.model_fields)
+        )
+        self.assertEqual(pages[0]["deleted"], [])
+
+    async def test_delta_after_token(self):
+        _, token = await self.sync_all(None)
+        comment = await add_comment("hello", self.images[0].id, self.other, self.db)
+        doomed = await add_comment("bye", self.images[0].id, self.other, self.db)
+        await delete_comment(doomed.id, self.other, self.db)
+        await edit_description(self.images[1].id, "edited", self.user, self.db)
+        await delete_image(self.images[2].id, self.user, self.db)
+
+        pages, token = await self.sync_all(token, limit=1)
+        self.assertEqual(
+            [image["id"] for page in pages for image in page["images"]],
+            [self.images[1].id],
+        )
+        self.assertEqual(
+            [c["id"] for page in pages for c in page["comments"]], [comment.id]
+        )
+        self.assertEqual(
+            [(d["type"], d["id"]) for page in pages for d in page["deleted"]],
+            [("comment", doomed.id), ("image", self.images[2].id)],
+        )
+
+        page = await self.service.changes(self.user, token, 100, self.db)
+        self.assertEqual((page["images"], page["comments"], page["deleted"]), ([], [], []))
+
+    async def test_expired_token(self):
+        token = self.service.encode_token(
+            {"since": (datetime.now() - timedelta(days=365)).isoformat()}
+        )
+        with self.assertRaises(HTTPException) as context:
+            await self.service.changes(self.user, token, 100, self.db)
+        self.assertEqual(context.exception.status_code, 410)
+
+    async def test_invalid_token(self):
+        with self.assertRaises(HTTPException) as context:
+            await self.service.changes(self.user, "not-a-token", 100, self.db)
+        self.assertEqual(context.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, Image, Tag, image_m2m_tag
+from src.services.tag_index import TagIndex
+
+
+class TestTagIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = TagIndex()
+        self.index.apply({"sunset": 5, "sun": 9, "Summer": 2, "sea": 7, "snow": 1})
+
+    def test_suggest_orders_by_usage(self):
+        self.assertEqual(
+            self.index.suggest("su"), [("sun", 9), ("sunset", 5), ("Summer", 2)]
+        )
+
+    def test_suggest_is_case_insensitive_and_limited(self):
+        self.assertEqual(self.index.suggest("SU", limit=1), [("sun", 9)])
+
+    def test_suggest_no_match(self):
+        self.assertEqual(self.index.suggest("x"), [])
+
+    def test_apply_adds_and_decrements(self):
+        self.index.apply({"surf": 1, "sun": -9})
+        self.assertEqual(
+            self.index.suggest("su"),
+            [("sunset", 5), ("Summer", 2), ("surf", 1), ("sun", 0)],
+        )
+
+    def test_record_publishes(self):
+        with patch("src.services.tag_index.redis_client") as client:
+            self.index.record({"surf": 1})
+        client.publish.assert_called_once()
+        self.assertEqual(self.index.suggest("surf"), [("surf", 1)])
+
+    def test_load(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        db.add_all([Tag(id=1, name="cat"), Tag(id=2, name="car"), Image(id=1)])
+        db.flush()
+        db.execute(insert(image_m2m_tag), [{"image": 1, "tag": 2}])
+        db.commit()
+        index = TagIndex()
+        index.load(db)
+        self.assertEqual(index.suggest("ca"), [("car", 1), ("cat", 0)])
+
+    def test_load_sums_case_variants(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        db.add_all([Tag(id=1, name="Cat"), Tag(id=2, name="cat"), Tag(id=3, name="car")])
+        db.add_all([Image(id=i) for i in range(1, 5)])
+        db.flush()
+        links = [{"image": 1, "tag": 1}, {"image": 2, "tag": 2}]
+        links += [{"image": 3, "tag": 3}, {"image": 4, "tag": 2}]
+        db.execute(insert(image_m2m_tag), links)
+        db.commit()
+        index = TagIndex()
+        index.load(db)
+        self.assertEqual(index.suggest("ca")[0][1], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, Image, User
+from src.repository.follows import follow_user, unfollow_user
+from src.services.timelines import TimelineService
+
+
+class TestTimelines(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.users = [
+            User(email=f"user{i}@example.com", password="secret", username=f"user{i}")
+            for i in range(4)
+        ]
+        self.db.add_all(self.users)
+        self.db.commit()
+        reader, author, star, fan = self.users
+        await follow_user(reader, author.id, self.db)
+        await follow_user(reader, star.id, self.db)
+        await follow_user(fan, star.id, self.db)
+        for user_id in [author.id, star.id, author.id, star.id]:
+            self.db.add(Image(url="url", description="", user_id=user_id))
+        self.db.commit()
+        self.service = TimelineService(size=10, fanout_limit=1)
+
+    def tearDown(self):
+        self.db.close()
+
+    async def test_follow_counts(self):
+        reader, author = self.users[:2]
+        self.db.refresh(author)
+        self.assertEqual(author.follower_count, 1)
+        self.assertFalse(await follow_user(reader, author.id, self.db))
+        self.assertTrue(await unfollow_user(reader, author.id, self.db))
+        self.assertFalse(await unfollow_user(reader, author.id, self.db))
+        self.db.refresh(author)
+        self.assertEqual(author.follower_count, 0)
+
+    async def test_fan_out_skips_popular_authors(self):
+        with patch("src.services.timelines.redis_client") as client:
+            await self.service.fan_out(self.db.get(Image, 1), self.db)
+            await self.service.fan_out(self.db.get(Image, 2), self.db)
+        pipe = client.pipeline.return_value
+        pipe.lpushx.assert_called_once_with("timeline:1", 1)
+
+    async def test_read_merges_popular_authors(self):
+        with patch("src.services.timelines.redis_client") as client:
+            client.lrange.return_value = [b"3", b"1"]
+            page, cursor = await self.service.read(1, self.db, limit=3)
+            self.assertEqual(page, [4, 3, 2])
+            self.assertEqual(cursor, 2)
+            client.lrange.return_value = [b"3", b"1"]
+            page, cursor = await self.service.read(1, self.db, before_id=2, limit=3)
+            self.assertEqual(page, [1])
+            self.assertIsNone(cursor)
+
+    async def test_read_rebuilds_missing_timeline(self):
+        with patch("src.services.timelines.redis_client") as client:
+            client.lrange.return_value = []
+            page, _ = await self.service.read(1, self.db)
+        self.assertEqual(page, [4, 3, 2, 1])
+        client.pipeline.return_value.rpush.assert_called_once_with("timeline:1", 3, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
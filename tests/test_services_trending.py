@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+import redis
+from sqlalchemy.exc import OperationalError
+
+from src.services.trending import TrendingTags
+
+
+class TestTrendingTags(unittest.TestCase):
+    def setUp(self):
+        self.trending = TrendingTags()
+        self.now = datetime(2026, 10, 19, 14, 30)
+
+    def test_record_increments_hour_and_day_buckets(self):
+        with patch("src.services.trending.redis_client") as client:
+            pipe = client.pipeline.return_value
+            self.trending.record(["sun", "sun"], now=self.now)
+        pipe.zincrby.assert_any_call("trending:tags:h:2026101914", 1, "sun")
+        pipe.zincrby.assert_any_call("trending:tags:d:20261019", 1, "sun")
+        self.assertEqual(pipe.zincrby.call_count, 4)
+        pipe.execute.assert_called_once()
+
+    def test_record_nothing(self):
+        with patch("src.services.trending.redis_client") as client:
+            self.trending.record([], now=self.now)
+        client.pipeline.assert_not_called()
+
+    def test_bucket_keys(self):
+        day = self.trending.bucket_keys("day", self.now)
+        week = self.trending.bucket_keys("week", self.now)
+        self.assertEqual(len(day), 24)
+        self.assertEqual(day[-1], "trending:tags:h:2026101815")
+        self.assertEqual(week[-1], "trending:tags:d:20261013")
+
+    def test_top_unions_window_once(self):
+        with patch("src.services.trending.redis_client") as client:
+            client.exists.return_value = 0
+            client.zrevrange.return_value = [(b"sun", 3.0), (b"sea", 1.0)]
+            result = self.trending.top("week", 2, now=self.now)
+        pipe = client.pipeline.return_value
+        pipe.zunionstore.assert_called_once()
+        client.zrevrange.assert_called_once_with(
+            "trending:tags:window:week", 0, 1, withscores=True
+        )
+        self.assertEqual(result, [("sun", 3), ("sea", 1)])
+
+    def test_top_without_redis(self):
+        with patch("src.services.trending.redis_client") as client:
+            client.zrevrange.side_effect = redis.ConnectionError("down")
+            self.assertEqual(self.trending.top("hour"), [])
+
+    @patch("src.services.trending.SessionLocal")
+    @patch("src.services.trending.save_tag_trend_bucket")
+    def test_failed_copy_releases_bucket(self, save, session_local):
+        save.side_effect = OperationalError("INSERT", {}, Exception("down"))
+        with patch("src.services.trending.redis_client") as client:
+            client.set.side_effect = [True] + [False] * 23
+            client.zrange.return_value = [(b"sun", 2.0)]
+            asyncio.run(self.trending.persist_closed_buckets())
+        claim = client.set.call_args_list[0].args[0]
+        client.delete.assert_called_once_with(claim)
+        session_local.return_value.rollback.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import unittest
+from hashlib import sha256
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.database.models import Base, UploadSession, User
+from src.repository.uploads import (
+    claim_session,
+    create_upload_session,
+    update_received,
+)
+from src.services.uploads import UploadService
+
+
+async def stream(*parts):
+    for part in parts:
+        yield part
+
+
+class TestUploads(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.service = UploadService()
+        self.service.upload_dir = Path(self.tmp.name)
+        self.session = UploadSession(id="abc", total_size=10, received=0)
+        self.db = MagicMock(spec=Session)
+        self.db.query.return_value.filter.return_value.update.return_value = 1
+        await self.service.create_file(self.session)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_write_chunks_and_complete(self):
+        await self.service.write_chunk(
+            self.session, 0, stream(b"hel", b"lo"), sha256(b"hello").hexdigest(), self.db
+        )
+        self.assertEqual(self.session.received, 5)
+        await self.service.write_chunk(
+            self.session, 5, stream(b"world"), sha256(b"world").hexdigest(), self.db
+        )
+        self.assertEqual(self.session.received, 10)
+        self.session.checksum = sha256(b"helloworld").hexdigest()
+        file = await self.service.open_completed(self.session, self.db)
+        self.assertEqual(await file.read(), b"helloworld")
+        await file.close()
+
+    async def test_write_chunk_wrong_offset(self):
+        with self.assertRaises(HTTPException) as cm:
+            await self.service.write_chunk(
+                self.session, 3, stream(b"abc"), sha256(b"abc").hexdigest(), self.db
+            )
+        self.assertEqual(cm.exception.status_code, 409)
+
+    async def test_write_chunk_while_another_is_written(self):
+        self.db.query.return_value.filter.return_value.update.return_value = 0
+        with self.assertRaises(HTTPException) as cm:
+            await self.service.write_chunk(
+                self.session, 0, stream(b"abc"), sha256(b"abc").hexdigest(), self.db
+            )
+        self.assertEqual(cm.exception.status_code, 409)
+        self.assertEqual(self.service.path("abc").stat().st_size, 0)
+
+    async def test_write_chunk_checksum_mismatch_is_rolled_back(self):
+        with self.assertRaises(HTTPException) as cm:
+            await self.service.write_chunk(
+                self.session, 0, stream(b"hello"), sha256(b"other").hexdigest(), self.db
+            )
+        self.assertEqual(cm.exception.status_code, 400)
+        self.assertEqual(self.session.received, 0)
+        self.assertEqual(self.service.path("abc").stat().st_size, 0)
+
+    async def test_write_chunk_too_large(self):
+        with self.assertRaises(HTTPException) as cm:
+            await self.service.write_chunk(
+                self.session,
+                0,
+                stream(b"0123456789", b"x"),
+                sha256(b"0123456789x").hexdigest(),
+                self.db,
+            )
+        self.assertEqual(cm.exception.status_code, 413)
+
+    async def test_open_while_another_is_finalizing(self):
+        data = b"helloworld"
+        await self.service.write_chunk(
+            self.session, 0, stream(data), sha256(data).hexdigest(), self.db
+        )
+        self.db.query.return_value.filter.return_value.update.return_value = 0
+        with self.assertRaises(HTTPException) as cm:
+            await self.service.open_completed(self.session, self.db)
+        self.assertEqual(cm.exception.status_code, 409)
+
+    async def test_open_incomplete(self):
+        with self.assertRaises(HTTPException) as cm:
+            await self.service.open_completed(self.session, self.db)
+        self.assertEqual(cm.exception.status_code, 409)
+
+
+class TestChunkClaims(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        user = User(email="test@example.com", password="secret", username="test")
+        self.db.add(user)
+        self.db.commit()
+        self.session = await create_upload_session(10, None, "", 60, user, self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    async def test_claim_is_exclusive(self):
+        self.assertTrue(await claim_session(self.session, 0, 60, self.db))
+        self.assertFalse(await claim_session(self.session, 0, 60, self.db))
+        await update_received(self.session, 5, self.db)
+        self.assertFalse(await claim_session(self.session, 0, 60, self.db))
+        self.assertTrue(await claim_session(self.session, 5, 60, self.db))
+
+    async def test_finalize_claim(self):
+        self.assertFalse(await claim_session(self.session, 10, 60, self.db))
+        await update_received(self.session, 10, self.db)
+        self.assertTrue(await claim_session(self.session, 10, 60, self.db))
+        self.assertFalse(await claim_session(self.session, 10, 60, self.db))
+
+    async def test_expired_claim(self):
+        self.assertTrue(await claim_session(self.session, 0, -1, self.db))
+        self.assertTrue(await claim_session(self.session, 0, 60, self.db))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from datetime import datetime, timezone
+
+from starlette.requests import Request
+
+from src.utils.conditional import cache_headers, is_not_modified, weak_etag
+
+
+def make_request(**headers):
+    raw = [
+        (name.replace("_", "-").encode(), value.encode())
+        for name, value in headers.items()
+    ]
+    return Request({"type": "http", "headers": raw})
+
+
+class TestConditional(unittest.TestCase):
+    def setUp(self):
+        self.modified = datetime(2026, 10, 19, 12, 0, 0, 500000, tzinfo=timezone.utc)
+        self.etag = weak_etag(1, 3, self.modified)
+
+    def test_weak_etag(self):
+        self.assertTrue(self.etag.startswith('W/"'))
+        self.assertEqual(self.etag, weak_etag(1, 3, self.modified))
+        self.assertNotEqual(self.etag, weak_etag(1, 4, self.modified))
+
+    def test_if_none_match(self):
+        strong = self.etag.removeprefix("W/")
+        same = make_request(if_none_match=self.etag)
+        listed = make_request(if_none_match=f'"x", {strong}')
+        other = make_request(if_none_match='"x"')
+        self.assertTrue(is_not_modified(same, self.etag))
+        self.assertTrue(is_not_modified(listed, self.etag))
+        self.assertFalse(is_not_modified(other, self.etag))
+
+    def test_if_none_match_takes_precedence(self):
+        request = make_request(
+            if_none_match='"x"', if_modified_since="Mon, 19 Oct 2026 12:00:00 GMT"
+        )
+        self.assertFalse(is_not_modified(request, self.etag, self.modified))
+
+    def test_if_modified_since(self):
+        same = make_request(if_modified_since="Mon, 19 Oct 2026 12:00:00 GMT")
+        older = make_request(if_modified_since="Mon, 19 Oct 2026 11:59:59 GMT")
+        broken = make_request(if_modified_since="yesterday")
+        self.assertTrue(is_not_modified(same, self.etag, self.modified))
+        self.assertFalse(is_not_modified(older, self.etag, self.modified))
+        self.assertFalse(is_not_modified(broken, self.etag, self.modified))
+
+    def test_cache_headers(self):
+        headers = cache_headers(self.etag, self.modified, "private, no-cache")
+        self.assertEqual(headers["Last-Modified"], "Mon, 19 Oct 2026 12:00:00 GMT")
+        self.assertNotIn("Last-Modified", cache_headers(self.etag, None, "no-cache"))
+
+
+if __name__ == "__main__":
+    unittest.main()
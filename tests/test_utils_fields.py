@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+
+from fastapi import HTTPException
+
+from src.schemas import ImageResponse, UserResponseProfile
+from src.utils.fields import has_field, parse_fields
+
+
+class TestFields(unittest.TestCase):
+    def test_has_field(self):
+        self.assertTrue(has_field(ImageResponse, "tags"))
+        self.assertTrue(has_field(UserResponseProfile, "user.username"))
+        self.assertFalse(has_field(UserResponseProfile, "user.password"))
+        self.assertFalse(has_field(ImageResponse, "url.scheme"))
+
+    def test_parse_fields(self):
+        self.assertIsNone(parse_fields(None, ImageResponse))
+        self.assertEqual(
+            parse_fields(" id,tags, id ,", ImageResponse), ["id", "tags"]
+        )
+
+    def test_parse_fields_rejects_empty(self):
+        with self.assertRaises(HTTPException) as context:
+            parse_fields(" , ", ImageResponse)
+        self.assertEqual(context.exception.status_code, 400)
+
+    def test_parse_fields_rejects_unknown(self):
+        with self.assertRaises(HTTPException) as context:
+            parse_fields("id,password", ImageResponse)
+        self.assertEqual(context.exception.detail, "Unknown fields: password")
+
+
+if __name__ == "__main__":
+    unittest.main()